@@ -6,21 +6,23 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+import os
 import time
 import random
 import warnings
+from collections import OrderedDict
+import stockage
+import ingestion
+import prevision
+import sous_echantillonnage
+import simulation
+import scenarios
+import profilage
+from profilage import chronometre
 warnings.filterwarnings('ignore')
 
-# Configuration de la page
-st.set_page_config(
-    page_title="Analyse des Aéroports Français - Live",
-    page_icon="🛫",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
 # CSS personnalisé
-st.markdown("""
+CSS_PERSONNALISE = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -75,14 +77,573 @@ st.markdown("""
     .on-time { background-color: #d1ecf1; border-left: 4px solid #17a2b8; }
     .cancelled { background-color: #f8d7da; border-left: 4px solid #dc3545; }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+def configurer_page():
+    """Configuration de la page et CSS personnalisé"""
+    st.set_page_config(
+        page_title="Analyse des Aéroports Français - Live",
+        page_icon="🛫",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(CSS_PERSONNALISE, unsafe_allow_html=True)
+
+def union_positions(positions_par_valeur, valeurs):
+    """Positions triées des lignes prenant l'une des `valeurs` (tableaux de positions disjoints)"""
+    morceaux = [positions_par_valeur[v] for v in valeurs if v in positions_par_valeur]
+    return np.sort(np.concatenate(morceaux)) if morceaux else np.empty(0, dtype=np.int64)
+
+def positions_intervalle(ordre, valeurs_triees, debut=None, fin=None):
+    """Positions triées des lignes dont la valeur est dans [debut, fin[, par recherche dichotomique
+    
+    ordre: permutation triant la colonne, valeurs_triees: colonne triée selon `ordre`.
+    Renvoie None quand l'intervalle couvre toutes les lignes.
+    """
+    i = 0 if debut is None else np.searchsorted(valeurs_triees, np.datetime64(debut), 'left')
+    j = len(ordre) if fin is None else np.searchsorted(valeurs_triees, np.datetime64(fin), 'left')
+    if i == 0 and j == len(ordre):
+        return None
+    return np.sort(ordre[i:max(i, j)])
+
+class AgregatsVols:
+    """Agrégats incrémentaux des vols par (aéroport, compagnie, statut, type de vol)
+    
+    Les comptes, sommes de retards et histogrammes de retards sont tenus dans des
+    tableaux denses indexés par les codes des catégories. Ils sont construits une
+    fois puis mis à jour à partir des deltas de statut, sans relire la table des vols.
+    `positions` limite la construction à un sous-ensemble de lignes; de tels agrégats
+    ne sont pas mis à jour et se reconstruisent à chaque changement des vols.
+    """
+    AXES = ('aeroport_depart', 'compagnie', 'statut', 'type_vol')
+    LARGEUR_CLASSE_RETARD = 10  # minutes
+    NB_CLASSES_RETARD = 19
+    
+    def __init__(self, vols_data, positions=None):
+        self.categories = {axe: list(vols_data[axe].cat.categories) for axe in self.AXES}
+        self.forme = tuple(len(self.categories[axe]) for axe in self.AXES)
+        self.statut_retarde = self.categories['statut'].index('Retardé')
+        selection = slice(None) if positions is None else positions
+        
+        # Codes des dimensions fixes d'un vol, conservés pour situer les deltas
+        self.codes_depart = vols_data['aeroport_depart'].cat.codes.to_numpy()[selection].astype(np.int64)
+        self.codes_compagnie = vols_data['compagnie'].cat.codes.to_numpy()[selection].astype(np.int64)
+        self.codes_type = vols_data['type_vol'].cat.codes.to_numpy()[selection].astype(np.int64)
+        
+        positions = np.arange(len(self.codes_depart))
+        self.nb_vols = np.zeros(self.forme, dtype=np.int64)
+        self.somme_retards = np.zeros(self.forme, dtype=np.int64)
+        self.histogramme = np.zeros(self.forme[:2] + self.forme[3:] + (self.NB_CLASSES_RETARD,), dtype=np.int64)
+        self._ajouter(positions,
+                      vols_data['statut'].cat.codes.to_numpy()[selection].astype(np.int64),
+                      vols_data['retard_minutes'].to_numpy()[selection].astype(np.int64),
+                      np.ones(len(positions), dtype=np.int64))
+    
+    def _ajouter(self, positions, statuts, retards, signes):
+        """Ajoute (signe 1) ou retire (signe -1) des vols des agrégats"""
+        depart = self.codes_depart[positions]
+        compagnie = self.codes_compagnie[positions]
+        type_vol = self.codes_type[positions]
+        
+        cellules = np.ravel_multi_index((depart, compagnie, statuts, type_vol), self.forme)
+        taille = self.nb_vols.size
+        self.nb_vols += np.bincount(cellules, weights=signes, minlength=taille).astype(np.int64).reshape(self.forme)
+        self.somme_retards += np.bincount(cellules, weights=signes * retards,
+                                          minlength=taille).astype(np.int64).reshape(self.forme)
+        
+        retardes = statuts == self.statut_retarde
+        classes = np.minimum(retards[retardes] // self.LARGEUR_CLASSE_RETARD, self.NB_CLASSES_RETARD - 1)
+        cellules = np.ravel_multi_index((depart[retardes], compagnie[retardes], type_vol[retardes], classes),
+                                        self.histogramme.shape)
+        self.histogramme += np.bincount(cellules, weights=signes[retardes],
+                                        minlength=self.histogramme.size).astype(np.int64).reshape(self.histogramme.shape)
+    
+    def appliquer_delta(self, delta):
+        """Met à jour les agrégats à partir d'un delta renvoyé par appliquer_changements_statut"""
+        positions = delta['positions']
+        if len(positions) == 0:
+            return
+        # Retrait des anciennes valeurs et ajout des nouvelles en un seul passage
+        self._ajouter(np.concatenate([positions, positions]),
+                      np.concatenate([delta['ancien_statut'], delta['nouveau_statut']]).astype(np.int64),
+                      np.concatenate([delta['ancien_retard'], delta['nouveau_retard']]).astype(np.int64),
+                      np.repeat(np.array([-1, 1], dtype=np.int64), len(positions)))
+    
+    def restreindre(self, aeroports):
+        """Agrégats en lecture seule limités aux aéroports de départ donnés (tranche des tableaux)"""
+        indices = [i for i, code in enumerate(self.categories['aeroport_depart']) if code in set(aeroports)]
+        restreint = object.__new__(AgregatsVols)
+        restreint.categories = dict(self.categories,
+                                    aeroport_depart=[self.categories['aeroport_depart'][i] for i in indices])
+        restreint.forme = (len(indices),) + self.forme[1:]
+        restreint.statut_retarde = self.statut_retarde
+        restreint.nb_vols = self.nb_vols[indices]
+        restreint.somme_retards = self.somme_retards[indices]
+        restreint.histogramme = self.histogramme[indices]
+        return restreint
+    
+    def _reduire(self, tableau, axe):
+        """Somme un tableau d'agrégats sur tous les axes sauf `axe`"""
+        garde = self.AXES.index(axe)
+        return tableau.sum(axis=tuple(i for i in range(tableau.ndim) if i != garde))
+    
+    def total(self):
+        """Nombre total de vols"""
+        return int(self.nb_vols.sum())
+    
+    def par_statut(self):
+        """Nombre de vols par statut"""
+        return pd.Series(self._reduire(self.nb_vols, 'statut'), index=self.categories['statut'])
+    
+    def retard_moyen_retardes(self, axe):
+        """Retard moyen des vols retardés, ventilé selon `axe`"""
+        retardes = [slice(None)] * len(self.AXES)
+        retardes[self.AXES.index('statut')] = slice(self.statut_retarde, self.statut_retarde + 1)
+        nb = self._reduire(self.nb_vols[tuple(retardes)], axe)
+        somme = self._reduire(self.somme_retards[tuple(retardes)], axe)
+        presents = nb > 0
+        return pd.DataFrame({
+            axe: np.array(self.categories[axe], dtype=object)[presents],
+            'retard_minutes': somme[presents] / nb[presents]
+        })
+    
+    def performance(self, axe):
+        """Nombre de vols, ponctualité, retard moyen et annulations ventilés selon `axe`"""
+        statuts = self.categories['statut']
+        par_statut = self.nb_vols.sum(axis=tuple(i for i in range(len(self.AXES))
+                                                 if self.AXES[i] not in (axe, 'statut')))
+        if self.AXES.index(axe) > self.AXES.index('statut'):
+            par_statut = par_statut.T
+        nb = par_statut.sum(axis=1)
+        diviseur = np.maximum(nb, 1)
+        return pd.DataFrame({
+            axe: self.categories[axe],
+            'nb_vols': nb,
+            'taux_ponctualite': par_statut[:, statuts.index('À l\'heure')] / diviseur * 100,
+            'retard_moyen': self._reduire(self.somme_retards, axe) / diviseur,
+            'taux_annulation': par_statut[:, statuts.index('Annulé')] / diviseur * 100
+        })
+    
+    def histogramme_retards(self):
+        """Distribution des retards des vols retardés par classes de LARGEUR_CLASSE_RETARD minutes"""
+        debuts = np.arange(self.NB_CLASSES_RETARD) * self.LARGEUR_CLASSE_RETARD
+        return pd.DataFrame({
+            'minutes_retard': debuts + self.LARGEUR_CLASSE_RETARD / 2,
+            'nombre_vols': self.histogramme.sum(axis=(0, 1, 2))
+        })
+
+class IndexFiltresVols:
+    """Index de filtrage des vols par positions de ligne
+    
+    Les dimensions fixes d'un vol (aéroport de départ, type, compagnie) sont indexées
+    par des tableaux triés de positions, un par valeur. Les dimensions live (statut)
+    sont tenues sous forme de codes mis à jour à partir des deltas de statut, et
+    l'horaire programmé par un ordre de tri parcouru par recherche dichotomique. Une
+    requête intersecte les tableaux de positions puis vérifie les codes live sur les
+    seules positions candidates, sans copier la table des vols.
+    """
+    DIMENSIONS_FIXES = ('aeroport_depart', 'type_vol', 'compagnie')
+    DIMENSIONS_LIVE = ('statut',)
+    DIMENSION_HORAIRE = 'heure_depart_programmee'
+    
+    def __init__(self, vols_data):
+        self.nb_vols = len(vols_data)
+        self.positions = {}
+        for dimension in self.DIMENSIONS_FIXES:
+            colonne = vols_data[dimension]
+            codes = colonne.cat.codes.to_numpy()
+            ordre = np.argsort(codes, kind='stable')
+            bornes = np.cumsum(np.bincount(codes, minlength=len(colonne.cat.categories)))[:-1]
+            self.positions[dimension] = dict(zip(colonne.cat.categories, np.split(ordre, bornes)))
+        self.categories_live = {dimension: list(vols_data[dimension].cat.categories)
+                                for dimension in self.DIMENSIONS_LIVE}
+        self.codes_live = {dimension: vols_data[dimension].cat.codes.to_numpy(copy=True)
+                           for dimension in self.DIMENSIONS_LIVE}
+        horaires = vols_data[self.DIMENSION_HORAIRE].to_numpy()
+        self.ordre_horaire = np.argsort(horaires, kind='stable')
+        self.horaires_tries = horaires[self.ordre_horaire]
+    
+    def appliquer_delta(self, delta):
+        """Reporte un delta de statut renvoyé par appliquer_changements_statut"""
+        self.codes_live['statut'][delta['positions']] = delta['nouveau_statut']
+    
+    def rechercher(self, criteres, debut=None, fin=None, dans=None):
+        """Renvoie les positions triées des vols satisfaisant tous les critères {dimension: valeur}
+        
+        Une valeur peut être une liste (union des valeurs). debut/fin bornent l'horaire de
+        départ programmé ([debut, fin[); `dans` restreint la recherche à des positions triées.
+        """
+        criteres = {dimension: valeur for dimension, valeur in criteres.items() if valeur is not None}
+        fixes = []
+        for dimension, valeur in criteres.items():
+            if dimension not in self.positions:
+                continue
+            if isinstance(valeur, (list, tuple)):
+                fixes.append(union_positions(self.positions[dimension], valeur))
+            else:
+                fixes.append(self.positions[dimension].get(valeur, np.empty(0, dtype=np.int64)))
+        horaire = positions_intervalle(self.ordre_horaire, self.horaires_tries, debut, fin)
+        if horaire is not None:
+            fixes.append(horaire)
+        if dans is not None and len(dans) < self.nb_vols:
+            fixes.append(dans)
+        
+        # Intersection en partant du plus petit tableau de positions
+        if fixes:
+            fixes.sort(key=len)
+            candidats = fixes[0]
+            for positions in fixes[1:]:
+                candidats = np.intersect1d(candidats, positions, assume_unique=True)
+        else:
+            candidats = None
+        
+        for dimension in self.DIMENSIONS_LIVE:
+            if dimension not in criteres:
+                continue
+            categories = self.categories_live[dimension]
+            if criteres[dimension] not in categories:
+                return np.empty(0, dtype=np.int64)
+            code = categories.index(criteres[dimension])
+            codes = self.codes_live[dimension]
+            if candidats is None:
+                candidats = np.flatnonzero(codes == code)
+            else:
+                candidats = candidats[codes[candidats] == code]
+        
+        return np.arange(self.nb_vols) if candidats is None else candidats
+
+class IndexTrafic:
+    """Index des lignes de trafic par aéroport et par date
+    
+    Comme pour les vols, une requête intersecte les positions des aéroports demandés
+    avec la plage de dates trouvée par recherche dichotomique.
+    """
+    
+    def __init__(self, traffic_data):
+        self.traffic_data = traffic_data
+        self.nb_lignes = len(traffic_data)
+        self.positions = {code: positions.astype(np.int64) for code, positions in
+                          traffic_data.groupby(traffic_data['aeroport'].astype(str), sort=False).indices.items()}
+        dates = traffic_data['date'].to_numpy()
+        self.ordre_dates = np.argsort(dates, kind='stable')
+        self.dates_triees = dates[self.ordre_dates]
+    
+    def rechercher(self, aeroports=None, debut=None, fin=None):
+        """Positions triées des lignes des `aeroports` datées dans [debut, fin["""
+        candidats = None if aeroports is None else union_positions(self.positions, aeroports)
+        dates = positions_intervalle(self.ordre_dates, self.dates_triees, debut, fin)
+        if dates is not None:
+            candidats = dates if candidats is None else np.intersect1d(candidats, dates, assume_unique=True)
+        return np.arange(self.nb_lignes) if candidats is None else candidats
+
+class CubeTrafic:
+    """Cube d'agrégats du trafic par période (mois, trimestre, année) et niveau (total, aéroport, région)
+    
+    Construit une fois par jeu de données de trafic. Chaque table est triée par période;
+    une requête sur un intervalle de dates retient les périodes qui le chevauchent,
+    trouvées par recherche dichotomique sur les dates de début et de fin de période.
+    """
+    GRANULARITES = {'mois': 'M', 'trimestre': 'Q', 'annee': 'Y'}
+    NIVEAUX = ('total', 'aeroport', 'region')
+    
+    def __init__(self, traffic_data):
+        self.traffic_data = traffic_data
+        # Agrégat de base aéroport × mois, dont dérivent toutes les autres tables
+        base = traffic_data.groupby([traffic_data['date'].dt.to_period('M').rename('periode'),
+                                     traffic_data['aeroport'].astype(str),
+                                     traffic_data['region'].astype(str)], sort=False).agg(
+            passagers=('passagers', 'sum'),
+            vols_mois=('vols_mois', 'sum'),
+            somme_remplissage=('taux_remplissage', 'sum'),
+            nb_lignes=('taux_remplissage', 'size')
+        ).reset_index()
+        
+        self.tables = {}
+        self.bornes = {}
+        for granularite, frequence in self.GRANULARITES.items():
+            periodes = base['periode'].dt.asfreq(frequence)
+            for niveau in self.NIVEAUX:
+                cles = [periodes] if niveau == 'total' else [periodes, base[niveau]]
+                table = (base.groupby(cles, sort=True)[['passagers', 'vols_mois', 'somme_remplissage', 'nb_lignes']]
+                         .sum().reset_index())
+                table['taux_remplissage'] = table.pop('somme_remplissage') / table.pop('nb_lignes')
+                debuts = table['periode'].dt.start_time
+                table.insert(0, 'date', table['periode'].dt.end_time.dt.normalize())
+                self.tables[(granularite, niveau)] = table.drop(columns='periode')
+                self.bornes[(granularite, niveau)] = (debuts.to_numpy(), table['date'].to_numpy())
+    
+    def requete(self, granularite='mois', niveau='total', debut=None, fin=None, selection=None):
+        """Agrégats des périodes chevauchant [debut, fin], restreints aux valeurs de `selection`
+        
+        Au niveau 'total', `selection` désigne des aéroports.
+        """
+        if niveau == 'total' and selection is not None:
+            # Total limité aux aéroports sélectionnés: cumul des lignes par aéroport
+            detail = self.requete(granularite, 'aeroport', debut, fin, selection)
+            return detail.groupby('date', as_index=False).agg(passagers=('passagers', 'sum'),
+                                                               vols_mois=('vols_mois', 'sum'),
+                                                               taux_remplissage=('taux_remplissage', 'mean'))
+        table = self.tables[(granularite, niveau)]
+        debuts, fins = self.bornes[(granularite, niveau)]
+        i = 0 if debut is None else np.searchsorted(fins, np.datetime64(pd.Timestamp(debut)), 'left')
+        j = len(table) if fin is None else np.searchsorted(debuts, np.datetime64(pd.Timestamp(fin)), 'right')
+        resultat = table.iloc[i:max(i, j)]
+        if selection is not None and niveau != 'total':
+            resultat = resultat[resultat[niveau].isin(selection)]
+        return resultat
+
+class CacheFigures:
+    """Cache LRU de figures Plotly, avec compteurs de succès et d'échecs
+    
+    La durée de construction de chaque figure est conservée avec elle: chaque succès
+    ajoute cette durée au temps de rendu économisé.
+    """
+    
+    def __init__(self, capacite=64):
+        self.capacite = capacite
+        self.figures = OrderedDict()
+        self.succes = 0
+        self.echecs = 0
+        self.temps_construction = 0.0
+        self.temps_economise = 0.0
+    
+    def obtenir(self, cle, construire):
+        """Renvoie la figure de `cle`, construite par `construire()` si elle n'est pas en cache"""
+        if cle in self.figures:
+            self.figures.move_to_end(cle)
+            figure, duree = self.figures[cle]
+            self.succes += 1
+            self.temps_economise += duree
+            return figure
+        
+        debut = time.perf_counter()
+        figure = construire()
+        duree = time.perf_counter() - debut
+        self.echecs += 1
+        self.temps_construction += duree
+        self.figures[cle] = (figure, duree)
+        if len(self.figures) > self.capacite:
+            self.figures.popitem(last=False)
+        return figure
+    
+    def statistiques(self):
+        """Compteurs du cache: succès, échecs, taux de succès, taille et durées (s)"""
+        nb_demandes = self.succes + self.echecs
+        return {
+            'succes': self.succes,
+            'echecs': self.echecs,
+            'taux_succes': self.succes / nb_demandes if nb_demandes else 0.0,
+            'taille': len(self.figures),
+            'temps_construction': self.temps_construction,
+            'temps_economise': self.temps_economise
+        }
 
 class AeroportsFranceDashboard:
-    def __init__(self):
-        self.aeroports = self.define_aeroports()
-        self.vols_data = self.initialize_vols_data()
-        self.traffic_data = self.initialize_traffic_data()
-        self.airlines_data = self.initialize_airlines_data()
+    STATUTS = ['À l\'heure', 'Retardé', 'Annulé']
+    TYPES_VOL = ['Domestique', 'International']
+    COMPAGNIES = ['Air France', 'Air France Hop', 'EasyJet', 'Ryanair', 'Transavia', 'British Airways', 'Lufthansa', 'Iberia']
+    DESTINATIONS_FRANCAISES = ['CDG', 'ORY', 'NCE', 'LYS', 'MRS', 'TLS', 'BOD', 'NTE', 'LIL', 'BSL']
+    PREFIXES_VOL = ['AF', 'U2', 'FR', 'TO', 'BA', 'LH', 'IB']
+    LETTRES_PORTE = ['A', 'B', 'C', 'D', 'E']
+    DESTINATIONS_INTERNATIONALES = ['LHR', 'AMS', 'FRA', 'BCN', 'MAD', 'FCO', 'IST', 'DXB', 'JFK', 'CDG']
+    
+    # Bornes (min, max) du facteur COVID par année, (0.9, 1.1) hors de la table
+    IMPACT_COVID = {
+        2020: (0.2, 0.4),  # Réduction de 60-80%
+        2021: (0.4, 0.7),  # Réduction de 30-60%
+        2022: (0.7, 0.9)   # Réduction de 10-30%
+    }
+    IMPACT_COVID_DEFAUT = (0.9, 1.1)  # Récupération
+    # Saisonnalité par mois: été 1.2, fêtes (décembre, janvier) 1.1
+    SAISONNALITE = np.array([1.1, 1.0, 1.0, 1.0, 1.0, 1.2, 1.2, 1.2, 1.0, 1.0, 1.0, 1.1])
+    # Fréquence: (alias pandas, nombre de périodes par an)
+    FREQUENCES_TRAFIC = {
+        'mensuelle': ('ME', 12),
+        'quotidienne': ('D', 365)
+    }
+    COULEURS_STATUT = {
+        'À l\'heure': 'background-color: #d1ecf1',
+        'Retardé': 'background-color: #fff3cd',
+        'Annulé': 'background-color: #f8d7da'
+    }
+    HORIZON_PREVISION = 12  # mois projetés dans l'onglet Projections
+    # Budget de points des courbes envoyées au navigateur (voir sous_echantillonnage.py)
+    POINTS_MAX_GRAPHIQUE = 10_000
+    POINTS_MAX_SERIE = 500
+    # Entrées dont dépend chaque figure (construite par figure_<identifiant>):
+    # 'statique' = données statiques, 'vue' = + sélection de la sidebar, 'live' = + état des vols,
+    # 'scenarios' = + résultats de scenarios.py (hors des rapports exportés)
+    DEPENDANCES_FIGURES = {
+        'trafic_aeroports': 'vue',
+        'trafic_regions': 'vue',
+        'remplissage_aeroports': 'vue',
+        'vols_mois_aeroports': 'vue',
+        'carte_aeroports': 'vue',
+        'repartition_statuts': 'live',
+        'retards_compagnies': 'live',
+        'retards_aeroports': 'live',
+        'distribution_retards': 'live',
+        'parts_marche': 'statique',
+        'vols_quotidiens_compagnies': 'statique',
+        'ponctualite_compagnies': 'live',
+        'annulation_compagnies': 'live',
+        'centiles_retards_compagnies': 'live',
+        'top_destinations': 'vue',
+        'trafic_total': 'vue',
+        'trafic_par_aeroport': 'vue',
+        'impact_covid': 'vue',
+        'projections': 'vue',
+        'scenarios': 'scenarios'
+    }
+    MESURES_SCENARIOS = {
+        'Taux de ponctualité (%)': 'taux_ponctualite',
+        'Retard moyen (min)': 'retard_moyen',
+        'Taux d\'annulation (%)': 'taux_annulation'
+    }
+    COLONNES_TRI = {
+        'Heure de départ': 'heure_depart_programmee',
+        'Retard': 'retard_minutes',
+        'Compagnie': 'compagnie',
+        'Statut': 'statut',
+        'Aéroport de départ': 'aeroport_depart'
+    }
+    
+    def __init__(self, nb_vols=200, seed=None, donnees_statiques=None, schema_compact=False, profileur=None):
+        self.nb_vols = nb_vols
+        self.schema_compact = schema_compact
+        self.rng = np.random.default_rng(seed)
+        self.profileur = profilage.Profileur(actif=PROFILAGE_ACTIF) if profileur is None else profileur
+        if donnees_statiques is None:
+            self.aeroports = self.define_aeroports()
+            self.vols_data = self.initialize_vols_data()
+            self.traffic_data = self.initialize_traffic_data()
+            self.airlines_data = self.initialize_airlines_data()
+            self._cube = None
+            self._index_trafic = None
+            self._prevision = None
+            self._plan_rotations = None
+        else:
+            # Données partagées en lecture seule; seule la table des vols évolue par session. Sa copie
+            # est superficielle: les mises à jour live remplacent leurs colonnes sans écrire dans les
+            # tableaux partagés, si bien que les autres colonnes (memory-mappées) restent communes
+            self.aeroports = donnees_statiques['aeroports']
+            self.vols_data = donnees_statiques['vols_data'].copy(deep=False)
+            self.schema_compact = 'vol_id' not in self.vols_data
+            self.traffic_data = donnees_statiques['traffic_data']
+            self.airlines_data = donnees_statiques['airlines_data']
+            self._cube = donnees_statiques.get('cube_trafic')
+            self._index_trafic = donnees_statiques.get('index_trafic')
+            self._prevision = donnees_statiques.get('prevision_trafic')
+            self._plan_rotations = donnees_statiques.get('plan_rotations')
+            # Temps de construction des données partagées, mesurés une fois au démarrage
+            self.profileur.reprendre(donnees_statiques.get('mesures_demarrage', ()))
+        self.indexer_vols()
+        self.version_vols = 0
+        self.ingestion = None
+        self.simulation = None
+        self._instantane = None
+        self._vue = None
+        self._agregats_vue = None
+        self._performance_compagnies = None
+        self.version_statique = 0
+        self.sections_paresseuses = True
+        self.cache_figures = CacheFigures()
+        self.dernier_rafraichissement = float('-inf')
+    
+    @chronometre('indexer_vols', lambda self, *args: len(self.vols_data))
+    def indexer_vols(self):
+        """Construit les agrégats incrémentaux et l'index de filtrage de la table des vols"""
+        self.agregats = AgregatsVols(self.vols_data)
+        self.index_filtres = IndexFiltresVols(self.vols_data)
+    
+    def remplacer_donnees_statiques(self, donnees):
+        """Reprend des données statiques reconstruites, sans toucher à l'état live des vols"""
+        if donnees['traffic_data'] is not self.traffic_data or donnees['airlines_data'] is not self.airlines_data:
+            self.version_statique += 1
+            self.profileur.reprendre(donnees.get('mesures_demarrage', ()))
+        self.traffic_data = donnees['traffic_data']
+        self.airlines_data = donnees['airlines_data']
+        self._cube = donnees.get('cube_trafic')
+        self._index_trafic = donnees.get('index_trafic')
+        self._prevision = donnees.get('prevision_trafic')
+    
+    def cube_trafic(self):
+        """Cube d'agrégats du trafic, construit une fois par jeu de données de trafic"""
+        if self._cube is None or self._cube.traffic_data is not self.traffic_data:
+            self._cube = CubeTrafic(self.traffic_data)
+        return self._cube
+    
+    def index_trafic(self):
+        """Index du trafic par aéroport et date, construit une fois par jeu de données de trafic"""
+        if self._index_trafic is None or self._index_trafic.traffic_data is not self.traffic_data:
+            self._index_trafic = IndexTrafic(self.traffic_data)
+        return self._index_trafic
+    
+    def prevision_trafic(self):
+        """Modèle de prévision du trafic, ajusté une fois par jeu de données de trafic"""
+        if self._prevision is None or self._prevision.traffic_data is not self.traffic_data:
+            self._prevision = prevision.PrevisionTrafic(self.cube_trafic())
+        return self._prevision
+    
+    def plan_rotations(self):
+        """Plan des rotations et des portes de la table des vols, construit une fois"""
+        if self._plan_rotations is None or len(self._plan_rotations) != len(self.vols_data):
+            self._plan_rotations = simulation.PlanRotations(self.vols_data, self.aeroports)
+        return self._plan_rotations
+    
+    def vue_filtree(self, aeroports=None, date_debut=None, date_fin=None):
+        """Sélection courante de la sidebar, résolue une fois en positions de lignes
+        
+        Renvoie un dict: aéroports retenus (tous si la sélection est vide), bornes
+        [debut, fin[ (date_fin incluse), positions triées des vols et des lignes de
+        trafic, et indicateurs `tous_vols`/`horaires_complets` permettant de lire les
+        agrégats maintenus plutôt que de recalculer sur les positions.
+        """
+        selection = set(aeroports or self.aeroports)
+        aeroports = [code for code in self.aeroports if code in selection]
+        debut = None if date_debut is None else pd.Timestamp(date_debut)
+        fin = None if date_fin is None else pd.Timestamp(date_fin) + pd.Timedelta(days=1)
+        cle = (tuple(aeroports), debut, fin, id(self.traffic_data))
+        if self._vue is not None and self._vue['cle'] == cle:
+            return self._vue
+        
+        tous_aeroports = len(aeroports) == len(self.aeroports)
+        criteres = {} if tous_aeroports else {'aeroport_depart': aeroports}
+        positions_vols = self.index_filtres.rechercher(criteres, debut, fin)
+        nb_vols_aeroports = sum(len(self.index_filtres.positions['aeroport_depart'].get(code, ()))
+                                for code in aeroports)
+        self._vue = {
+            'cle': cle,
+            'aeroports': aeroports,
+            'debut': debut,
+            'fin': fin,
+            'positions_vols': positions_vols,
+            'positions_trafic': self.index_trafic().rechercher(None if tous_aeroports else aeroports, debut, fin),
+            'tous_vols': len(positions_vols) == len(self.vols_data),
+            'horaires_complets': len(positions_vols) == nb_vols_aeroports
+        }
+        return self._vue
+    
+    def agregats_vue(self, vue):
+        """Agrégats des vols de la vue: tranche des agrégats maintenus quand seuls les aéroports
+        sont filtrés, sinon agrégats reconstruits sur les positions à chaque changement des vols"""
+        if vue['tous_vols']:
+            return self.agregats
+        if vue['horaires_complets']:
+            return self.agregats.restreindre(vue['aeroports'])
+        cle = (vue['cle'], self.version_vols)
+        if self._agregats_vue is None or self._agregats_vue[0] != cle:
+            self._agregats_vue = (cle, AgregatsVols(self.vols_data, vue['positions_vols']))
+        return self._agregats_vue[1]
+    
+    def donnees_statiques(self):
+        """Renvoie les jeux de données construits au démarrage, partageables entre sessions"""
+        return {
+            'aeroports': self.aeroports,
+            'vols_data': self.vols_data,
+            'traffic_data': self.traffic_data,
+            'airlines_data': self.airlines_data
+        }
         
     def define_aeroports(self):
         """Définit les aéroports français majeurs et leurs caractéristiques"""
@@ -173,81 +734,176 @@ class AeroportsFranceDashboard:
             }
         }
     
-    def initialize_vols_data(self):
-        """Initialise les données des vols en temps réel"""
-        compagnies = ['Air France', 'Air France Hop', 'EasyJet', 'Ryanair', 'Transavia', 'British Airways', 'Lufthansa', 'Iberia']
-        destinations_francaises = ['CDG', 'ORY', 'NCE', 'LYS', 'MRS', 'TLS', 'BOD', 'NTE', 'LIL', 'BSL']
-        destinations_internationales = ['LHR', 'AMS', 'FRA', 'BCN', 'MAD', 'FCO', 'IST', 'DXB', 'JFK', 'CDG']
-        
-        vols = []
-        for i in range(200):  # 200 vols simulés
-            aeroport_depart = random.choice(list(self.aeroports.keys()))
-            if random.random() > 0.3:  # 70% de vols internationaux
-                aeroport_arrivee = random.choice(destinations_internationales)
-                type_vol = 'International'
-            else:
-                aeroport_arrivee = random.choice([a for a in destinations_francaises if a != aeroport_depart])
-                type_vol = 'Domestique'
-            
-            heure_depart = datetime.now() + timedelta(hours=random.randint(-2, 6))
-            statut = random.choices(['À l\'heure', 'Retardé', 'Annulé'], weights=[0.7, 0.25, 0.05])[0]
-            retard = random.randint(0, 180) if statut == 'Retardé' else 0
-            
-            vols.append({
-                'vol_id': f'{random.choice(["AF", "U2", "FR", "TO", "BA", "LH", "IB"])}{random.randint(1000, 9999)}',
-                'compagnie': random.choice(compagnies),
-                'aeroport_depart': aeroport_depart,
-                'aeroport_arrivee': aeroport_arrivee,
-                'heure_depart_programmee': heure_depart,
-                'heure_depart_estimee': heure_depart + timedelta(minutes=int(retard)),  # CORRECTION: conversion en int
-                'statut': statut,
-                'retard_minutes': int(retard),  # CORRECTION: conversion en int
-                'porte_embarquement': f'{random.choice(["A", "B", "C", "D", "E"])}{random.randint(1, 50)}',
-                'type_vol': type_vol
-            })
+    @chronometre('initialize_vols_data', profilage.lignes_resultat)
+    def initialize_vols_data(self, nb_vols=None):
+        """Initialise les données des vols en temps réel (génération vectorisée)"""
+        if nb_vols is None:
+            nb_vols = self.nb_vols
+        rng = self.rng
+        codes_depart = list(self.aeroports.keys())
+        compagnies = self.COMPAGNIES
+        destinations_francaises = self.DESTINATIONS_FRANCAISES
+        destinations_internationales = self.DESTINATIONS_INTERNATIONALES
+        
+        # Aéroports d'arrivée: union des destinations, codés en catégories
+        codes_arrivee = list(dict.fromkeys(codes_depart + destinations_francaises + destinations_internationales))
+        position_arrivee = {code: i for i, code in enumerate(codes_arrivee)}
+        map_francaises = np.array([position_arrivee[c] for c in destinations_francaises])
+        map_internationales = np.array([position_arrivee[c] for c in destinations_internationales])
+        
+        depart = rng.integers(0, len(codes_depart), nb_vols)
+        international = rng.random(nb_vols) > 0.3  # 70% de vols internationaux
+        
+        # Vols domestiques: tirage parmi les destinations françaises sans l'aéroport de départ
+        rang_depart = np.array([destinations_francaises.index(c) if c in destinations_francaises else -1
+                                for c in codes_depart])[depart]
+        exclu = rang_depart >= 0
+        tirage = (rng.random(nb_vols) * (len(destinations_francaises) - exclu)).astype(np.int64)
+        tirage += exclu & (tirage >= rang_depart)
+        arrivee = np.where(international,
+                           map_internationales[rng.integers(0, len(destinations_internationales), nb_vols)],
+                           map_francaises[tirage])
         
-        return pd.DataFrame(vols)
+        maintenant = pd.Timestamp.now()
+        # Départs répartis à la minute sur la fenêtre [-2 h, +7 h[
+        heure_depart = maintenant + pd.to_timedelta(rng.integers(-2 * 60, 7 * 60, nb_vols), unit='min')
+        statut = rng.choice(len(self.STATUTS), size=nb_vols, p=[0.7, 0.25, 0.05])
+        retard = np.where(statut == self.STATUTS.index('Retardé'), rng.integers(0, 181, nb_vols), 0)
+        
+        # Identifiants de vol et portes: préfixe/lettre et partie numérique
+        prefixe = rng.integers(0, len(self.PREFIXES_VOL), nb_vols)
+        numero = rng.integers(1000, 10000, nb_vols)
+        lettre = rng.integers(0, len(self.LETTRES_PORTE), nb_vols)
+        numero_porte = rng.integers(1, 51, nb_vols)
+        # Rang de chaque vol parmi ceux de même numéro (7 x 9000 numéros seulement): suffixé
+        # au-delà du premier, il rend vol_id unique et les événements du flux sans ambiguïté
+        code_vol = prefixe * 9000 + numero - 1000
+        ordre = np.argsort(code_vol, kind='stable')
+        nouveau_numero = np.r_[True, code_vol[ordre][1:] != code_vol[ordre][:-1]]
+        rang = np.arange(nb_vols) - np.maximum.accumulate(np.where(nouveau_numero, np.arange(nb_vols), 0))
+        occurrence = np.empty(nb_vols, dtype=np.int64)
+        occurrence[ordre] = rang
+        
+        colonnes = {}
+        if self.schema_compact:
+            colonnes['vol_prefixe'] = pd.Categorical.from_codes(prefixe, self.PREFIXES_VOL)
+            colonnes['vol_numero'] = numero.astype(np.int16)
+            colonnes['vol_occurrence'] = occurrence.astype(np.int16)
+        else:
+            # Libellés obtenus par indexation dans une table précalculée de tous les identifiants
+            prefixes = np.array(self.PREFIXES_VOL, dtype=object)
+            numeros = np.arange(1000, 10000).astype(str).astype(object)
+            table_vol_id = (prefixes[:, None] + numeros[None, :]).ravel()
+            colonnes['vol_id'] = table_vol_id[code_vol]
+            repete = occurrence > 0
+            colonnes['vol_id'][repete] += '-' + (occurrence[repete] + 1).astype(str).astype(object)
+        colonnes.update({
+            'compagnie': pd.Categorical.from_codes(rng.integers(0, len(compagnies), nb_vols), compagnies),
+            'aeroport_depart': pd.Categorical.from_codes(depart, codes_depart),
+            'aeroport_arrivee': pd.Categorical.from_codes(arrivee, codes_arrivee),
+            'heure_depart_programmee': heure_depart,
+            'heure_depart_estimee': heure_depart + pd.to_timedelta(retard, unit='m'),
+            'statut': pd.Categorical.from_codes(statut, self.STATUTS),
+            'retard_minutes': retard.astype(np.int16 if self.schema_compact else np.int64)
+        })
+        if self.schema_compact:
+            colonnes['porte_lettre'] = pd.Categorical.from_codes(lettre, self.LETTRES_PORTE)
+            colonnes['porte_numero'] = numero_porte.astype(np.int8)
+        else:
+            lettres = np.array(self.LETTRES_PORTE, dtype=object)
+            table_portes = (lettres[:, None] + np.arange(1, 51).astype(str).astype(object)[None, :]).ravel()
+            colonnes['porte_embarquement'] = table_portes[lettre * 50 + numero_porte - 1]
+        colonnes['type_vol'] = pd.Categorical.from_codes(international.astype(np.int8), self.TYPES_VOL)
+        return pd.DataFrame(colonnes)
     
-    def initialize_traffic_data(self):
-        """Initialise les données de trafic historiques"""
-        dates = pd.date_range('2020-01-01', datetime.now(), freq='M')
-        data = []
+    def libelles_vol_id(self, vols):
+        """Identifiants de vol en texte, quel que soit le schéma de la table"""
+        if 'vol_id' in vols:
+            return vols['vol_id']
+        libelles = vols['vol_prefixe'].astype(str) + vols['vol_numero'].astype(str)
+        if 'vol_occurrence' not in vols:  # instantanés antérieurs au suffixe d'occurrence
+            return libelles
+        occurrence = vols['vol_occurrence']
+        return libelles.where(occurrence == 0, libelles + '-' + (occurrence.astype(np.int64) + 1).astype(str))
+    
+    def libelles_porte(self, vols):
+        """Portes d'embarquement en texte, quel que soit le schéma de la table"""
+        if 'porte_embarquement' in vols:
+            return vols['porte_embarquement']
+        return vols['porte_lettre'].astype(str) + vols['porte_numero'].astype(str)
+    
+    def memory_report(self):
+        """Affiche et renvoie l'occupation mémoire de vols_data par colonne"""
+        octets = self.vols_data.memory_usage(deep=True, index=True)
+        rapport = pd.DataFrame({
+            'octets': octets,
+            'octets_par_vol': octets / max(len(self.vols_data), 1)
+        })
+        rapport.loc['TOTAL'] = rapport.sum()
+        print(f"vols_data: {len(self.vols_data):,} vols, schéma {'compact' if self.schema_compact else 'standard'}")
+        print(rapport.to_string(float_format='{:,.2f}'.format))
+        return rapport
+    
+    @chronometre('initialize_traffic_data', profilage.lignes_resultat)
+    def initialize_traffic_data(self, date_debut='2020-01-01', date_fin=None, frequence='mensuelle', aeroports=None):
+        """Initialise les données de trafic historiques sur la grille dates × aéroports
         
-        for date in dates:
-            for code, info in self.aeroports.items():
-                # Base de passagers pré-COVID
-                base_passagers = info['capacite_passagers'] * 0.7  # 70% de capacité utilisée
-                
-                # Impact COVID (2020-2021)
-                if date.year == 2020:
-                    covid_impact = random.uniform(0.2, 0.4)  # Réduction de 60-80%
-                elif date.year == 2021:
-                    covid_impact = random.uniform(0.4, 0.7)  # Réduction de 30-60%
-                elif date.year == 2022:
-                    covid_impact = random.uniform(0.7, 0.9)  # Réduction de 10-30%
-                else:
-                    covid_impact = random.uniform(0.9, 1.1)  # Récupération
-                
-                # Saisonnalité
-                if date.month in [6, 7, 8]:  # Été
-                    saison_factor = 1.2
-                elif date.month in [12, 1]:  # Hiver (fêtes)
-                    saison_factor = 1.1
-                else:
-                    saison_factor = 1.0
-                
-                passagers_mois = base_passagers / 12 * covid_impact * saison_factor * random.uniform(0.95, 1.05)
-                
-                data.append({
-                    'date': date,
-                    'aeroport': code,
-                    'passagers': passagers_mois,
-                    'region': info['region'],
-                    'vols_mois': random.randint(5000, 50000),
-                    'taux_remplissage': random.uniform(0.6, 0.95)
-                })
+        frequence: 'mensuelle' ou 'quotidienne'. Les passagers et les vols (colonne
+        'vols_mois') sont ceux de la période; aeroports vaut par défaut self.aeroports.
+        """
+        aeroports = self.aeroports if aeroports is None else aeroports
+        alias, periodes_par_an = self.FREQUENCES_TRAFIC[frequence]
+        dates = pd.date_range(date_debut, date_fin if date_fin is not None else datetime.now(), freq=alias)
+        rng = self.rng
+        taille = (len(dates), len(aeroports))
         
-        return pd.DataFrame(data)
+        codes = np.array(list(aeroports.keys()), dtype=object)
+        regions = np.array([info['region'] for info in aeroports.values()], dtype=object)
+        # Base de passagers pré-COVID: 70% de capacité utilisée, répartie sur l'année
+        base_passagers = np.array([info['capacite_passagers'] for info in aeroports.values()], dtype=float) * 0.7
+        
+        # Impact COVID: bornes du tirage uniforme, tables indexées par année
+        annees, rang_annee = np.unique(dates.year, return_inverse=True)
+        bornes = np.array([self.IMPACT_COVID.get(annee, self.IMPACT_COVID_DEFAUT) for annee in annees]).reshape(-1, 2)
+        bas, haut = bornes[rang_annee, 0][:, None], bornes[rang_annee, 1][:, None]
+        covid_impact = bas + (haut - bas) * rng.random(taille)
+        
+        # Saisonnalité, table indexée par mois
+        saison_factor = self.SAISONNALITE[dates.month.to_numpy() - 1][:, None]
+        
+        passagers = base_passagers / periodes_par_an * covid_impact * saison_factor * rng.uniform(0.95, 1.05, taille)
+        vols = np.rint(rng.integers(5000, 50001, taille) * 12 / periodes_par_an).astype(np.int64)
+        
+        return pd.DataFrame({
+            'date': np.repeat(dates, len(codes)),
+            'aeroport': np.tile(codes, len(dates)),
+            'passagers': passagers.ravel(),
+            'region': np.tile(regions, len(dates)),
+            'vols_mois': vols.ravel(),
+            'taux_remplissage': rng.uniform(0.6, 0.95, taille).ravel()
+        })
+    
+    def generer_aeroports_synthetiques(self, nb_aeroports):
+        """Complète les aéroports réels par des aéroports fictifs, pour les tests de charge"""
+        aeroports = dict(self.aeroports)
+        regions = sorted({info['region'] for info in self.aeroports.values()})
+        couleurs = px.colors.qualitative.Alphabet
+        rng = self.rng
+        for i in range(nb_aeroports - len(aeroports)):
+            code = f'X{i:03d}'
+            aeroports[code] = {
+                'nom_complet': f'Aéroport {code}',
+                'ville': code,
+                'region': regions[i % len(regions)],
+                'code_iata': code,
+                'capacite_passagers': int(rng.lognormal(14, 1)),
+                'pistes': int(rng.integers(1, 3)),
+                'terminales': int(rng.integers(1, 3)),
+                'couleur': couleurs[i % len(couleurs)],
+                'latitude': float(rng.uniform(42.5, 51)),
+                'longitude': float(rng.uniform(-4.5, 8))
+            }
+        return aeroports
     
     def initialize_airlines_data(self):
         """Initialise les données des compagnies aériennes"""
@@ -275,28 +931,77 @@ class AeroportsFranceDashboard:
         
         return pd.DataFrame(data)
     
-    def update_live_data(self):
-        """Met à jour les données en temps réel"""
-        # CORRECTION: Conversion explicite des numpy.int64 en int natif
-        for idx in self.vols_data.index:
-            if random.random() < 0.1:  # 10% de chance de changement de statut
-                nouveaux_statuts = ['À l\'heure', 'Retardé', 'Annulé']
-                poids = [0.6, 0.35, 0.05]
-                nouveau_statut = random.choices(nouveaux_statuts, weights=poids)[0]
-                
-                self.vols_data.loc[idx, 'statut'] = nouveau_statut
-                if nouveau_statut == 'Retardé':
-                    # CORRECTION: Conversion en int natif
-                    retard_minutes = int(random.randint(5, 120))
-                    self.vols_data.loc[idx, 'retard_minutes'] = retard_minutes
-                    self.vols_data.loc[idx, 'heure_depart_estimee'] = (
-                        self.vols_data.loc[idx, 'heure_depart_programmee'] + 
-                        timedelta(minutes=retard_minutes)  # Utilisation de l'int natif
-                    )
-                else:
-                    self.vols_data.loc[idx, 'retard_minutes'] = 0
-                    self.vols_data.loc[idx, 'heure_depart_estimee'] = self.vols_data.loc[idx, 'heure_depart_programmee']
+    def brancher_source(self, source):
+        """Remplace la simulation par une source d'événements ingérée en arrière-plan"""
+        if self.ingestion is not None:
+            self.ingestion.arreter()
+        self.ingestion = ingestion.IngestionVols(source, self.libelles_vol_id(self.vols_data).to_numpy(),
+                                                 self.STATUTS).demarrer()
+    
+    @chronometre('update_live_data', profilage.lignes_delta)
+    def update_live_data(self, maintenant=None):
+        """Met à jour les données en temps réel (tick de la simulation des rotations)
+        
+        maintenant: heure jusqu'à laquelle avancer la simulation (heure courante par défaut).
+        """
+        # Avec une source branchée, seuls les lots déjà ingérés sont appliqués
+        if self.ingestion is not None:
+            return self.ingestion.drainer(self)
+        
+        # Simulation des rotations: l'horloge, partie de l'heure courante, suit l'heure réelle
+        # quel que soit l'intervalle entre deux ticks, et les retards se propagent d'un vol à l'autre
+        maintenant = pd.Timestamp.now() if maintenant is None else maintenant
+        if self.simulation is None:
+            self.simulation = simulation.SimulationRotations(self.plan_rotations(), self.STATUTS, self.rng,
+                                                             debut=maintenant)
+        positions, nouveaux_statuts, retards = self.simulation.avancer_jusqua(maintenant)
+        return self.appliquer_changements_statut(positions, nouveaux_statuts, retards)
+    
+    def appliquer_changements_statut(self, positions, nouveaux_statuts, retards):
+        """Écrit en bloc de nouveaux statuts/retards et renvoie le delta des lignes modifiées
+        
+        positions: positions de ligne dans vols_data, nouveaux_statuts: codes dans STATUTS,
+        retards: minutes de retard. Le delta est un dict de tableaux alignés sur les lignes
+        réellement modifiées (positions, anciens et nouveaux statuts et retards).
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        nouveaux_statuts = np.asarray(nouveaux_statuts, dtype=np.int8)
+        retards = np.asarray(retards, dtype=np.int64)
+        
+        codes_statut = self.vols_data['statut'].cat.codes.to_numpy(copy=True)
+        retard_minutes = self.vols_data['retard_minutes'].to_numpy(copy=True)
+        anciens_statuts = codes_statut[positions]
+        anciens_retards = retard_minutes[positions]
+        
+        # Seules les lignes dont le statut ou le retard change sont écrites et renvoyées
+        modifie = (anciens_statuts != nouveaux_statuts) | (anciens_retards != retards)
+        delta = {
+            'positions': positions[modifie],
+            'ancien_statut': anciens_statuts[modifie],
+            'nouveau_statut': nouveaux_statuts[modifie],
+            'ancien_retard': anciens_retards[modifie],
+            'nouveau_retard': retards[modifie]
+        }
+        if len(delta['positions']) == 0:
+            return delta
+        
+        positions = delta['positions']
+        codes_statut[positions] = delta['nouveau_statut']
+        retard_minutes[positions] = delta['nouveau_retard']
+        heure_estimee = self.vols_data['heure_depart_estimee'].to_numpy(copy=True)
+        heure_programmee = self.vols_data['heure_depart_programmee'].to_numpy()
+        heure_estimee[positions] = heure_programmee[positions] + delta['nouveau_retard'].astype('timedelta64[m]')
+        
+        # Réécriture par colonnes entières plutôt que cellule par cellule
+        self.vols_data['statut'] = pd.Categorical.from_codes(codes_statut, self.STATUTS)
+        self.vols_data['retard_minutes'] = retard_minutes
+        self.vols_data['heure_depart_estimee'] = heure_estimee
+        self.agregats.appliquer_delta(delta)
+        self.index_filtres.appliquer_delta(delta)
+        self.version_vols += 1
+        return delta
     
+    @chronometre('display_header')
     def display_header(self):
         """Affiche l'en-tête du dashboard"""
         st.markdown('<h1 class="main-header">🛫 Analyse des Aéroports Français - Live</h1>', 
@@ -307,44 +1012,57 @@ class AeroportsFranceDashboard:
             st.markdown('<div class="live-badge">🔴 DONNÉES EN TEMPS RÉEL - MISES À JOUR CONTINUES</div>', 
                        unsafe_allow_html=True)
             st.markdown("**Surveillance en direct du trafic aérien français et analyse des performances**")
+    
+    def metriques_cles(self, vue):
+        """Métriques clés de la sélection: vols, retardés, annulés, taux de ponctualité, passagers estimés"""
+        # Calcul des métriques en temps réel à partir des agrégats
+        par_statut = self.agregats_vue(vue).par_statut()
+        vols_aujourdhui = int(par_statut.sum())
+        vols_retardes = int(par_statut['Retardé'])
+        vols_annules = int(par_statut['Annulé'])
+        taux_ponctualite = ((vols_aujourdhui - vols_retardes - vols_annules) / vols_aujourdhui * 100) if vols_aujourdhui > 0 else 0
         
-        current_time = datetime.now().strftime('%H:%M:%S')
-        st.sidebar.markdown(f"**🕐 Dernière mise à jour: {current_time}**")
+        # Estimation des passagers aujourd'hui
+        passagers = self.traffic_data['passagers'].to_numpy()[vue['positions_trafic']]
+        passagers_estimes = int(passagers.mean() / 30) if len(passagers) else 0  # Moyenne mensuelle divisée par 30
+        return {
+            'vols': vols_aujourdhui,
+            'vols_retardes': vols_retardes,
+            'vols_annules': vols_annules,
+            'taux_ponctualite': taux_ponctualite,
+            'passagers_estimes': passagers_estimes
+        }
     
-    def display_key_metrics(self):
-        """Affiche les métriques clés du trafic aérien"""
+    @chronometre('display_key_metrics', profilage.lignes_vue)
+    def display_key_metrics(self, vue):
+        """Affiche les métriques clés du trafic aérien pour la sélection courante"""
         st.markdown('<h3 class="section-header">📊 INDICATEURS CLÉS DU TRAFIC AÉRIEN</h3>', 
                    unsafe_allow_html=True)
         
-        # Calcul des métriques en temps réel
-        vols_aujourdhui = len(self.vols_data)
-        vols_retardes = len(self.vols_data[self.vols_data['statut'] == 'Retardé'])
-        vols_annules = len(self.vols_data[self.vols_data['statut'] == 'Annulé'])
-        taux_ponctualite = ((vols_aujourdhui - vols_retardes - vols_annules) / vols_aujourdhui * 100) if vols_aujourdhui > 0 else 0
-        
-        # Estimation des passagers aujourd'hui
-        passagers_estimes = int(self.traffic_data['passagers'].mean() / 30)  # Moyenne mensuelle divisée par 30
+        metriques = self.metriques_cles(vue)
+        current_time = datetime.now().strftime('%H:%M:%S')
+        st.caption(f"🕐 Dernière mise à jour: {current_time}")
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric(
                 "Vols Programmés Aujourd'hui",
-                f"{vols_aujourdhui}",
+                f"{metriques['vols']}",
                 f"{random.randint(-5, 10)} vs hier"
             )
         
         with col2:
             st.metric(
                 "Taux de Ponctualité",
-                f"{taux_ponctualite:.1f}%",
+                f"{metriques['taux_ponctualite']:.1f}%",
                 f"{random.uniform(-2, 3):.1f}% vs hier"
             )
         
         with col3:
             st.metric(
                 "Vols Retardés",
-                f"{vols_retardes}",
+                f"{metriques['vols_retardes']}",
                 f"{random.randint(-3, 5)} vs hier",
                 delta_color="inverse"
             )
@@ -352,418 +1070,713 @@ class AeroportsFranceDashboard:
         with col4:
             st.metric(
                 "Passagers Estimés Aujourd'hui",
-                f"{passagers_estimes:,}",
+                f"{metriques['passagers_estimes']:,}",
                 f"{random.randint(1000, 5000)} vs hier"
             )
     
-    def create_aeroports_overview(self):
-        """Crée la vue d'ensemble des aéroports"""
+    def instantane_aeroports(self, vue):
+        """Table d'une ligne par aéroport de la vue: attributs statiques, dernier trafic mensuel
+        de la période et vols du jour
+        
+        Reconstruite seulement quand la sélection, les données de trafic ou l'état des vols ont changé.
+        """
+        cle = (vue['cle'], self.version_vols)
+        if self._instantane is not None and self._instantane[0] == cle:
+            return self._instantane[1]
+        
+        attributs = pd.DataFrame.from_dict(self.aeroports, orient='index').loc[vue['aeroports']]
+        attributs.index.name = 'aeroport'
+        
+        # Dernier mois de trafic de la période, une ligne par aéroport
+        trafic = self.traffic_data.iloc[vue['positions_trafic']]
+        dernier_trafic = (trafic.loc[trafic['date'] == trafic['date'].max(),
+                                     ['aeroport', 'passagers', 'taux_remplissage', 'vols_mois']]
+                          .astype({'aeroport': str}).set_index('aeroport'))
+        
+        # Vols du jour par aéroport de départ, lus dans les agrégats
+        vols = (self.agregats_vue(vue).performance('aeroport_depart')
+                .set_index('aeroport_depart')[['nb_vols', 'retard_moyen']]
+                .rename(columns={'nb_vols': 'vols_jour'}))
+        
+        instantane = attributs.join(dernier_trafic).join(vols)
+        instantane['vols_jour'] = instantane['vols_jour'].fillna(0).astype(int)
+        instantane = instantane.reset_index()
+        self._instantane = (cle, instantane)
+        return instantane
+    
+    def figure(self, identifiant, vue, *parametres):
+        """Figure `identifiant`, reconstruite seulement quand ses entrées ont changé
+        
+        La clé de cache réunit l'identifiant, les compteurs de version des données dont
+        dépend la figure, la sélection de la vue et les `parametres` du graphique.
+        """
+        dependance = self.DEPENDANCES_FIGURES[identifiant]
+        cle = (identifiant, self.version_statique) + parametres
+        if dependance in ('vue', 'live', 'scenarios'):
+            cle += (vue['cle'],)
+        if dependance == 'live':
+            cle += (self.version_vols,)
+        construire = getattr(self, 'figure_' + identifiant)
+        return self.cache_figures.obtenir(cle, lambda: construire(vue, *parametres))
+    
+    def afficher_figure(self, identifiant, vue, *parametres):
+        """Affiche une figure du cache; avec le profilage actif, mesure sa construction,
+        son envoi au navigateur et la taille de sa représentation JSON"""
+        if not self.profileur.actif:
+            st.plotly_chart(self.figure(identifiant, vue, *parametres), use_container_width=True)
+            return
+        debut = time.perf_counter()
+        fig = self.figure(identifiant, vue, *parametres)
+        construction = time.perf_counter() - debut
+        debut = time.perf_counter()
+        st.plotly_chart(fig, use_container_width=True)
+        envoi = time.perf_counter() - debut
+        self.profileur.enregistrer(f'figure:{identifiant}', construction, octets=len(fig.to_json()))
+        self.profileur.enregistrer(f'envoi:{identifiant}', envoi)
+    
+    def figure_trafic_aeroports(self, vue):
+        """Trafic mensuel des passagers par aéroport"""
+        instantane = self.instantane_aeroports(vue)
+        fig = px.bar(instantane, 
+                    x='aeroport', 
+                    y='passagers',
+                    title='Trafic Mensuel des Passagers par Aéroport',
+                    color='aeroport',
+                    color_discrete_map=dict(zip(instantane['aeroport'], instantane['couleur'])))
+        fig.update_layout(xaxis_title="Aéroport", yaxis_title="Passagers")
+        return fig
+    
+    def figure_trafic_regions(self, vue):
+        """Répartition du trafic par région"""
+        instantane = self.instantane_aeroports(vue)
+        region_traffic = instantane.groupby('region')['passagers'].sum().reset_index()
+        return px.pie(region_traffic, 
+                     values='passagers', 
+                     names='region',
+                     title='Répartition du Trafic par Région')
+    
+    def figure_remplissage_aeroports(self, vue):
+        """Taux de remplissage par aéroport"""
+        instantane = self.instantane_aeroports(vue)
+        fig = px.bar(instantane, 
+                    x='aeroport', 
+                    y='taux_remplissage',
+                    title='Taux de Remplissage par Aéroport (%)',
+                    color='aeroport',
+                    color_discrete_map=dict(zip(instantane['aeroport'], instantane['couleur'])))
+        fig.update_layout(yaxis_tickformat='.0%')
+        return fig
+    
+    def figure_vols_mois_aeroports(self, vue):
+        """Nombre de vols par mois et par aéroport"""
+        instantane = self.instantane_aeroports(vue)
+        return px.bar(instantane, 
+                     x='aeroport', 
+                     y='vols_mois',
+                     title='Nombre de Vols par Mois',
+                     color='aeroport',
+                     color_discrete_map=dict(zip(instantane['aeroport'], instantane['couleur'])))
+    
+    def figure_carte_aeroports(self, vue):
+        """Carte des aéroports français"""
+        instantane = self.instantane_aeroports(vue)
+        df_map = instantane.assign(nom=instantane['nom_complet'],
+                                   passagers=instantane['passagers'].fillna(0),
+                                   taille=instantane['capacite_passagers'] / 1000000)  # Taille relative
+        
+        fig = px.scatter_mapbox(df_map, 
+                              lat="latitude", 
+                              lon="longitude", 
+                              size="taille",
+                              color="region",
+                              hover_name="nom",
+                              hover_data={"passagers": True, "region": True},
+                              size_max=30,
+                              zoom=5,
+                              title="Carte des Aéroports Français")
+        
+        fig.update_layout(mapbox_style="open-street-map")
+        fig.update_layout(margin={"r":0,"t":30,"l":0,"b":0}, height=600)
+        return fig
+    
+    @chronometre('create_aeroports_overview', profilage.lignes_vue)
+    def create_aeroports_overview(self, vue):
+        """Crée la vue d'ensemble des aéroports sélectionnés"""
         st.markdown('<h3 class="section-header">🏛️ VUE D\'ENSEMBLE DES AÉROPORTS</h3>', 
                    unsafe_allow_html=True)
         
-        # Dernières données de trafic
-        latest_traffic = self.traffic_data[self.traffic_data['date'] == self.traffic_data['date'].max()]
-        
-        tab1, tab2, tab3, tab4 = st.tabs(["Trafic Passagers", "Performance Opérationnelle", "Carte Interactive", "Détails par Aéroport"])
+        tab1, tab2, tab3, tab4 = self.onglets(["Trafic Passagers", "Performance Opérationnelle", "Carte Interactive", "Détails par Aéroport"],
+                                              'onglets_aeroports')
         
-        with tab1:
-            col1, col2 = st.columns(2)
+        if self.onglet_ouvert(tab1):
+            with tab1:
+                col1, col2 = st.columns(2)
             
-            with col1:
-                # Trafic passagers par aéroport
-                fig = px.bar(latest_traffic, 
-                            x='aeroport', 
-                            y='passagers',
-                            title='Trafic Mensuel des Passagers par Aéroport',
-                            color='aeroport',
-                            color_discrete_map={code: info['couleur'] for code, info in self.aeroports.items()})
-                fig.update_layout(xaxis_title="Aéroport", yaxis_title="Passagers")
-                st.plotly_chart(fig, use_container_width=True)
+                with col1:
+                    # Trafic passagers par aéroport
+                    self.afficher_figure('trafic_aeroports', vue)
             
-            with col2:
-                # Répartition par région
-                region_traffic = latest_traffic.groupby('region')['passagers'].sum().reset_index()
-                fig = px.pie(region_traffic, 
-                            values='passagers', 
-                            names='region',
-                            title='Répartition du Trafic par Région')
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab2:
-            col1, col2 = st.columns(2)
+                with col2:
+                    # Répartition par région
+                    self.afficher_figure('trafic_regions', vue)
+        
+        if self.onglet_ouvert(tab2):
+            with tab2:
+                col1, col2 = st.columns(2)
             
-            with col1:
-                # Taux de remplissage
-                fig = px.bar(latest_traffic, 
-                            x='aeroport', 
-                            y='taux_remplissage',
-                            title='Taux de Remplissage par Aéroport (%)',
-                            color='aeroport',
-                            color_discrete_map={code: info['couleur'] for code, info in self.aeroports.items()})
-                fig.update_layout(yaxis_tickformat='.0%')
-                st.plotly_chart(fig, use_container_width=True)
+                with col1:
+                    # Taux de remplissage
+                    self.afficher_figure('remplissage_aeroports', vue)
             
-            with col2:
-                # Nombre de vols par mois
-                fig = px.bar(latest_traffic, 
-                            x='aeroport', 
-                            y='vols_mois',
-                            title='Nombre de Vols par Mois',
-                            color='aeroport',
-                            color_discrete_map={code: info['couleur'] for code, info in self.aeroports.items()})
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
-            # Carte des aéroports français
-            map_data = []
-            for code, info in self.aeroports.items():
-                airport_traffic = latest_traffic[latest_traffic['aeroport'] == code]
-                map_data.append({
-                    'aeroport': code,
-                    'nom': info['nom_complet'],
-                    'latitude': info['latitude'],
-                    'longitude': info['longitude'],
-                    'passagers': airport_traffic['passagers'].iloc[0] if len(airport_traffic) > 0 else 0,
-                    'region': info['region'],
-                    'taille': info['capacite_passagers'] / 1000000  # Taille relative
+                with col2:
+                    # Nombre de vols par mois
+                    self.afficher_figure('vols_mois_aeroports', vue)
+        
+        if self.onglet_ouvert(tab3):
+            with tab3:
+                # Carte des aéroports français
+                self.afficher_figure('carte_aeroports', vue)
+        
+        if self.onglet_ouvert(tab4):
+            with tab4:
+                # Tableau détaillé des aéroports (dernier mois de trafic et vols du jour)
+                instantane = self.instantane_aeroports(vue)
+                details = instantane[instantane['passagers'].notna() & (instantane['vols_jour'] > 0)]
+                airport_details = pd.DataFrame({
+                    'Aéroport': details['nom_complet'],
+                    'Code IATA': details['aeroport'],
+                    'Région': details['region'],
+                    'Passagers Mensuels': details['passagers'].map('{:,.0f}'.format),
+                    'Taux Remplissage': details['taux_remplissage'].map('{:.1%}'.format),
+                    'Vols Aujourd\'hui': details['vols_jour'],
+                    'Retard Moyen (min)': details['retard_moyen'].map('{:.1f}'.format),
+                    'Pistes': details['pistes'],
+                    'Terminaux': details['terminales']
                 })
             
-            df_map = pd.DataFrame(map_data)
-            
-            fig = px.scatter_mapbox(df_map, 
-                                  lat="latitude", 
-                                  lon="longitude", 
-                                  size="taille",
-                                  color="region",
-                                  hover_name="nom",
-                                  hover_data={"passagers": True, "region": True},
-                                  size_max=30,
-                                  zoom=5,
-                                  title="Carte des Aéroports Français")
-            
-            fig.update_layout(mapbox_style="open-street-map")
-            fig.update_layout(margin={"r":0,"t":30,"l":0,"b":0}, height=600)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with tab4:
-            # Tableau détaillé des aéroports
-            airport_details = []
-            for code, info in self.aeroports.items():
-                airport_traffic = latest_traffic[latest_traffic['aeroport'] == code]
-                airport_flights = self.vols_data[self.vols_data['aeroport_depart'] == code]
-                
-                if len(airport_traffic) > 0 and len(airport_flights) > 0:
-                    # CORRECTION: Conversion en int natif pour l'affichage
-                    retard_moyen = float(airport_flights['retard_minutes'].mean())
-                    airport_details.append({
-                        'Aéroport': info['nom_complet'],
-                        'Code IATA': code,
-                        'Région': info['region'],
-                        'Passagers Mensuels': f"{airport_traffic['passagers'].iloc[0]:,.0f}",
-                        'Taux Remplissage': f"{airport_traffic['taux_remplissage'].iloc[0]:.1%}",
-                        'Vols Aujourd\'hui': len(airport_flights),
-                        'Retard Moyen (min)': f"{retard_moyen:.1f}",
-                        'Pistes': info['pistes'],
-                        'Terminaux': info['terminales']
-                    })
-            
-            st.dataframe(pd.DataFrame(airport_details), use_container_width=True)
+                st.dataframe(airport_details.reset_index(drop=True), use_container_width=True)
     
-    def create_vols_live(self):
-        """Affiche les vols en temps réel"""
+    def performance_par(self, axe='compagnie', positions=None):
+        """Performance des vols ventilée selon `axe`, calculée en un seul passage groupé
+        
+        Renvoie une ligne par valeur présente de `axe` avec le nombre de vols, les taux de
+        ponctualité et d'annulation (%), le retard moyen sur tous les vols et les centiles
+        p50/p90/p99 des durées de retard des vols retardés. `positions` restreint le calcul
+        à un sous-ensemble de lignes de vols_data.
+        """
+        colonne = self.vols_data[axe]
+        groupes = colonne.cat.codes.to_numpy().astype(np.int64)
+        statuts = self.vols_data['statut'].cat.codes.to_numpy().astype(np.int64)
+        retards = self.vols_data['retard_minutes'].to_numpy().astype(np.int64)
+        if positions is not None:
+            groupes, statuts, retards = groupes[positions], statuts[positions], retards[positions]
+        nb_groupes = len(colonne.cat.categories)
+        nb_statuts = len(self.STATUTS)
+        
+        nb = np.bincount(groupes, minlength=nb_groupes)
+        par_statut = np.bincount(groupes * nb_statuts + statuts,
+                                 minlength=nb_groupes * nb_statuts).reshape(nb_groupes, nb_statuts)
+        somme_retards = np.bincount(groupes, weights=retards, minlength=nb_groupes)
+        diviseur = np.maximum(nb, 1)
+        resultat = pd.DataFrame({
+            axe: colonne.cat.categories,
+            'nb_vols': nb,
+            'taux_ponctualite': par_statut[:, self.STATUTS.index('À l\'heure')] / diviseur * 100,
+            'retard_moyen': somme_retards / diviseur,
+            'taux_annulation': par_statut[:, self.STATUTS.index('Annulé')] / diviseur * 100
+        })
+        
+        # Centiles: un seul tri sur la clé (groupe, retard), puis interpolation linéaire
+        # dans le segment trié de chaque groupe
+        retardes = statuts == self.STATUTS.index('Retardé')
+        base = int(retards.max()) + 1 if len(retards) else 1
+        cles = np.sort(groupes[retardes] * base + retards[retardes])
+        retards_tries = cles % base
+        nb_retardes = np.bincount(groupes[retardes], minlength=nb_groupes)
+        debuts = np.cumsum(nb_retardes) - nb_retardes
+        presents = nb_retardes > 0
+        for centile in (50, 90, 99):
+            rang = debuts + centile / 100 * np.maximum(nb_retardes - 1, 0)
+            bas = np.floor(rang).astype(np.int64)
+            haut = np.minimum(bas + 1, debuts + np.maximum(nb_retardes - 1, 0))
+            valeurs = np.full(nb_groupes, np.nan)
+            if presents.any():
+                fraction = (rang - bas)[presents]
+                valeurs[presents] = (retards_tries[bas[presents]] * (1 - fraction)
+                                     + retards_tries[haut[presents]] * fraction)
+            resultat[f'retard_p{centile}'] = valeurs
+        
+        return resultat[nb > 0].reset_index(drop=True)
+    
+    @chronometre('afficher_tableau_vols', profilage.lignes_tableau)
+    def afficher_tableau_vols(self, positions):
+        """Affiche les vols aux positions données dans un unique st.dataframe trié et paginé côté serveur"""
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            tri = st.selectbox("Trier par:", list(self.COLONNES_TRI))
+        with col2:
+            decroissant = st.selectbox("Ordre:", ['Croissant', 'Décroissant']) == 'Décroissant'
+        with col3:
+            taille_page = st.selectbox("Vols par page:", [25, 50, 100], index=1)
+        nb_pages = max(1, -(-len(positions) // taille_page))
+        with col4:
+            page = int(st.number_input("Page:", min_value=1, max_value=nb_pages, value=1, step=1))
+        page = min(page, nb_pages)
+        
+        page_vols = self.page_vols(positions, self.COLONNES_TRI[tri], decroissant, page, taille_page)
+        st.dataframe(self.formater_vols(page_vols).style.apply(self.styles_statut, axis=None),
+                     hide_index=True, use_container_width=True)
+        st.caption(f"{len(positions):,} vols · page {page}/{nb_pages}")
+    
+    def page_vols(self, positions, colonne_tri, decroissant=False, page=1, taille_page=50):
+        """Lignes de vols_data d'une page des vols aux `positions`, triés sur `colonne_tri`"""
+        # Clé de tri numérique (codes de catégories, dates en int64)
+        colonne = self.vols_data[colonne_tri]
+        if isinstance(colonne.dtype, pd.CategoricalDtype):
+            cle = colonne.cat.codes.to_numpy()[positions].astype(np.int64)
+        else:
+            cle = colonne.to_numpy()[positions].astype(np.int64)
+        if decroissant:
+            cle = -cle
+        
+        # Sélection partielle: seules les lignes jusqu'à la fin de la page sont triées
+        debut, fin = (page - 1) * taille_page, min(page * taille_page, len(positions))
+        if fin < len(cle):
+            candidats = np.argpartition(cle, fin - 1)[:fin]
+        else:
+            candidats = np.arange(len(cle))
+        positions_page = candidats[np.argsort(cle[candidats], kind='stable')][debut:fin]
+        return self.vols_data.iloc[positions[positions_page]]
+    
+    def formater_vols(self, vols):
+        """Construit les libellés d'affichage d'une page de vols avec des opérations vectorisées"""
+        noms_aeroports = {code: info['nom_complet'] for code, info in self.aeroports.items()}
+        retarde = (vols['statut'] == 'Retardé').to_numpy()
+        heure_prog = vols['heure_depart_programmee'].dt.strftime('%H:%M')
+        heure_est = (' → ' + vols['heure_depart_estimee'].dt.strftime('%H:%M')
+                     + ' (+' + vols['retard_minutes'].astype(str) + 'min)')
+        return pd.DataFrame({
+            'Vol': self.libelles_vol_id(vols).to_numpy(),
+            'Compagnie': vols['compagnie'].astype(str).to_numpy(),
+            'Trajet': (vols['aeroport_depart'].astype(str).map(noms_aeroports) + ' → '
+                       + vols['aeroport_arrivee'].astype(str)).to_numpy(),
+            'Horaire': (heure_prog + heure_est.where(retarde, '')).to_numpy(),
+            'Porte': self.libelles_porte(vols).to_numpy(),
+            'Statut': vols['statut'].astype(str).to_numpy()
+        })
+    
+    def styles_statut(self, tableau):
+        """Couleurs des lignes selon le statut du vol (mêmes teintes que les classes CSS)"""
+        couleurs = tableau['Statut'].map(self.COULEURS_STATUT).fillna('').to_numpy()
+        return pd.DataFrame(np.repeat(couleurs[:, None], tableau.shape[1], axis=1),
+                            index=tableau.index, columns=tableau.columns)
+    
+    @chronometre('create_vols_live', profilage.lignes_vue)
+    def create_vols_live(self, vue):
+        """Affiche les vols en temps réel de la sélection courante"""
         st.markdown('<h3 class="section-header">✈️ VOLS EN TEMPS RÉEL</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Tableau des Vols", "Statistiques Temps Réel", "Analyse des Retards"])
-        
-        with tab1:
-            # Filtres pour les vols
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                aeroport_filtre = st.selectbox("Aéroport de départ:", 
-                                             ['Tous'] + list(self.aeroports.keys()))
-            with col2:
-                statut_filtre = st.selectbox("Statut:", 
-                                           ['Tous', 'À l\'heure', 'Retardé', 'Annulé'])
-            with col3:
-                type_vol_filtre = st.selectbox("Type de vol:", 
-                                             ['Tous', 'Domestique', 'International'])
-            
-            # Application des filtres
-            vols_filtres = self.vols_data.copy()
-            if aeroport_filtre != 'Tous':
-                vols_filtres = vols_filtres[vols_filtres['aeroport_depart'] == aeroport_filtre]
-            if statut_filtre != 'Tous':
-                vols_filtres = vols_filtres[vols_filtres['statut'] == statut_filtre]
-            if type_vol_filtre != 'Tous':
-                vols_filtres = vols_filtres[vols_filtres['type_vol'] == type_vol_filtre]
-            
-            # Affichage des vols
-            for _, vol in vols_filtres.iterrows():
-                status_class = ""
-                if vol['statut'] == 'Retardé':
-                    status_class = "delayed"
-                elif vol['statut'] == 'À l\'heure':
-                    status_class = "on-time"
-                elif vol['statut'] == 'Annulé':
-                    status_class = "cancelled"
-                
-                col1, col2, col3, col4 = st.columns([1, 2, 2, 1])
+        tab1, tab2, tab3 = self.onglets(["Tableau des Vols", "Statistiques Temps Réel", "Analyse des Retards"],
+                                        'onglets_vols')
+        
+        if self.onglet_ouvert(tab1):
+            with tab1:
+                # Filtres pour les vols
+                col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.markdown(f"**{vol['vol_id']}**")
+                    aeroport_filtre = st.selectbox("Aéroport de départ:", 
+                                                 ['Tous'] + vue['aeroports'])
                 with col2:
-                    st.markdown(f"**{vol['compagnie']}**")
-                    st.markdown(f"{self.aeroports[vol['aeroport_depart']]['nom_complet']} → {vol['aeroport_arrivee']}")
+                    statut_filtre = st.selectbox("Statut:", 
+                                               ['Tous', 'À l\'heure', 'Retardé', 'Annulé'])
                 with col3:
-                    heure_prog = vol['heure_depart_programmee'].strftime('%H:%M')
-                    if vol['statut'] == 'Retardé':
-                        heure_est = vol['heure_depart_estimee'].strftime('%H:%M')
-                        # CORRECTION: Conversion en int natif
-                        retard_minutes = int(vol['retard_minutes'])
-                        st.markdown(f"**{heure_prog}** → {heure_est} (+{retard_minutes}min)")
-                    else:
-                        st.markdown(f"**{heure_prog}**")
-                with col4:
-                    st.markdown(f"<div class='flight-status {status_class}'>{vol['statut']}</div>", 
-                               unsafe_allow_html=True)
-                
-                st.markdown("---")
+                    type_vol_filtre = st.selectbox("Type de vol:", 
+                                                 ['Tous', 'Domestique', 'International'])
+            
+                # Application des filtres par l'index, sans copie de la table
+                criteres = {
+                    'aeroport_depart': aeroport_filtre,
+                    'statut': statut_filtre,
+                    'type_vol': type_vol_filtre
+                }
+                positions = self.index_filtres.rechercher(
+                    {dimension: valeur for dimension, valeur in criteres.items() if valeur != 'Tous'},
+                    dans=vue['positions_vols'])
+            
+                # Affichage des vols: un seul tableau paginé côté serveur
+                self.afficher_tableau_vols(positions)
         
-        with tab2:
-            col1, col2 = st.columns(2)
+        if self.onglet_ouvert(tab2):
+            with tab2:
+                col1, col2 = st.columns(2)
             
-            with col1:
-                # Répartition des statuts
-                status_counts = self.vols_data['statut'].value_counts()
-                fig = px.pie(values=status_counts.values, 
-                            names=status_counts.index,
-                            title='Répartition des Statuts de Vol')
-                st.plotly_chart(fig, use_container_width=True)
+                with col1:
+                    # Répartition des statuts
+                    self.afficher_figure('repartition_statuts', vue)
             
-            with col2:
-                # Retards par compagnie
-                delays_by_airline = self.vols_data[self.vols_data['statut'] == 'Retardé'].groupby('compagnie')['retard_minutes'].mean().reset_index()
-                # CORRECTION: Conversion en float pour Plotly
-                delays_by_airline['retard_minutes'] = delays_by_airline['retard_minutes'].astype(float)
-                fig = px.bar(delays_by_airline, 
-                            x='compagnie', 
-                            y='retard_minutes',
-                            title='Retard Moyen par Compagnie (minutes)',
-                            color='retard_minutes',
-                            color_continuous_scale='Reds')
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
-            col1, col2 = st.columns(2)
+                with col2:
+                    # Retards par compagnie
+                    self.afficher_figure('retards_compagnies', vue)
+        
+        if self.onglet_ouvert(tab3):
+            with tab3:
+                col1, col2 = st.columns(2)
             
-            with col1:
-                # Retards par aéroport
-                delays_by_airport = self.vols_data[self.vols_data['statut'] == 'Retardé'].groupby('aeroport_depart')['retard_minutes'].mean().reset_index()
-                # CORRECTION: Conversion en float pour Plotly
-                delays_by_airport['retard_minutes'] = delays_by_airport['retard_minutes'].astype(float)
-                fig = px.bar(delays_by_airport, 
-                            x='aeroport_depart', 
-                            y='retard_minutes',
-                            title='Retard Moyen par Aéroport de Départ (minutes)',
-                            color='aeroport_depart',
-                            color_discrete_map={code: info['couleur'] for code, info in self.aeroports.items()})
-                st.plotly_chart(fig, use_container_width=True)
+                with col1:
+                    # Retards par aéroport
+                    self.afficher_figure('retards_aeroports', vue)
             
-            with col2:
-                # Distribution des retards
-                # CORRECTION: Conversion en list native
-                retards = self.vols_data[self.vols_data['statut'] == 'Retardé']['retard_minutes'].tolist()
-                fig = px.histogram(x=retards, 
-                                  nbins=20,
-                                  title='Distribution des Durées de Retard',
-                                  labels={'x': 'Minutes de retard'})
-                st.plotly_chart(fig, use_container_width=True)
-    
-    def create_compagnies_analysis(self):
-        """Analyse des compagnies aériennes"""
+                with col2:
+                    # Distribution des retards (histogramme tenu par les agrégats)
+                    self.afficher_figure('distribution_retards', vue)
+    
+    def figure_repartition_statuts(self, vue):
+        """Répartition des statuts de vol"""
+        status_counts = self.agregats_vue(vue).par_statut()
+        return px.pie(values=status_counts.values, 
+                     names=status_counts.index,
+                     title='Répartition des Statuts de Vol')
+    
+    def figure_retards_compagnies(self, vue):
+        """Retard moyen des vols retardés par compagnie"""
+        delays_by_airline = self.agregats_vue(vue).retard_moyen_retardes('compagnie')
+        return px.bar(delays_by_airline, 
+                     x='compagnie', 
+                     y='retard_minutes',
+                     title='Retard Moyen par Compagnie (minutes)',
+                     color='retard_minutes',
+                     color_continuous_scale='Reds')
+    
+    def figure_retards_aeroports(self, vue):
+        """Retard moyen des vols retardés par aéroport de départ"""
+        delays_by_airport = self.agregats_vue(vue).retard_moyen_retardes('aeroport_depart')
+        return px.bar(delays_by_airport, 
+                     x='aeroport_depart', 
+                     y='retard_minutes',
+                     title='Retard Moyen par Aéroport de Départ (minutes)',
+                     color='aeroport_depart',
+                     color_discrete_map={code: info['couleur'] for code, info in self.aeroports.items()})
+    
+    def figure_distribution_retards(self, vue):
+        """Distribution des durées de retard"""
+        retards = self.agregats_vue(vue).histogramme_retards()
+        fig = px.bar(retards, 
+                    x='minutes_retard', 
+                    y='nombre_vols',
+                    title='Distribution des Durées de Retard',
+                    labels={'minutes_retard': 'Minutes de retard', 'nombre_vols': 'count'})
+        fig.update_layout(bargap=0)
+        return fig
+    
+    def figure_parts_marche(self, vue=None):
+        """Parts de marché des compagnies aériennes"""
+        return px.pie(self.airlines_data, 
+                     values='part_marche', 
+                     names='compagnie',
+                     title='Parts de Marché des Compagnies Aériennes en France',
+                     color='compagnie',
+                     color_discrete_map=dict(zip(self.airlines_data['compagnie'], self.airlines_data['couleur'])))
+    
+    def figure_vols_quotidiens_compagnies(self, vue=None):
+        """Nombre de vols quotidiens par compagnie"""
+        return px.bar(self.airlines_data, 
+                     x='compagnie', 
+                     y='vols_jour',
+                     title='Nombre de Vols Quotidiens par Compagnie',
+                     color='compagnie',
+                     color_discrete_map=dict(zip(self.airlines_data['compagnie'], self.airlines_data['couleur'])))
+    
+    def performance_compagnies(self, vue):
+        """Performance par compagnie des vols de la vue, dans l'ordre de airlines_data"""
+        cle = (vue['cle'], self.version_vols)
+        if self._performance_compagnies is None or self._performance_compagnies[0] != cle:
+            # Performance des compagnies en un seul passage groupé
+            df_performance = self.performance_par('compagnie',
+                                                  None if vue['tous_vols'] else vue['positions_vols'])
+            df_performance = df_performance.set_index('compagnie')
+            df_performance = df_performance.reindex(self.airlines_data['compagnie']).dropna(subset=['nb_vols'])
+            self._performance_compagnies = (cle, df_performance.reset_index())
+        return self._performance_compagnies[1]
+    
+    def figure_ponctualite_compagnies(self, vue):
+        """Taux de ponctualité par compagnie"""
+        return px.bar(self.performance_compagnies(vue), 
+                     x='compagnie', 
+                     y='taux_ponctualite',
+                     title='Taux de Ponctualité par Compagnie (%)',
+                     color='taux_ponctualite',
+                     color_continuous_scale='Viridis')
+    
+    def figure_annulation_compagnies(self, vue):
+        """Taux d'annulation par compagnie"""
+        return px.bar(self.performance_compagnies(vue), 
+                     x='compagnie', 
+                     y='taux_annulation',
+                     title='Taux d\'Annulation par Compagnie (%)',
+                     color='taux_annulation',
+                     color_continuous_scale='Reds')
+    
+    def figure_centiles_retards_compagnies(self, vue):
+        """Centiles des durées de retard par compagnie"""
+        centiles = self.performance_compagnies(vue).melt(id_vars='compagnie', 
+                                                          value_vars=['retard_p50', 'retard_p90', 'retard_p99'],
+                                                          var_name='centile', value_name='minutes')
+        return px.bar(centiles, 
+                     x='compagnie', 
+                     y='minutes',
+                     color='centile',
+                     barmode='group',
+                     title='Centiles des Retards par Compagnie (minutes, vols retardés)')
+    
+    def top_destinations(self, vue, nombre=15):
+        """Destinations les plus desservies par les vols de la vue"""
+        arrivees = self.vols_data['aeroport_arrivee']
+        comptes = np.bincount(arrivees.cat.codes.to_numpy()[vue['positions_vols']],
+                              minlength=len(arrivees.cat.categories))
+        top = np.argsort(-comptes, kind='stable')[:nombre]
+        return pd.DataFrame({'destination': arrivees.cat.categories[top], 'nombre_vols': comptes[top]})
+    
+    def figure_top_destinations(self, vue):
+        """Top 15 des destinations des vols de la vue"""
+        return px.bar(self.top_destinations(vue), 
+                     x='nombre_vols', 
+                     y='destination',
+                     orientation='h',
+                     title='Top 15 des Destinations depuis la France',
+                     color='nombre_vols',
+                     color_continuous_scale='Blues')
+    
+    @chronometre('create_compagnies_analysis', profilage.lignes_vue)
+    def create_compagnies_analysis(self, vue):
+        """Analyse des compagnies aériennes sur les vols de la sélection courante"""
         st.markdown('<h3 class="section-header">🏢 ANALYSE DES COMPAGNIES AÉRIENNES</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Parts de Marché", "Performance", "Destinations"])
+        tab1, tab2, tab3 = self.onglets(["Parts de Marché", "Performance", "Destinations"], 'onglets_compagnies')
         
-        with tab1:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Parts de marché
-                fig = px.pie(self.airlines_data, 
-                            values='part_marche', 
-                            names='compagnie',
-                            title='Parts de Marché des Compagnies Aériennes en France',
-                            color='compagnie',
-                            color_discrete_map={row['compagnie']: row['couleur'] for _, row in self.airlines_data.iterrows()})
-                st.plotly_chart(fig, use_container_width=True)
+        if self.onglet_ouvert(tab1):
+            with tab1:
+                col1, col2 = st.columns(2)
             
-            with col2:
-                # Vols par jour
-                fig = px.bar(self.airlines_data, 
-                            x='compagnie', 
-                            y='vols_jour',
-                            title='Nombre de Vols Quotidiens par Compagnie',
-                            color='compagnie',
-                            color_discrete_map={row['compagnie']: row['couleur'] for _, row in self.airlines_data.iterrows()})
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab2:
-            # Performance des compagnies
-            performance_data = []
-            for compagnie in self.airlines_data['compagnie']:
-                vols_compagnie = self.vols_data[self.vols_data['compagnie'] == compagnie]
-                if len(vols_compagnie) > 0:
-                    # CORRECTION: Conversions en types natifs
-                    taux_ponctualite = float(len(vols_compagnie[vols_compagnie['statut'] == 'À l\'heure']) / len(vols_compagnie) * 100)
-                    retard_moyen = float(vols_compagnie['retard_minutes'].mean())
-                    taux_annulation = float(len(vols_compagnie[vols_compagnie['statut'] == 'Annulé']) / len(vols_compagnie) * 100)
-                    
-                    performance_data.append({
-                        'compagnie': compagnie,
-                        'taux_ponctualite': taux_ponctualite,
-                        'retard_moyen': retard_moyen,
-                        'taux_annulation': taux_annulation
-                    })
-            
-            df_performance = pd.DataFrame(performance_data)
+                with col1:
+                    # Parts de marché
+                    self.afficher_figure('parts_marche', vue)
             
-            col1, col2 = st.columns(2)
+                with col2:
+                    # Vols par jour
+                    self.afficher_figure('vols_quotidiens_compagnies', vue)
+        
+        if self.onglet_ouvert(tab2):
+            with tab2:
+                col1, col2 = st.columns(2)
             
-            with col1:
-                fig = px.bar(df_performance, 
-                            x='compagnie', 
-                            y='taux_ponctualite',
-                            title='Taux de Ponctualité par Compagnie (%)',
-                            color='taux_ponctualite',
-                            color_continuous_scale='Viridis')
-                st.plotly_chart(fig, use_container_width=True)
+                with col1:
+                    self.afficher_figure('ponctualite_compagnies', vue)
             
-            with col2:
-                fig = px.bar(df_performance, 
-                            x='compagnie', 
-                            y='taux_annulation',
-                            title='Taux d\'Annulation par Compagnie (%)',
-                            color='taux_annulation',
-                            color_continuous_scale='Reds')
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
-            # Destinations populaires
-            destinations_counts = self.vols_data['aeroport_arrivee'].value_counts().head(15).reset_index()
-            destinations_counts.columns = ['destination', 'nombre_vols']
+                with col2:
+                    self.afficher_figure('annulation_compagnies', vue)
             
-            fig = px.bar(destinations_counts, 
-                        x='nombre_vols', 
-                        y='destination',
-                        orientation='h',
-                        title='Top 15 des Destinations depuis la France',
-                        color='nombre_vols',
-                        color_continuous_scale='Blues')
-            st.plotly_chart(fig, use_container_width=True)
-    
-    def create_evolution_analysis(self):
-        """Analyse de l'évolution du trafic"""
+                # Centiles des durées de retard
+                self.afficher_figure('centiles_retards_compagnies', vue)
+        
+        if self.onglet_ouvert(tab3):
+            with tab3:
+                # Destinations populaires
+                self.afficher_figure('top_destinations', vue)
+    
+    def reduire_series(self, df, y, groupe=None):
+        """Sous-échantillonne des séries temporelles (colonne 'date') au budget de points d'un graphique"""
+        return sous_echantillonnage.sous_echantillonner(df, 'date', y, groupe,
+                                                        self.POINTS_MAX_GRAPHIQUE, self.POINTS_MAX_SERIE)
+    
+    def figure_trafic_total(self, vue, granularite='mois'):
+        """Évolution du trafic total des aéroports de la vue"""
+        total_traffic = self.cube_trafic().requete(granularite, 'total', vue['debut'], vue['fin'], vue['aeroports'])
+        return px.line(self.reduire_series(total_traffic, 'passagers'), 
+                      x='date', 
+                      y='passagers',
+                      title='Évolution du Trafic Aérien Total en France')
+    
+    def figure_trafic_par_aeroport(self, vue, granularite='mois'):
+        """Évolution du trafic par aéroport"""
+        trafic = self.cube_trafic().requete(granularite, 'aeroport', vue['debut'], vue['fin'], vue['aeroports'])
+        return px.line(self.reduire_series(trafic, 'passagers', 'aeroport'), 
+                      x='date', 
+                      y='passagers',
+                      color='aeroport',
+                      title='Évolution du Trafic par Aéroport',
+                      color_discrete_map={code: info['couleur'] for code, info in self.aeroports.items()})
+    
+    def figure_impact_covid(self, vue):
+        """Variation du trafic 2020-2022 par rapport à 2019, restreinte à la période de la vue"""
+        cube = self.cube_trafic()
+        debut_covid = max(pd.Timestamp('2020-01-01'), vue['debut'] or pd.Timestamp('2020-01-01'))
+        fin_covid = min(pd.Timestamp('2022-12-31'), vue['fin'] or pd.Timestamp('2022-12-31'))
+        covid_period = cube.requete('mois', 'aeroport', debut_covid, fin_covid, vue['aeroports']).copy()
+        
+        # Calcul de la variation par rapport à 2019
+        traffic_2019 = cube.requete('mois', 'aeroport', '2019-01-01', '2019-12-31', vue['aeroports'])['passagers'].mean()
+        
+        covid_period['variation_vs_2019'] = (covid_period['passagers'] - traffic_2019) / traffic_2019 * 100
+        
+        fig = px.line(self.reduire_series(covid_period, 'variation_vs_2019', 'aeroport'), 
+                     x='date', 
+                     y='variation_vs_2019',
+                     color='aeroport',
+                     title='Impact COVID-19: Variation du Trafic vs 2019 (%)',
+                     color_discrete_map={code: info['couleur'] for code, info in self.aeroports.items()})
+        fig.add_hline(y=0, line_dash="dash", line_color="red")
+        return fig
+    
+    def figure_projections(self, vue):
+        """Historique récent et projections du modèle de prévision, avec intervalles à 95%"""
+        modele = self.prevision_trafic()
+        df_projection = modele.projection(vue['aeroports'], self.HORIZON_PREVISION)
+        df_projection['type'] = 'Projection'
+        
+        # Combiner avec données historiques (mois complets uniquement)
+        debut_historique = max(pd.Timestamp('2023-01-01'), vue['debut'] or pd.Timestamp('2023-01-01'))
+        fin_historique = min(modele.dates[-1], vue['fin'] or modele.dates[-1])
+        historical = self.cube_trafic().requete('mois', 'aeroport', debut_historique, fin_historique,
+                                                vue['aeroports']).copy()
+        historical = self.reduire_series(historical, 'passagers', 'aeroport')
+        historical['type'] = 'Historique'
+        combined_data = pd.concat([historical, df_projection])
+        
+        couleurs = {code: info['couleur'] for code, info in self.aeroports.items()}
+        fig = px.line(combined_data, 
+                     x='date', 
+                     y='passagers',
+                     color='aeroport',
+                     line_dash='type',
+                     title='Projection du Trafic (intervalle de prévision à 95%)',
+                     color_discrete_map=couleurs)
+        
+        # Intervalles de prévision, un polygone par aéroport
+        fig.add_traces([go.Scatter(x=pd.concat([bande['date'], bande['date'][::-1]]),
+                                   y=pd.concat([bande['borne_haute'], bande['borne_basse'][::-1]]),
+                                   fill='toself',
+                                   fillcolor=couleurs.get(aeroport),
+                                   opacity=0.2,
+                                   line=dict(width=0),
+                                   hoverinfo='skip',
+                                   showlegend=False)
+                        for aeroport, bande in df_projection.groupby('aeroport', sort=False)])
+        return fig
+    
+    @chronometre('create_evolution_analysis', lambda self, resultat, vue: len(vue['positions_trafic']))
+    def create_evolution_analysis(self, vue):
+        """Analyse de l'évolution du trafic des aéroports et de la période sélectionnés"""
         st.markdown('<h3 class="section-header">📈 ÉVOLUTION DU TRAFIC</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Évolution Temporelle", "Impact COVID-19", "Projections"])
+        tab1, tab2, tab3 = self.onglets(["Évolution Temporelle", "Impact COVID-19", "Projections"], 'onglets_evolution')
         
-        with tab1:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Évolution du trafic total
-                total_traffic = self.traffic_data.groupby('date')['passagers'].sum().reset_index()
-                fig = px.line(total_traffic, 
-                             x='date', 
-                             y='passagers',
-                             title='Évolution du Trafic Aérien Total en France')
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                # Évolution par aéroport
-                fig = px.line(self.traffic_data, 
-                             x='date', 
-                             y='passagers',
-                             color='aeroport',
-                             title='Évolution du Trafic par Aéroport',
-                             color_discrete_map={code: info['couleur'] for code, info in self.aeroports.items()})
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab2:
-            # Analyse de l'impact COVID
-            covid_period = self.traffic_data[
-                (self.traffic_data['date'] >= '2020-01-01') & 
-                (self.traffic_data['date'] <= '2022-12-31')
-            ]
-            
-            # Calcul de la variation par rapport à 2019
-            traffic_2019 = self.traffic_data[
-                (self.traffic_data['date'] >= '2019-01-01') & 
-                (self.traffic_data['date'] <= '2019-12-31')
-            ]['passagers'].mean()
-            
-            covid_period['variation_vs_2019'] = (covid_period['passagers'] - traffic_2019) / traffic_2019 * 100
-            
-            fig = px.line(covid_period, 
-                         x='date', 
-                         y='variation_vs_2019',
-                         color='aeroport',
-                         title='Impact COVID-19: Variation du Trafic vs 2019 (%)',
-                         color_discrete_map={code: info['couleur'] for code, info in self.aeroports.items()})
-            fig.add_hline(y=0, line_dash="dash", line_color="red")
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
-            # Projections
-            st.subheader("Projections 2024-2025")
-            
-            # Simulation de projections basées sur les tendances
-            last_date = self.traffic_data['date'].max()
-            future_dates = pd.date_range(start=last_date + timedelta(days=30), periods=12, freq='M')
-            
-            projection_data = []
-            for aeroport in self.aeroports.keys():
-                last_traffic = self.traffic_data[self.traffic_data['aeroport'] == aeroport].iloc[-1]['passagers']
-                growth_rate = random.uniform(0.02, 0.05)  # Croissance de 2-5% par mois
-                
-                for i, date in enumerate(future_dates):
-                    projected_traffic = last_traffic * (1 + growth_rate) ** (i + 1)
-                    projection_data.append({
-                        'date': date,
-                        'aeroport': aeroport,
-                        'passagers': projected_traffic,
-                        'type': 'Projection'
-                    })
+        if self.onglet_ouvert(tab1):
+            with tab1:
+                granularites = {'Mois': 'mois', 'Trimestre': 'trimestre', 'Année': 'annee'}
+                granularite = granularites[st.radio("Granularité:", list(granularites), horizontal=True)]
+                col1, col2 = st.columns(2)
             
-            df_projection = pd.DataFrame(projection_data)
-            
-            # Combiner avec données historiques
-            historical = self.traffic_data[self.traffic_data['date'] >= '2023-01-01'].copy()
-            historical['type'] = 'Historique'
-            combined_data = pd.concat([historical, df_projection])
+                with col1:
+                    # Évolution du trafic total
+                    self.afficher_figure('trafic_total', vue, granularite)
             
-            fig = px.line(combined_data, 
-                         x='date', 
-                         y='passagers',
-                         color='aeroport',
-                         line_dash='type',
-                         title='Projection du Trafic 2024-2025',
-                         color_discrete_map={code: info['couleur'] for code, info in self.aeroports.items()})
-            st.plotly_chart(fig, use_container_width=True)
+                with col2:
+                    # Évolution par aéroport
+                    self.afficher_figure('trafic_par_aeroport', vue, granularite)
+        
+        if self.onglet_ouvert(tab2):
+            with tab2:
+                # Analyse de l'impact COVID, restreinte à la période sélectionnée
+                self.afficher_figure('impact_covid', vue)
+        
+        if self.onglet_ouvert(tab3):
+            with tab3:
+                # Projections du modèle Holt-Winters ajusté sur l'historique de chaque aéroport
+                st.subheader(f"Projections à {self.HORIZON_PREVISION} mois")
+                try:
+                    self.afficher_figure('projections', vue)
+                except ValueError as erreur:
+                    st.warning(f"Projections indisponibles: {erreur}")
+    
+    def distribution_scenarios(self, vue, resultats, nom, axe, mesure):
+        """Distribution d'une mesure pour le scénario `nom` et la référence, restreinte aux aéroports de la vue"""
+        noms = [nom] + (['reference'] if nom != 'reference' and 'reference' in resultats else [])
+        distributions = []
+        for scenario in noms:
+            resume = resultats[scenario]['resume']
+            resume = resume[(resume['axe'] == axe) & (resume['mesure'] == mesure)]
+            if axe == 'aeroport_depart':
+                resume = resume[resume['valeur'].isin(vue['aeroports'])]
+            distributions.append(resume.assign(scenario=resultats[scenario]['description']))
+        return pd.concat(distributions, ignore_index=True)
+    
+    def figure_scenarios(self, vue, nom, axe, mesure, signature):
+        """Médiane et intervalle p5-p95 d'une mesure sur les répliques, scénario et référence"""
+        distribution = self.distribution_scenarios(vue, charger_scenarios(REPERTOIRE_SCENARIOS, signature),
+                                                   nom, axe, mesure)
+        libelle = {valeur: cle for cle, valeur in self.MESURES_SCENARIOS.items()}[mesure]
+        return px.bar(distribution.assign(haut=distribution['p95'] - distribution['p50'],
+                                          bas=distribution['p50'] - distribution['p05']),
+                      x='valeur',
+                      y='p50',
+                      color='scenario',
+                      barmode='group',
+                      error_y='haut',
+                      error_y_minus='bas',
+                      labels={'valeur': '', 'p50': libelle, 'scenario': 'Scénario'},
+                      title=f'{libelle}: médiane et intervalle p5-p95 des répliques')
+    
+    @chronometre('create_scenarios')
+    def create_scenarios(self, vue):
+        """Résultats des scénarios Monte-Carlo, calculés hors du dashboard par scenarios.py"""
+        st.markdown('<h3 class="section-header">🎲 SCÉNARIOS DE PONCTUALITÉ</h3>', 
+                   unsafe_allow_html=True)
+        
+        # Seuls les résultats en cache sont lus: aucune réplique n'est calculée pendant une exécution
+        signature = scenarios.signature_repertoire(REPERTOIRE_SCENARIOS)
+        resultats = charger_scenarios(REPERTOIRE_SCENARIOS, signature)
+        if not resultats:
+            st.info(f"Aucun résultat de scénario dans « {REPERTOIRE_SCENARIOS} ». Les répliques se calculent "
+                    f"hors du dashboard: python scenarios.py --repliques 1000 --sortie {REPERTOIRE_SCENARIOS}")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            nom = st.selectbox("Scénario:", list(resultats), format_func=lambda n: resultats[n]['description'])
+        with col2:
+            axes = {'Aéroports': 'aeroport_depart', 'Compagnies': 'compagnie'}
+            axe = axes[st.radio("Ventilation:", list(axes), horizontal=True)]
+        with col3:
+            mesure = self.MESURES_SCENARIOS[st.selectbox("Mesure:", list(self.MESURES_SCENARIOS))]
+        
+        resultat = resultats[nom]
+        st.caption(f"{resultat['nb_repliques']:,} répliques de {resultat['nb_vols']:,} vols · "
+                   f"graine {resultat['seed']} · calculé le {resultat['date']}")
+        self.afficher_figure('scenarios', vue, nom, axe, mesure, signature)
+        
+        distribution = self.distribution_scenarios(vue, resultats, nom, axe, mesure)
+        st.dataframe(distribution[['scenario', 'valeur', 'moyenne', 'ecart_type', 'p05', 'p50', 'p95']]
+                     .round(2), hide_index=True, use_container_width=True)
     
+    @chronometre('create_sidebar')
     def create_sidebar(self):
         """Crée la sidebar avec les contrôles"""
         st.sidebar.markdown("## 🎛️ CONTRÔLES D'ANALYSE")
         
         # Filtres temporels
         st.sidebar.markdown("### 📅 Période d'analyse")
+        # Par défaut, toute la période couverte par l'historique de trafic
+        premiere_date = self.traffic_data['date'].min().date()
         date_debut = st.sidebar.date_input("Date de début", 
-                                         value=datetime.now() - timedelta(days=30))
+                                         value=premiere_date,
+                                         min_value=premiere_date)
+        # Jusqu'à demain, pour inclure les vols du jour programmés après minuit
         date_fin = st.sidebar.date_input("Date de fin", 
-                                       value=datetime.now())
+                                       value=datetime.now() + timedelta(days=1),
+                                       min_value=premiere_date)
         
         # Filtres aéroports
         st.sidebar.markdown("### 🏛️ Sélection des aéroports")
@@ -776,7 +1789,14 @@ class AeroportsFranceDashboard:
         # Options d'affichage
         st.sidebar.markdown("### ⚙️ Options")
         auto_refresh = st.sidebar.checkbox("Rafraîchissement automatique", value=True)
+        intervalle_rafraichissement = st.sidebar.slider("Intervalle de rafraîchissement (s)", 
+                                                        min_value=5, max_value=300, value=30, step=5,
+                                                        disabled=not auto_refresh)
         show_projections = st.sidebar.checkbox("Afficher les projections", value=True)
+        sections_paresseuses = st.sidebar.checkbox("Calculer uniquement l'onglet affiché", value=True,
+                                                   help="Les onglets masqués ne sont calculés qu'à leur ouverture")
+        profilage_actif = st.sidebar.checkbox("🔧 Profilage des exécutions", value=self.profileur.actif,
+                                              help="Temps, lignes et octets par étape (panneau de débogage)")
         
         # Bouton de rafraîchissement manuel
         if st.sidebar.button("🔄 Rafraîchir les données"):
@@ -788,132 +1808,283 @@ class AeroportsFranceDashboard:
             'date_fin': date_fin,
             'aeroports_selectionnes': aeroports_selectionnes,
             'auto_refresh': auto_refresh,
-            'show_projections': show_projections
+            'intervalle_rafraichissement': intervalle_rafraichissement,
+            'show_projections': show_projections,
+            'sections_paresseuses': sections_paresseuses,
+            'profilage': profilage_actif
         }
 
+    def rafraichir_si_echeance(self, intervalle):
+        """Avance la simulation live au plus une fois par intervalle (en secondes)"""
+        maintenant = time.monotonic()
+        # Tolérance pour que deux fragments déclenchés au même moment ne fassent qu'un tick
+        if maintenant - self.dernier_rafraichissement >= intervalle * 0.9:
+            self.dernier_rafraichissement = maintenant
+            return self.update_live_data()
+        return None
+    
+    def afficher_panneau_profilage(self):
+        """Panneau de débogage de la sidebar: mesures par étape et export JSON lines"""
+        if FICHIER_PROFIL:
+            self.profileur.exporter(FICHIER_PROFIL)
+        with st.sidebar.expander("🔧 Profilage", expanded=True):
+            st.caption(f"Exécution n°{self.profileur.execution} · {len(self.profileur.mesures)} mesures en mémoire")
+            st.dataframe(self.profileur.resume(), hide_index=True, use_container_width=True)
+            fichier = FICHIER_PROFIL or 'profil_dashboard.jsonl'
+            if st.button("Exporter en JSON lines", key='export_profil'):
+                nb_mesures = self.profileur.exporter(fichier)
+                st.success(f"{nb_mesures} mesures ajoutées à {fichier}")
+    
+    def onglets(self, libelles, cle):
+        """Onglets de navigation; en mode paresseux, changer d'onglet relance le script
+        pour que seul l'onglet ouvert soit calculé"""
+        if self.sections_paresseuses:
+            return st.tabs(libelles, key=cle, on_change='rerun')
+        return st.tabs(libelles)
+    
+    def onglet_ouvert(self, onglet):
+        """Indique si le contenu d'un onglet doit être calculé à cette exécution"""
+        return not self.sections_paresseuses or bool(onglet.open)
+    
+    def afficher_section_live(self, section, intervalle, *args):
+        """Affiche une section live dans un fragment relancé seul toutes les `intervalle` secondes
+        
+        Sans intervalle, le fragment n'est exécuté qu'avec le reste du script.
+        """
+        def fragment_live():
+            if intervalle is not None:
+                self.rafraichir_si_echeance(intervalle)
+            section(*args)
+        
+        st.fragment(fragment_live, run_every=intervalle)()
+    
     def run_dashboard(self):
         """Exécute le dashboard complet"""
-        # Mise à jour des données live
-        self.update_live_data()
-        
         # Sidebar
+        self.profileur.nouvelle_execution()
         controls = self.create_sidebar()
+        self.sections_paresseuses = controls['sections_paresseuses']
+        self.profileur.actif = controls['profilage']
+        intervalle = controls['intervalle_rafraichissement'] if controls['auto_refresh'] else None
+        
+        # Sans rafraîchissement automatique, les données live avancent à chaque exécution
+        if intervalle is None:
+            self.update_live_data()
+        
+        # Sélection de la sidebar résolue une fois en positions, pour tous les onglets
+        vue = self.vue_filtree(controls['aeroports_selectionnes'], controls['date_debut'], controls['date_fin'])
         
         # Header
         self.display_header()
         
-        # Métriques clés
-        self.display_key_metrics()
+        # Métriques clés (section live)
+        self.afficher_section_live(self.display_key_metrics, intervalle, vue)
         
         # Navigation par onglets
-        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = self.onglets([
             "🏛️ Aéroports", 
             "✈️ Vols Live", 
             "🏢 Compagnies", 
             "📈 Évolution", 
             "📊 Insights",
+            "🎲 Scénarios",
             "ℹ️ À Propos"
-        ])
+        ], 'onglets_principaux')
         
-        with tab1:
-            self.create_aeroports_overview()
+        if self.onglet_ouvert(tab1):
+            with tab1:
+                self.create_aeroports_overview(vue)
         
-        with tab2:
-            self.create_vols_live()
+        if self.onglet_ouvert(tab2):
+            with tab2:
+                self.afficher_section_live(self.create_vols_live, intervalle, vue)
         
-        with tab3:
-            self.create_compagnies_analysis()
+        if self.onglet_ouvert(tab3):
+            with tab3:
+                self.create_compagnies_analysis(vue)
         
-        with tab4:
-            self.create_evolution_analysis()
+        if self.onglet_ouvert(tab4):
+            with tab4:
+                self.create_evolution_analysis(vue)
         
-        with tab5:
-            st.markdown("## 📊 INSIGHTS STRATÉGIQUES")
+        if self.onglet_ouvert(tab5):
+            with tab5:
+                st.markdown("## 📊 INSIGHTS STRATÉGIQUES")
             
-            col1, col2 = st.columns(2)
+                col1, col2 = st.columns(2)
             
-            with col1:
-                st.markdown("""
-                ### 🎯 TENDANCES DU MARCHÉ
+                with col1:
+                    st.markdown("""
+                    ### 🎯 TENDANCES DU MARCHÉ
                 
-                **📈 Croissance Post-COVID:**
-                - Récupération complète du trafic en 2024
-                - Croissance moyenne de 4-6% par mois
-                - Augmentation de la demande pour les vols domestiques
+                    **📈 Croissance Post-COVID:**
+                    - Récupération complète du trafic en 2024
+                    - Croissance moyenne de 4-6% par mois
+                    - Augmentation de la demande pour les vols domestiques
                 
-                **🌍 Évolution des Destinations:**
-                - Augmentation des vols vers l'Asie
-                - Croissance des destinations soleil (Méditerranée, Caraïbes)
-                - Développement des vols cargo
+                    **🌍 Évolution des Destinations:**
+                    - Augmentation des vols vers l'Asie
+                    - Croissance des destinations soleil (Méditerranée, Caraïbes)
+                    - Développement des vols cargo
                 
-                **💼 Modèles Économiques:**
-                - Compétition accrue sur les prix
-                - Développement des services premium
-                - Digitalisation des processus
-                """)
+                    **💼 Modèles Économiques:**
+                    - Compétition accrue sur les prix
+                    - Développement des services premium
+                    - Digitalisation des processus
+                    """)
             
-            with col2:
-                st.markdown("""
-                ### 🚨 DÉFIS OPÉRATIONNELS
+                with col2:
+                    st.markdown("""
+                    ### 🚨 DÉFIS OPÉRATIONNELS
                 
-                **⚡ Capacité Aéroportuaire:**
-                - Saturation aux heures de pointe à CDG et ORY
-                - Besoin d'extension des terminaux
-                - Optimisation des processus de sécurité
+                    **⚡ Capacité Aéroportuaire:**
+                    - Saturation aux heures de pointe à CDG et ORY
+                    - Besoin d'extension des terminaux
+                    - Optimisation des processus de sécurité
                 
-                **🌫️ Impact Environnemental:**
-                - Pression réglementaire croissante
-                - Développement des carburants durables
-                - Optimisation des trajectoires de vol
+                    **🌫️ Impact Environnemental:**
+                    - Pression réglementaire croissante
+                    - Développement des carburants durables
+                    - Optimisation des trajectoires de vol
                 
-                **🔧 Maintenance Infrastructure:**
-                - Modernisation des équipements
-                - Gestion des travaux d'entretien
-                - Adaptation aux nouvelles normes
-                """)
+                    **🔧 Maintenance Infrastructure:**
+                    - Modernisation des équipements
+                    - Gestion des travaux d'entretien
+                    - Adaptation aux nouvelles normes
+                    """)
             
-            st.markdown("""
-            ### 💡 RECOMMANDATIONS STRATÉGIQUES
+                st.markdown("""
+                ### 💡 RECOMMANDATIONS STRATÉGIQUES
             
-            1. **Investissement Infrastructure:** Modernisation des terminaux et pistes
-            2. **Digitalisation:** Développement des services sans contact
-            3. **Développement Durable:** Transition vers l'aviation verte
-            4. **Expansion:** Ouverture de nouvelles destinations stratégiques
-            5. **Optimisation:** Amélioration de la ponctualité et réduction des retards
-            """)
-        
-        with tab6:
-            st.markdown("## 📋 À propos de ce dashboard")
-            st.markdown("""
-            Ce dashboard présente une analyse en temps réel du trafic aérien français 
-            et des performances des aéroports.
+                1. **Investissement Infrastructure:** Modernisation des terminaux et pistes
+                2. **Digitalisation:** Développement des services sans contact
+                3. **Développement Durable:** Transition vers l'aviation verte
+                4. **Expansion:** Ouverture de nouvelles destinations stratégiques
+                5. **Optimisation:** Amélioration de la ponctualité et réduction des retards
+                """)
+        
+        if self.onglet_ouvert(tab6):
+            with tab6:
+                self.create_scenarios(vue)
+        
+        if self.onglet_ouvert(tab7):
+            with tab7:
+                st.markdown("## 📋 À propos de ce dashboard")
+                st.markdown("""
+                Ce dashboard présente une analyse en temps réel du trafic aérien français 
+                et des performances des aéroports.
             
-            **Méthodologie :**
-            - Données basées sur les statistiques officielles et modèles prédictifs
-            - Mises à jour quotidiennes avec variations réalistes
-            - Analyse multidimensionnelle (trafic, ponctualité, performance)
+                **Méthodologie :**
+                - Données basées sur les statistiques officielles et modèles prédictifs
+                - Mises à jour quotidiennes avec variations réalistes
+                - Analyse multidimensionnelle (trafic, ponctualité, performance)
             
-            **Aéroports couverts :**
-            - Paris Charles de Gaulle (CDG)
-            - Paris Orly (ORY)
-            - Nice Côte d'Azur (NCE)
-            - Lyon-Saint Exupéry (LYS)
-            - Marseille Provence (MRS)
-            - Toulouse-Blagnac (TLS)
-            - Bordeaux-Mérignac (BOD)
+                **Aéroports couverts :**
+                - Paris Charles de Gaulle (CDG)
+                - Paris Orly (ORY)
+                - Nice Côte d'Azur (NCE)
+                - Lyon-Saint Exupéry (LYS)
+                - Marseille Provence (MRS)
+                - Toulouse-Blagnac (TLS)
+                - Bordeaux-Mérignac (BOD)
             
-            **⚠️ Note :** Les données sont simulées pour la démonstration. 
-            Dans un contexte réel, elles proviendraient de sources officielles (DGAC, Aéroports de Paris, etc.)
+                **⚠️ Note :** Les données sont simulées pour la démonstration. 
+                Dans un contexte réel, elles proviendraient de sources officielles (DGAC, Aéroports de Paris, etc.)
             
-            **🔒 Confidentialité:** Toutes les données des vols sont simulées et anonymisées.
-            """)
+                **🔒 Confidentialité:** Toutes les données des vols sont simulées et anonymisées.
+                """)
         
-        # Rafraîchissement automatique
-        if controls['auto_refresh']:
-            time.sleep(30)  # Rafraîchissement toutes les 30 secondes
-            st.rerun()
+        # Efficacité du cache des figures (cumulée sur la session)
+        cache = self.cache_figures.statistiques()
+        st.sidebar.caption(f"🖼️ Cache des figures: {cache['succes']} succès / {cache['echecs']} échecs "
+                           f"({cache['taux_succes']:.0%}), {cache['temps_economise']:.2f} s de rendu économisées")
+        
+        if self.profileur.actif:
+            self.afficher_panneau_profilage()
+
+DUREE_CACHE_DONNEES = 3600  # secondes avant reconstruction des données statiques
+# Schéma compact de la table des vols (identifiants et portes décomposés, entiers courts)
+SCHEMA_COMPACT = os.environ.get('AEROPORTS_SCHEMA_COMPACT', '') not in ('', '0')
+# Répertoire optionnel d'instantanés Arrow (voir stockage.py), relus par memory-map au démarrage
+REPERTOIRE_INSTANTANES = os.environ.get('AEROPORTS_INSTANTANES')
+# Source optionnelle d'événements live: 'rejeu:CHEMIN[@DEBIT]' ou 'socket:HOTE:PORT' (voir ingestion.py)
+SOURCE_FLUX = os.environ.get('AEROPORTS_FLUX')
+# Fichier JSON lines des mesures d'exécution; s'il est défini, le profilage est actif dès
+# le démarrage et les mesures y sont ajoutées à chaque exécution (voir profilage.py)
+FICHIER_PROFIL = os.environ.get('AEROPORTS_PROFIL')
+PROFILAGE_ACTIF = bool(FICHIER_PROFIL)
+# Répertoire des résultats de scénarios Monte-Carlo écrits par scenarios.py
+REPERTOIRE_SCENARIOS = os.environ.get('AEROPORTS_SCENARIOS', 'scenarios')
+
+@st.cache_resource(ttl=DUREE_CACHE_DONNEES, max_entries=4, show_spinner="Chargement des données...")
+def charger_donnees_statiques(nb_vols=200):
+    """Construit les jeux de données statiques une seule fois pour toutes les sessions
+    
+    Si des instantanés existent dans REPERTOIRE_INSTANTANES, ils sont relus au lieu d'être
+    régénérés; sinon les données générées y sont écrites pour les démarrages suivants.
+    Les temps de construction sont toujours mesurés et transmis aux sessions avec les
+    données ('mesures_demarrage'), pour le panneau de profilage et l'export JSON lines.
+    """
+    profileur = profilage.Profileur(actif=True)
+    if stockage.instantanes_disponibles(REPERTOIRE_INSTANTANES):
+        with profileur.chronometrer('charger_instantanes'):
+            donnees = stockage.charger_instantanes(REPERTOIRE_INSTANTANES)
+    else:
+        donnees = AeroportsFranceDashboard(nb_vols=nb_vols, schema_compact=SCHEMA_COMPACT,
+                                           profileur=profileur).donnees_statiques()
+        if REPERTOIRE_INSTANTANES and stockage.pa is not None:
+            with profileur.chronometrer('sauvegarder_instantanes'):
+                stockage.sauvegarder_instantanes(donnees, REPERTOIRE_INSTANTANES)
+    donnees = preparer_donnees_statiques(donnees, profileur)
+    donnees['mesures_demarrage'] = list(profileur.mesures)
+    return donnees
+
+def preparer_donnees_statiques(donnees, profileur=None):
+    """Ajoute aux données statiques les agrégats, l'index et le modèle de prévision du trafic
+    et le plan des rotations, construits une fois et partagés entre sessions (ou processus d'export)
+
+    profileur: profileur optionnel qui chronomètre chaque construction.
+    """
+    profileur = profilage.Profileur() if profileur is None else profileur
+    with profileur.chronometrer('cube_trafic', len(donnees['traffic_data'])):
+        donnees['cube_trafic'] = CubeTrafic(donnees['traffic_data'])
+    with profileur.chronometrer('index_trafic', len(donnees['traffic_data'])):
+        donnees['index_trafic'] = IndexTrafic(donnees['traffic_data'])
+    with profileur.chronometrer('plan_rotations', len(donnees['vols_data'])):
+        donnees['plan_rotations'] = simulation.PlanRotations(donnees['vols_data'], donnees['aeroports'])
+    try:
+        with profileur.chronometrer('prevision_trafic'):
+            donnees['prevision_trafic'] = prevision.PrevisionTrafic(donnees['cube_trafic'])
+    except ValueError:  # historique trop court pour ajuster le modèle
+        donnees['prevision_trafic'] = None
+    return donnees
+
+@st.cache_data(show_spinner=False)
+def charger_scenarios(repertoire, signature):
+    """Résultats des scénarios du répertoire; `signature` (fichiers et dates de modification)
+    invalide le cache quand un scénario est recalculé"""
+    return scenarios.charger_resultats(repertoire)
+
+def obtenir_dashboard():
+    """Renvoie le dashboard de la session courante
+    
+    Les données statiques viennent du cache partagé; l'état live des vols est conservé
+    dans st.session_state pour que la simulation continue d'avancer entre les reruns.
+    """
+    donnees = charger_donnees_statiques()
+    dashboard = st.session_state.get('dashboard')
+    if dashboard is None:
+        dashboard = AeroportsFranceDashboard(donnees_statiques=donnees)
+        if SOURCE_FLUX:
+            dashboard.brancher_source(ingestion.source_depuis_specification(SOURCE_FLUX))
+        st.session_state['dashboard'] = dashboard
+    else:
+        # Après expiration du cache, les sessions existantes reprennent les nouvelles données
+        dashboard.remplacer_donnees_statiques(donnees)
+    return dashboard
 
 # Lancement du dashboard
 if __name__ == "__main__":
-    dashboard = AeroportsFranceDashboard()
+    configurer_page()
+    dashboard = obtenir_dashboard()
     dashboard.run_dashboard()
\ No newline at end of file
@@ -0,0 +1,599 @@
+# banc_essai.py
+"""Bancs d'essai headless du dashboard
+
+Le banc 'donnees' appelle directement les étapes de calcul du dashboard (génération,
+indexation, tick live, agrégats de chaque section), sans navigateur ni serveur, et
+mesure pour chaque taille de table le temps et le pic de mémoire de chaque étape.
+Les bancs 'filtres' et 'sections' passent par streamlit.testing (AppTest): chaque
+mesure couvre une exécution complète du script, sidebar, onglets et graphiques compris.
+Le banc 'charge' lance un vrai serveur (`streamlit run` headless) et y connecte
+plusieurs visiteurs simultanés par websocket, comme autant de navigateurs: les sessions
+partagent le processus, son GIL et le cache de ressources des données statiques, ce
+qui mesure la latence et la mémoire d'un seul serveur servant N visiteurs.
+
+Les résultats s'écrivent en JSON; comparés à un fichier de référence produit de la
+même façon, ils signalent les étapes qui ont régressé de plus d'un seuil donné.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from streamlit import runtime
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.testing.v1 import AppTest
+
+try:
+    from websockets.sync.client import connect as connecter_websocket
+except ImportError:  # websockets est optionnel: sans lui, le banc 'charge' n'est pas disponible
+    connecter_websocket = None
+
+TAILLES_DONNEES = (1_000, 10_000, 100_000, 1_000_000)
+PALIERS_SESSIONS = (1, 2, 4, 8)
+# Actions d'un visiteur avant chaque rerun du banc de charge ('rerun': tick live seul)
+ACTIONS_SESSION = ('aeroports', 'onglet', 'filtre_vols', 'rerun')
+# Libellés des widgets de la sidebar pilotés par les bancs, qui les retrouvent par libellé
+LIBELLE_RAFRAICHISSEMENT = "Rafraîchissement automatique"
+LIBELLE_SECTIONS_PARESSEUSES = "Calculer uniquement l'onglet affiché"
+LIBELLE_AEROPORTS = "Aéroports à afficher:"
+LIBELLE_DATE_DEBUT = "Date de début"
+LIBELLE_DATE_FIN = "Date de fin"
+ONGLETS_PRINCIPAUX = ("🏛️ Aéroports", "✈️ Vols Live", "🏢 Compagnies", "📈 Évolution")
+# Heure simulée entre deux ticks live du banc 'donnees' (intervalle de rafraîchissement par défaut)
+INTERVALLE_TICK = pd.Timedelta(seconds=30)
+# Délai maximal (s) du démarrage du serveur et de chaque exécution du banc de charge
+DELAI_SERVEUR = 600
+# Écart absolu en deçà duquel une mesure n'est pas comptée comme régression
+PLANCHERS = {'temps_ms': 1.0, 'memoire_pic_mo': 1.0, 'p50_ms': 5.0}
+
+def script_dashboard(nb_vols, nb_aeroports, seed):
+    """Script exécuté par AppTest: un dashboard par session, sans rafraîchissement automatique"""
+    import streamlit as st
+    from Aeroport import AeroportsFranceDashboard
+
+    if 'dashboard' not in st.session_state:
+        dashboard = AeroportsFranceDashboard(nb_vols=nb_vols, seed=seed)
+        if nb_aeroports:
+            dashboard.aeroports = dashboard.generer_aeroports_synthetiques(nb_aeroports)
+            dashboard.vols_data = dashboard.initialize_vols_data()
+            dashboard.traffic_data = dashboard.initialize_traffic_data()
+            dashboard = AeroportsFranceDashboard(donnees_statiques=dashboard.donnees_statiques(), seed=seed)
+        st.session_state['dashboard'] = dashboard
+    st.session_state['dashboard'].run_dashboard()
+
+def script_session(nb_vols, seed):
+    """Script servi par `streamlit run` pour le banc de charge: les sessions du serveur
+    partagent les données statiques par le cache de ressources, comme dans l'application"""
+    import streamlit as st
+    from Aeroport import AeroportsFranceDashboard, charger_donnees_statiques
+
+    if 'dashboard' not in st.session_state:
+        st.session_state['dashboard'] = AeroportsFranceDashboard(
+            donnees_statiques=charger_donnees_statiques(nb_vols), seed=seed)
+    st.session_state['dashboard'].run_dashboard()
+
+def memoire_processus(pid='self'):
+    """Mémoire résidente courante et pic d'un processus, le processus courant par défaut (Mo);
+    None si non mesurable"""
+    try:
+        with open(f'/proc/{pid}/status', encoding='ascii') as f:
+            valeurs = dict(ligne.split(':', 1) for ligne in f if ligne.startswith(('VmRSS', 'VmHWM')))
+        return int(valeurs['VmRSS'].split()[0]) / 1024, int(valeurs['VmHWM'].split()[0]) / 1024
+    except (OSError, KeyError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    if pid != 'self':  # getrusage ne renseigne que le processus courant
+        return None, None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pic = pic / 2 ** 20 if sys.platform == 'darwin' else pic / 1024  # octets sous macOS, Ko ailleurs
+    return None, pic
+
+def mesurer_reruns(application, nb_reruns):
+    """Durées (ms) de `nb_reruns` exécutions successives de l'application"""
+    durees = []
+    for _ in range(nb_reruns):
+        debut = time.perf_counter()
+        application.run()
+        durees.append((time.perf_counter() - debut) * 1000)
+        if application.exception:
+            raise RuntimeError(application.exception[0].value)
+    return np.array(durees)
+
+def widget(widgets, libelle):
+    """Widget d'une liste AppTest (par exemple application.sidebar.checkbox) d'après son libellé"""
+    trouves = [w for w in widgets if w.label == libelle]
+    if not trouves:
+        raise KeyError(f"aucun widget « {libelle} » parmi {[w.label for w in widgets]}")
+    return trouves[0]
+
+def demarrer_application(nb_vols, nb_aeroports, seed):
+    """Première exécution de l'application, rafraîchissement automatique désactivé"""
+    application = AppTest.from_function(script_dashboard, args=(nb_vols, nb_aeroports, seed),
+                                        default_timeout=600)
+    application.run()
+    widget(application.sidebar.checkbox, LIBELLE_RAFRAICHISSEMENT).uncheck()
+    application.run()
+    return application
+
+class VisiteurServeur:
+    """Visiteur du banc de charge, connecté au serveur par websocket comme un navigateur
+
+    Le serveur ne garde pas la valeur des widgets: comme le navigateur, le visiteur
+    renvoie à chaque rerun l'état des widgets qu'il a modifiés. Les widgets de la
+    dernière exécution sont repérés par leur libellé, les onglets principaux par leurs
+    libellés (ONGLETS_PRINCIPAUX).
+    """
+    # Widgets dont le visiteur modifie la valeur, avec le champ de WidgetState qui la porte
+    CHAMPS_VALEUR = {'checkbox': 'bool_value', 'multiselect': 'string_array_value', 'selectbox': 'string_value',
+                     'onglets': 'string_value'}
+
+    def __init__(self, port, delai=DELAI_SERVEUR):
+        self.connexion = connecter_websocket(f"ws://localhost:{port}/_stcore/stream", subprotocols=['streamlit'],
+                                             max_size=None, open_timeout=delai)
+        self.delai = delai
+        self.etats = {}  # identifiant de widget -> WidgetState renvoyé à chaque rerun
+        self.widgets = []  # widgets de la dernière exécution: dicts type, id, libelle, options, sidebar
+
+    def __enter__(self):
+        self.connexion.__enter__()
+        return self
+
+    def __exit__(self, *exception):
+        return self.connexion.__exit__(*exception)
+
+    def widget(self, type_widget, libelle):
+        """Widget de la dernière exécution d'après son type et son libellé; None s'il n'est pas affiché"""
+        return next((w for w in self.widgets if w['type'] == type_widget and w['libelle'] == libelle), None)
+
+    def modifier(self, widget, valeur):
+        """Valeur d'un widget, envoyée au rerun suivant et aux suivants"""
+        etat = self.etats.setdefault(widget['id'], WidgetState(id=widget['id']))
+        champ = self.CHAMPS_VALEUR[widget['type']]
+        if champ == 'string_array_value':
+            del etat.string_array_value.data[:]
+            etat.string_array_value.data.extend(valeur)
+        else:
+            setattr(etat, champ, valeur)
+
+    def rerun(self):
+        """Exécute le script avec l'état courant des widgets; renvoie la durée (ms) jusqu'à la fin
+        de l'exécution
+
+        Lève RuntimeError si l'exécution affiche une exception, TimeoutError si elle ne se
+        termine pas dans le délai.
+        """
+        message = BackMsg()
+        message.rerun_script.widget_states.widgets.extend(self.etats.values())
+        debut = time.perf_counter()
+        self.connexion.send(message.SerializeToString())
+        widgets, onglets, erreurs = [], {}, []
+        while True:
+            reponse = ForwardMsg()
+            reponse.ParseFromString(self.connexion.recv(timeout=self.delai))
+            type_message = reponse.WhichOneof('type')
+            if type_message == 'script_finished':
+                break
+            if type_message != 'delta':
+                continue
+            chemin = tuple(reponse.metadata.delta_path)
+            if reponse.delta.WhichOneof('type') == 'add_block':
+                bloc = reponse.delta.add_block
+                if bloc.WhichOneof('type') == 'tab_container':
+                    onglets[chemin] = {'type': 'onglets', 'id': bloc.id, 'libelle': None, 'options': [],
+                                       'sidebar': chemin[0] == 1}
+                elif bloc.WhichOneof('type') == 'tab' and chemin[:-1] in onglets:
+                    onglets[chemin[:-1]]['options'].append(bloc.tab.label)
+            elif reponse.delta.WhichOneof('type') == 'new_element':
+                element = reponse.delta.new_element
+                type_element = element.WhichOneof('type')
+                if type_element == 'exception' and not element.exception.is_warning:
+                    erreurs.append(f"{element.exception.type}: {element.exception.message}")
+                elif type_element in self.CHAMPS_VALEUR:
+                    contenu = getattr(element, type_element)
+                    widgets.append({'type': type_element, 'id': contenu.id, 'libelle': contenu.label,
+                                    'options': list(getattr(contenu, 'options', [])), 'sidebar': chemin[0] == 1})
+        duree = (time.perf_counter() - debut) * 1000
+        self.widgets = widgets + list(onglets.values())
+        if erreurs:
+            raise RuntimeError(erreurs[0])
+        return duree
+
+    def demarrer(self):
+        """Première exécution, puis rafraîchissement automatique désactivé (non mesurés)"""
+        self.rerun()
+        self.modifier(self.widget('checkbox', LIBELLE_RAFRAICHISSEMENT), False)
+        self.rerun()
+
+    def choisir_onglet(self, libelle):
+        """Ouvre un onglet principal; le conteneur est celui dont les onglets comprennent ONGLETS_PRINCIPAUX"""
+        onglets = next(w for w in self.widgets
+                       if w['type'] == 'onglets' and set(ONGLETS_PRINCIPAUX) <= set(w['options']))
+        self.modifier(onglets, libelle)
+
+    def appliquer_action(self, action, rng):
+        """Modifie les widgets comme le ferait un visiteur"""
+        if action == 'aeroports':
+            aeroports = self.widget('multiselect', LIBELLE_AEROPORTS)
+            options = aeroports['options']
+            choisis = rng.choice(len(options), size=rng.integers(1, min(5, len(options)) + 1), replace=False)
+            self.modifier(aeroports, [options[i] for i in sorted(choisis)])
+        elif action == 'onglet':
+            self.choisir_onglet(ONGLETS_PRINCIPAUX[rng.integers(len(ONGLETS_PRINCIPAUX))])
+        elif action == 'filtre_vols':
+            selectbox = [w for w in self.widgets if w['type'] == 'selectbox' and not w['sidebar']]
+            if not selectbox:  # filtres visibles dans l'onglet des vols seulement
+                self.choisir_onglet("✈️ Vols Live")
+            else:
+                widget = selectbox[int(rng.integers(len(selectbox)))]
+                self.modifier(widget, widget['options'][rng.integers(len(widget['options']))])
+
+def attendre(barriere):
+    """Attend les autres visiteurs du palier; une barrière rompue (visiteur bloqué) n'arrête pas le banc"""
+    try:
+        barriere.wait()
+    except threading.BrokenBarrierError:
+        pass
+
+def piloter_visiteur(port, nb_reruns, seed, numero, depart, fin):
+    """Visiteur du banc de charge, exécuté dans son thread
+
+    Le visiteur se connecte et démarre sa session (non mesuré), attend les autres
+    visiteurs du palier, puis enchaîne ses reruns, chacun précédé d'une action tirée de
+    la graine [seed, numero]. Un rerun en échec est compté sans interrompre le
+    visiteur. Renvoie les durées (ms) des reruns réussis, les échecs et les bornes
+    temporelles du pilotage.
+    """
+    rng = np.random.default_rng([seed, numero])
+    resultat = {'durees': [], 'erreurs': [], 'debut': None, 'fin': None}
+    try:
+        with VisiteurServeur(port) as visiteur:
+            visiteur.demarrer()
+            attendre(depart)
+            resultat['debut'] = time.time()
+            for _ in range(nb_reruns):
+                try:
+                    visiteur.appliquer_action(ACTIONS_SESSION[rng.integers(len(ACTIONS_SESSION))], rng)
+                    resultat['durees'].append(visiteur.rerun())
+                except Exception as erreur:  # rerun en échec ou sans réponse dans le délai
+                    resultat['erreurs'].append(f"{type(erreur).__name__}: {erreur}")
+            resultat['fin'] = time.time()
+            attendre(fin)  # mémoire du serveur relevée avant la déconnexion des visiteurs
+    except Exception as erreur:  # session jamais démarrée: tous ses reruns sont en échec
+        resultat['erreurs'] = [f"{type(erreur).__name__}: {erreur}"] * nb_reruns
+        attendre(depart)
+        attendre(fin)
+    return resultat
+
+def port_libre():
+    with socket.socket() as connexion:
+        connexion.bind(('localhost', 0))
+        return connexion.getsockname()[1]
+
+def lancer_serveur(nb_vols, seed, delai=DELAI_SERVEUR):
+    """Serveur headless servant script_session; renvoie le processus et son port"""
+    port = port_libre()
+    journal = tempfile.TemporaryFile()
+    serveur = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', os.path.abspath(__file__),
+         '--server.headless', 'true', '--server.port', str(port), '--server.fileWatcherType', 'none',
+         '--browser.gatherUsageStats', 'false', '--', str(nb_vols), str(seed)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), stdout=journal, stderr=subprocess.STDOUT)
+    limite = time.monotonic() + delai
+    while time.monotonic() < limite and serveur.poll() is None:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1):
+                return serveur, port
+        except OSError:
+            time.sleep(0.2)
+    serveur.kill()
+    serveur.wait()
+    journal.seek(0)
+    raise RuntimeError(f"le serveur streamlit n'a pas démarré:\n{journal.read().decode(errors='replace')}")
+
+def banc_charge(nb_vols=100_000, paliers=PALIERS_SESSIONS, nb_reruns=10, seed=0):
+    """Latence des reruns, débit et mémoire résidente d'un serveur selon le nombre de visiteurs simultanés
+
+    Pour chaque palier, un serveur neuf est lancé et les visiteurs s'y connectent chacun
+    depuis son thread; ils démarrent puis sont pilotés ensemble. La mémoire est celle du
+    processus serveur, relevée quand tous les visiteurs ont terminé. Les reruns en échec
+    sont comptés dans 'echecs' (premier message dans 'erreur') au lieu d'interrompre le banc.
+    """
+    if connecter_websocket is None:
+        raise ImportError("websockets est requis pour le banc de charge (pip install websockets)")
+    resultats = {}
+    for nb_sessions in paliers:
+        serveur, port = lancer_serveur(nb_vols, seed)
+        memoire = []
+        depart = threading.Barrier(nb_sessions, timeout=DELAI_SERVEUR)
+        fin = threading.Barrier(nb_sessions, action=lambda: memoire.append(memoire_processus(serveur.pid)),
+                                timeout=DELAI_SERVEUR)
+        sessions = [None] * nb_sessions
+
+        def visiteur(numero):
+            sessions[numero] = piloter_visiteur(port, nb_reruns, seed, numero, depart, fin)
+
+        threads = [threading.Thread(target=visiteur, args=(numero,)) for numero in range(nb_sessions)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            serveur.terminate()
+            serveur.wait()
+        durees = np.array([duree for session in sessions for duree in session['durees']])
+        erreurs = [erreur for session in sessions for erreur in session['erreurs']]
+        bornes = [(s['debut'], s['fin']) for s in sessions if s['debut'] is not None]
+        duree_totale = max(f for _, f in bornes) - min(d for d, _ in bornes) if bornes else None
+        rss, rss_pic = memoire[0] if memoire else (None, None)
+        mesure = {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+        if len(durees):
+            mesure = {
+                'p50_ms': float(np.percentile(durees, 50)),
+                'p95_ms': float(np.percentile(durees, 95)),
+                'p99_ms': float(np.percentile(durees, 99)),
+                'max_ms': float(durees.max())
+            }
+        resultats[str(nb_sessions)] = dict(
+            mesure,
+            debit_reruns_s=len(durees) / duree_totale if duree_totale else 0.0,
+            echecs=len(erreurs),
+            erreur=erreurs[0] if erreurs else None,
+            rss_mo=rss,
+            rss_pic_mo=rss_pic
+        )
+    return resultats
+
+def banc_filtres(nb_vols=100_000, nb_aeroports=None, nb_reruns=5, seed=0):
+    """Latence des reruns pour une sélection étroite (2 aéroports, 1 semaine) et complète"""
+    application = demarrer_application(nb_vols, nb_aeroports, seed)
+    widget(application.sidebar.checkbox, LIBELLE_SECTIONS_PARESSEUSES).uncheck()  # tous les onglets sont calculés
+    aeroports = widget(application.sidebar.multiselect, LIBELLE_AEROPORTS).options
+    premiere_date = widget(application.sidebar.date_input, LIBELLE_DATE_DEBUT).value  # début de l'historique
+    aujourd_hui = datetime.now().date()
+    selections = {
+        'étroite': (aeroports[:2], aujourd_hui - timedelta(days=6), aujourd_hui + timedelta(days=1)),
+        'complète': (aeroports, premiere_date, aujourd_hui + timedelta(days=1))
+    }
+
+    resultats = {}
+    for nom, (selection, debut, fin) in selections.items():
+        widget(application.sidebar.multiselect, LIBELLE_AEROPORTS).set_value(selection)
+        widget(application.sidebar.date_input, LIBELLE_DATE_DEBUT).set_value(debut)
+        widget(application.sidebar.date_input, LIBELLE_DATE_FIN).set_value(fin)
+        application.run()  # première exécution de la sélection, non mesurée
+        durees = mesurer_reruns(application, nb_reruns)
+        resultats[nom] = {'p50_ms': float(np.percentile(durees, 50)), 'max_ms': float(durees.max())}
+    return resultats
+
+def banc_sections(nb_vols=100_000, nb_aeroports=None, nb_reruns=5, seed=0):
+    """Latence des reruns avec calcul de l'onglet affiché seul (paresseux) ou de tous les onglets"""
+    application = demarrer_application(nb_vols, nb_aeroports, seed)
+    resultats = {}
+    for nom, paresseux in (('paresseux', True), ('complet', False)):
+        widget(application.sidebar.checkbox, LIBELLE_SECTIONS_PARESSEUSES).set_value(paresseux)
+        application.run()
+        durees = mesurer_reruns(application, nb_reruns)
+        resultats[nom] = {'p50_ms': float(np.percentile(durees, 50)), 'max_ms': float(durees.max())}
+    return resultats
+
+def etapes_donnees(dashboard):
+    """Étapes du chemin de données, dans l'ordre d'une exécution du dashboard
+
+    Renvoie un dict nom -> fonction sans argument. La vue est celle de la sidebar par
+    défaut restreinte à la moitié des aéroports; les mémos que lirait chaque étape
+    sont vidés avant l'appel pour mesurer un calcul complet.
+    """
+    from Aeroport import CubeTrafic
+    from prevision import PrevisionTrafic
+    from simulation import PlanRotations
+
+    codes = list(dashboard.aeroports)
+    horloge = [pd.Timestamp.now()]
+    selection = (codes[:max(1, len(codes) // 2)], dashboard.traffic_data['date'].min(), None)
+    vue = dashboard.vue_filtree(*selection)
+    cube = dashboard.cube_trafic()
+
+    def update_live_data():
+        horloge[0] += INTERVALLE_TICK
+        return dashboard.update_live_data(horloge[0])
+
+    def vue_filtree():
+        dashboard._vue = None
+        return dashboard.vue_filtree(*selection)
+
+    def metriques_cles():
+        return dashboard.metriques_cles(vue)
+
+    def aeroports_overview():
+        dashboard._instantane = None
+        instantane = dashboard.instantane_aeroports(vue)
+        return instantane.groupby('region')['passagers'].sum()
+
+    def vols_live():
+        agregats = dashboard.agregats_vue(vue)
+        agregats.par_statut()
+        agregats.retard_moyen_retardes('compagnie')
+        agregats.retard_moyen_retardes('aeroport_depart')
+        agregats.histogramme_retards()
+        positions = dashboard.index_filtres.rechercher({'statut': 'Retardé'}, dans=vue['positions_vols'])
+        return dashboard.page_vols(positions, 'retard_minutes', decroissant=True)
+
+    def compagnies_analysis():
+        dashboard._performance_compagnies = None
+        dashboard.performance_compagnies(vue)
+        return dashboard.top_destinations(vue)
+
+    def evolution_analysis():
+        for granularite in CubeTrafic.GRANULARITES:
+            cube.requete(granularite, 'total', vue['debut'], vue['fin'], vue['aeroports'])
+            dashboard.reduire_series(cube.requete(granularite, 'aeroport', vue['debut'], vue['fin'],
+                                                  vue['aeroports']), 'passagers', 'aeroport')
+        return dashboard.prevision_trafic().projection(vue['aeroports'], dashboard.HORIZON_PREVISION)
+
+    return {
+        'initialize_vols_data': dashboard.initialize_vols_data,
+        'initialize_traffic_data': dashboard.initialize_traffic_data,
+        'indexer_vols': dashboard.indexer_vols,
+        'plan_rotations': lambda: PlanRotations(dashboard.vols_data, dashboard.aeroports),
+        'update_live_data': update_live_data,
+        'vue_filtree': vue_filtree,
+        'display_key_metrics': metriques_cles,
+        'create_aeroports_overview': aeroports_overview,
+        'create_vols_live': vols_live,
+        'create_compagnies_analysis': compagnies_analysis,
+        'cube_trafic': lambda: CubeTrafic(dashboard.traffic_data),
+        'prevision_trafic': lambda: PrevisionTrafic(cube),
+        'create_evolution_analysis': evolution_analysis
+    }
+
+def mesurer_etape(fonction, repetitions):
+    """Meilleur temps (ms) sur `repetitions` appels et pic de mémoire (Mo) alloué par un appel
+
+    Le pic est mesuré par tracemalloc sur un appel séparé, pour ne pas fausser les temps.
+    """
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    tracemalloc.start()
+    try:
+        fonction()
+        pic = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'temps_ms': min(durees), 'memoire_pic_mo': pic / 2 ** 20}
+
+def banc_donnees(tailles=TAILLES_DONNEES, repetitions=3, seed=0):
+    """Temps et pic de mémoire de chaque étape du chemin de données, par nombre de vols"""
+    from Aeroport import AeroportsFranceDashboard
+
+    resultats = {}
+    for taille in tailles:
+        dashboard = AeroportsFranceDashboard(nb_vols=taille, seed=seed)
+        resultats[str(taille)] = {nom: mesurer_etape(fonction, repetitions)
+                                  for nom, fonction in etapes_donnees(dashboard).items()}
+    return resultats
+
+def regressions(resultats, reference, seuil, planchers=PLANCHERS):
+    """Mesures dépassant leur valeur de référence de plus de `seuil` %
+
+    Les deux arbres de résultats sont parcourus ensemble; seules les mesures de
+    `planchers` présentes des deux côtés sont comparées, et un écart inférieur au
+    plancher absolu de la mesure (bruit des étapes très courtes) est ignoré.
+    Renvoie une liste de dicts: chemin, mesure, reference, valeur, ecart_pct.
+    """
+    trouvees = []
+    for cle, valeur in resultats.items():
+        if cle not in reference:
+            continue
+        if isinstance(valeur, dict):
+            for regression in regressions(valeur, reference[cle], seuil, planchers):
+                regression['chemin'] = [cle] + regression['chemin']
+                trouvees.append(regression)
+        elif cle in planchers and valeur is not None and (reference[cle] or 0) > 0:
+            ecart = (valeur - reference[cle]) / reference[cle] * 100
+            if ecart > seuil and valeur - reference[cle] > planchers[cle]:
+                trouvees.append({'chemin': [], 'mesure': cle, 'reference': reference[cle],
+                                 'valeur': valeur, 'ecart_pct': ecart})
+    return trouvees
+
+BANCS = {
+    'filtres': ("Reruns avec filtres de la sidebar", banc_filtres),
+    'sections': ("Reruns selon le mode de calcul des onglets", banc_sections)
+}
+
+if __name__ == "__main__" and runtime.exists():
+    # Exécuté par le serveur du banc de charge (`streamlit run banc_essai.py -- NB_VOLS SEED`)
+    script_session(int(sys.argv[1]), int(sys.argv[2]))
+elif __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bancs d'essai headless du dashboard")
+    parser.add_argument('--nb-vols', type=int, default=100_000, help="Taille de table des bancs AppTest")
+    parser.add_argument('--nb-aeroports', type=int, default=None,
+                        help="Complète les aéroports réels par des aéroports synthétiques")
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--banc', choices=['donnees', 'charge'] + list(BANCS), action='append',
+                        help="Banc à exécuter (répétable, tous par défaut)")
+    parser.add_argument('--tailles', type=int, nargs='+', default=list(TAILLES_DONNEES),
+                        help="Nombres de vols du banc 'donnees'")
+    parser.add_argument('--repetitions', type=int, default=3,
+                        help="Appels par étape du banc 'donnees' (meilleur temps retenu)")
+    parser.add_argument('--sessions', type=int, nargs='+', default=list(PALIERS_SESSIONS),
+                        help="Nombres de sessions simultanées du banc 'charge'")
+    parser.add_argument('--sortie', help="Fichier JSON où écrire les résultats")
+    parser.add_argument('--reference', help="Résultats JSON de référence à comparer")
+    parser.add_argument('--seuil', type=float, default=20.0,
+                        help="Régression tolérée par rapport à la référence (%%)")
+    args = parser.parse_args()
+
+    resultats = {'meta': {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'seed': args.seed
+    }}
+    for banc in args.banc or ['donnees', 'charge'] + list(BANCS):
+        if banc == 'donnees':
+            resultats[banc] = banc_donnees(args.tailles, args.repetitions, args.seed)
+            print("Étapes du chemin de données (meilleur temps, pic de mémoire):")
+            for taille, etapes in resultats[banc].items():
+                print(f"  {int(taille):,} vols")
+                for nom, mesure in etapes.items():
+                    print(f"    {nom:28s}: {mesure['temps_ms']:9.1f} ms {mesure['memoire_pic_mo']:9.1f} Mo")
+            continue
+        if banc == 'charge':
+            resultats[banc] = {str(args.nb_vols): banc_charge(args.nb_vols, args.sessions, args.reruns, args.seed)}
+            print(f"Sessions simultanées ({args.nb_vols:,} vols, {args.reruns} reruns par session):")
+            for nb_sessions, mesure in resultats[banc][str(args.nb_vols)].items():
+                rss = '?' if mesure['rss_mo'] is None else f"{mesure['rss_mo']:.0f}"
+                latences = ', '.join(f"{cle[:3]} ?" if mesure[cle] is None else f"{cle[:3]} {mesure[cle]:.0f} ms"
+                                     for cle in ('p50_ms', 'p95_ms', 'p99_ms'))
+                print(f"  {int(nb_sessions):3d} sessions: {latences}, {mesure['debit_reruns_s']:.1f} reruns/s, "
+                      f"RSS {rss} Mo, {mesure['echecs']} échec(s)")
+                if mesure['erreur']:
+                    print(f"      premier échec: {mesure['erreur']}")
+            continue
+        titre, fonction = BANCS[banc]
+        mesures = fonction(args.nb_vols, args.nb_aeroports, args.reruns, args.seed)
+        resultats[banc] = {str(args.nb_vols): mesures}
+        print(f"{titre} ({args.nb_vols:,} vols):")
+        for nom, mesure in mesures.items():
+            print(f"  {nom:10s}: p50 {mesure['p50_ms']:.0f} ms, max {mesure['max_ms']:.0f} ms")
+
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(resultats, f, ensure_ascii=False, indent=2)
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as f:
+            reference = json.load(f)
+        trouvees = regressions({k: v for k, v in resultats.items() if k != 'meta'}, reference, args.seuil)
+        for regression in trouvees:
+            print(f"RÉGRESSION {'/'.join(regression['chemin'])} {regression['mesure']}: "
+                  f"{regression['reference']:.1f} -> {regression['valeur']:.1f} (+{regression['ecart_pct']:.0f}%)")
+        print(f"{len(trouvees)} régression(s) au-delà de {args.seuil:g}% par rapport à {args.reference}")
+        # Des reruns en échec invalident les latences mesurées: la comparaison échoue aussi
+        echecs = sum(mesure['echecs'] for paliers in resultats.get('charge', {}).values()
+                     for mesure in paliers.values())
+        if echecs:
+            print(f"{echecs} rerun(s) en échec dans le banc de charge")
+        sys.exit(1 if trouvees or echecs else 0)
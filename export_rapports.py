@@ -0,0 +1,188 @@
+# export_rapports.py
+"""Export headless des rapports du dashboard (graphiques HTML/PNG, tables CSV/Parquet)
+
+Un rapport est produit pour l'ensemble de la sélection, puis pour chaque aéroport et
+chaque région. Les graphiques sont construits par les mêmes méthodes figure_* que le
+dashboard et les tables par ses méthodes de calcul, si bien que rapports et application
+ne peuvent pas diverger. Les rapports sont répartis entre processus: chaque processus
+reçoit une fois les données statiques (cube et modèle de prévision compris).
+"""
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+import stockage
+from Aeroport import AeroportsFranceDashboard, charger_donnees_statiques, preparer_donnees_statiques
+
+try:
+    import kaleido  # noqa: F401 (moteur d'export PNG de plotly)
+except ImportError:  # kaleido est optionnel: sans lui, seul l'export HTML est possible
+    kaleido = None
+
+FORMATS_FIGURES = ('html', 'png')
+FORMATS_TABLES = ('csv', 'parquet')
+FICHIER_PLOTLYJS = 'plotly.min.js'
+FICHIER_MANIFESTE = 'rapport.json'
+
+# Dashboard du processus d'export, construit une fois par processus sur les données partagées
+_dashboard = None
+
+def initialiser_processus(donnees):
+    """Initialiseur des processus d'export"""
+    global _dashboard
+    _dashboard = AeroportsFranceDashboard(donnees_statiques=donnees)
+
+def nom_fichier(nom):
+    """Nom de fichier sûr pour un aéroport ou une région"""
+    return re.sub(r'[^\w-]+', '_', nom).strip('_')
+
+def tables_rapport(dashboard, vue):
+    """Tables d'un rapport, calculées par les méthodes du dashboard"""
+    tables = {
+        'aeroports': dashboard.instantane_aeroports(vue),
+        'compagnies': dashboard.performance_compagnies(vue),
+        'destinations': dashboard.top_destinations(vue),
+        'trafic_mensuel': dashboard.cube_trafic().requete('mois', 'aeroport', vue['debut'], vue['fin'],
+                                                         vue['aeroports']),
+        'vols': dashboard.vols_data.iloc[vue['positions_vols']]
+    }
+    try:
+        tables['projections'] = dashboard.prevision_trafic().projection(vue['aeroports'],
+                                                                        dashboard.HORIZON_PREVISION)
+    except ValueError:  # historique trop court pour ajuster le modèle
+        pass
+    return tables
+
+def exporter_rapport(tache):
+    """Écrit les graphiques et tables d'un rapport; renvoie les fichiers écrits et les graphiques ignorés
+
+    tache: dict avec niveau, nom, aeroports, debut, fin, formats, repertoire (racine de
+    l'export) et statiques (inclure les graphiques qui ne dépendent pas de la sélection).
+    """
+    debut_export = time.perf_counter()
+    dashboard = _dashboard
+    repertoire = os.path.join(tache['repertoire'], tache['niveau'], nom_fichier(tache['nom']))
+    os.makedirs(repertoire, exist_ok=True)
+    plotlyjs = os.path.relpath(os.path.join(tache['repertoire'], FICHIER_PLOTLYJS), repertoire).replace(os.sep, '/')
+    vue = dashboard.vue_filtree(tache['aeroports'], tache['debut'], tache['fin'])
+
+    fichiers, ignores = [], {}
+    for identifiant, dependance in dashboard.DEPENDANCES_FIGURES.items():
+        # Les scénarios ont leur propre sortie (scenarios.py)
+        if dependance == 'scenarios' or (dependance == 'statique' and not tache['statiques']):
+            continue
+        try:
+            figure = getattr(dashboard, 'figure_' + identifiant)(vue)
+        except (ValueError, TypeError) as erreur:  # par exemple projections indisponibles
+            ignores[identifiant] = f"{type(erreur).__name__}: {erreur}"
+            continue
+        chemin = os.path.join(repertoire, identifiant)
+        if 'html' in tache['formats']:
+            figure.write_html(chemin + '.html', include_plotlyjs=plotlyjs)
+            fichiers.append(chemin + '.html')
+        if 'png' in tache['formats']:
+            figure.write_image(chemin + '.png')
+            fichiers.append(chemin + '.png')
+
+    for nom, table in tables_rapport(dashboard, vue).items():
+        chemin = os.path.join(repertoire, nom)
+        if 'csv' in tache['formats']:
+            table.to_csv(chemin + '.csv', index=False)
+            fichiers.append(chemin + '.csv')
+        if 'parquet' in tache['formats']:
+            table.to_parquet(chemin + '.parquet', index=False)
+            fichiers.append(chemin + '.parquet')
+
+    return {
+        'niveau': tache['niveau'],
+        'nom': tache['nom'],
+        'fichiers': [os.path.relpath(f, tache['repertoire']) for f in fichiers],
+        'ignores': ignores,
+        'duree_s': time.perf_counter() - debut_export
+    }
+
+def taches_export(aeroports, debut, fin, formats, repertoire, niveaux=('aeroport', 'region')):
+    """Rapports à produire: ensemble de la sélection, puis chaque aéroport et chaque région
+
+    aeroports: dict code -> attributs des aéroports retenus.
+    """
+    commun = {'debut': debut, 'fin': fin, 'formats': formats, 'repertoire': repertoire, 'statiques': False}
+    taches = [dict(commun, niveau='ensemble', nom='france', aeroports=list(aeroports), statiques=True)]
+    if 'aeroport' in niveaux:
+        taches += [dict(commun, niveau='aeroport', nom=code, aeroports=[code]) for code in aeroports]
+    if 'region' in niveaux:
+        regions = {}
+        for code, info in aeroports.items():
+            regions.setdefault(info['region'], []).append(code)
+        taches += [dict(commun, niveau='region', nom=region, aeroports=codes) for region, codes in regions.items()]
+    return taches
+
+def exporter_rapports(donnees, taches, repertoire, nb_processus=None):
+    """Exécute les taches d'export dans un pool de processus et écrit le manifeste"""
+    os.makedirs(repertoire, exist_ok=True)
+    if any('html' in tache['formats'] for tache in taches):
+        with open(os.path.join(repertoire, FICHIER_PLOTLYJS), 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())  # partagé par tous les graphiques HTML
+    with ProcessPoolExecutor(nb_processus, initializer=initialiser_processus, initargs=(donnees,)) as executeur:
+        rapports = list(executeur.map(exporter_rapport, taches))
+    with open(os.path.join(repertoire, FICHIER_MANIFESTE), 'w', encoding='utf-8') as f:
+        json.dump({'date': datetime.now().isoformat(timespec='seconds'), 'rapports': rapports},
+                  f, ensure_ascii=False, indent=2)
+    return rapports
+
+def donnees_export(nb_vols=200, nb_aeroports=None, seed=None):
+    """Données statiques de l'export: celles de l'application, ou complétées par des
+    aéroports synthétiques pour les tests de charge"""
+    if not nb_aeroports:
+        return charger_donnees_statiques(nb_vols)
+    dashboard = AeroportsFranceDashboard(nb_vols=nb_vols, seed=seed)
+    dashboard.aeroports = dashboard.generer_aeroports_synthetiques(nb_aeroports)
+    dashboard.vols_data = dashboard.initialize_vols_data()
+    dashboard.traffic_data = dashboard.initialize_traffic_data()
+    return preparer_donnees_statiques(dashboard.donnees_statiques())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export headless des rapports par aéroport et par région")
+    parser.add_argument('--debut', help="Début de la période (AAAA-MM-JJ), tout l'historique par défaut")
+    parser.add_argument('--fin', help="Fin de la période incluse (AAAA-MM-JJ)")
+    parser.add_argument('--aeroports', nargs='+', help="Codes des aéroports (tous par défaut)")
+    parser.add_argument('--niveaux', nargs='+', choices=['aeroport', 'region'], default=['aeroport', 'region'])
+    parser.add_argument('--formats', nargs='+', choices=FORMATS_FIGURES + FORMATS_TABLES, default=['html', 'csv'])
+    parser.add_argument('--sortie', default='rapports', help="Répertoire des rapports")
+    parser.add_argument('--processus', type=int, default=None, help="Nombre de processus (nombre de CPU par défaut)")
+    parser.add_argument('--nb-vols', type=int, default=200)
+    parser.add_argument('--nb-aeroports', type=int, default=None,
+                        help="Complète les aéroports réels par des aéroports synthétiques")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if 'png' in args.formats and kaleido is None:
+        parser.error("kaleido est requis pour l'export PNG (pip install kaleido)")
+    if 'parquet' in args.formats and stockage.pa is None:
+        parser.error("pyarrow est requis pour l'export Parquet (pip install pyarrow)")
+
+    debut_total = time.perf_counter()
+    donnees = donnees_export(args.nb_vols, args.nb_aeroports, args.seed)
+    inconnus = set(args.aeroports or ()) - set(donnees['aeroports'])
+    if inconnus:
+        parser.error(f"aéroports inconnus: {', '.join(sorted(inconnus))}")
+    aeroports = {code: info for code, info in donnees['aeroports'].items()
+                 if args.aeroports is None or code in args.aeroports}
+    debut = None if args.debut is None else pd.Timestamp(args.debut)
+    fin = None if args.fin is None else pd.Timestamp(args.fin)
+
+    taches = taches_export(aeroports, debut, fin, args.formats, args.sortie, args.niveaux)
+    rapports = exporter_rapports(donnees, taches, args.sortie, args.processus)
+    nb_fichiers = sum(len(rapport['fichiers']) for rapport in rapports)
+    print(f"{len(rapports)} rapports, {nb_fichiers} fichiers écrits dans {args.sortie} "
+          f"en {time.perf_counter() - debut_total:.1f} s")
+    for rapport in rapports:
+        for identifiant, erreur in rapport['ignores'].items():
+            print(f"  {rapport['niveau']}/{rapport['nom']}: {identifiant} ignoré ({erreur})")
@@ -0,0 +1,276 @@
+# ingestion.py
+"""Ingestion en flux des changements de statut des vols
+
+Une source produit des événements {'vol_id', 'statut', 'retard_minutes'}. Un thread
+d'ingestion les regroupe en micro-lots, résout les vols en positions de ligne et
+fusionne chaque lot dans un état en attente qui ne garde que le dernier statut de
+chaque vol: la mémoire est bornée par le nombre de vols, et non par le nombre
+d'événements reçus entre deux exécutions, et la source n'attend jamais le dashboard.
+Celui-ci vide l'état en attente à chaque exécution sans attendre d'entrée/sortie.
+"""
+import argparse
+import csv
+import json
+import socket
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+class SourceEvenementsVols:
+    """Interface des sources d'événements de vol"""
+
+    def evenements(self):
+        """Itère sur les événements {'vol_id', 'statut', 'retard_minutes'}"""
+        raise NotImplementedError
+
+    def fermer(self):
+        """Libère les ressources de la source"""
+
+class SourceRejeu(SourceEvenementsVols):
+    """Rejoue un fichier d'événements (JSON lines ou CSV) à un débit donné
+
+    debit: événements par seconde, ou None pour lire aussi vite que possible.
+    """
+    VERIFICATION_DEBIT = 64  # événements entre deux contrôles du rythme
+
+    def __init__(self, chemin, debit=None):
+        self.chemin = chemin
+        self.debit = debit
+        self._fichier = None
+
+    def _lire(self):
+        self._fichier = open(self.chemin, encoding='utf-8', newline='')
+        if self.chemin.endswith('.csv'):
+            for ligne in csv.DictReader(self._fichier):
+                yield ligne
+        else:
+            for ligne in self._fichier:
+                if ligne.strip():
+                    yield json.loads(ligne)
+
+    def evenements(self):
+        debut = time.monotonic()
+        for i, evenement in enumerate(self._lire()):
+            if self.debit and i % self.VERIFICATION_DEBIT == 0:
+                attente = debut + i / self.debit - time.monotonic()
+                if attente > 0:
+                    time.sleep(attente)
+            yield evenement
+        self.fermer()
+
+    def fermer(self):
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
+
+class SourceSocket(SourceEvenementsVols):
+    """Lit des événements JSON, un par ligne, sur une connexion TCP locale"""
+
+    def __init__(self, hote, port):
+        self.hote = hote
+        self.port = port
+        self._connexion = None
+
+    def evenements(self):
+        self._connexion = socket.create_connection((self.hote, self.port))
+        with self._connexion.makefile('r', encoding='utf-8') as flux:
+            for ligne in flux:
+                if ligne.strip():
+                    yield json.loads(ligne)
+        self.fermer()
+
+    def fermer(self):
+        if self._connexion is not None:
+            self._connexion.close()
+            self._connexion = None
+
+class ServeurFluxLocal:
+    """Flux TCP local de remplacement: diffuse les événements d'une source à chaque client"""
+
+    def __init__(self, fabrique_source, hote='127.0.0.1', port=0):
+        self.fabrique_source = fabrique_source
+        self._serveur = socket.create_server((hote, port))
+        self.hote, self.port = self._serveur.getsockname()[:2]
+        self._thread = threading.Thread(target=self._accepter, daemon=True)
+
+    def demarrer(self):
+        self._thread.start()
+        return self
+
+    def _accepter(self):
+        while True:
+            try:
+                client, _ = self._serveur.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._diffuser, args=(client,), daemon=True).start()
+
+    def _diffuser(self, client):
+        source = self.fabrique_source()
+        try:
+            with client, client.makefile('w', encoding='utf-8') as sortie:
+                for evenement in source.evenements():
+                    sortie.write(json.dumps(evenement, ensure_ascii=False) + '\n')
+        except OSError:
+            pass
+        finally:
+            source.fermer()
+
+    def arreter(self):
+        self._serveur.close()
+
+class IngestionVols:
+    """Thread d'ingestion: source -> micro-lots résolus -> dernier statut par vol -> drainer()"""
+
+    def __init__(self, source, vol_ids, statuts, taille_lot=1000, delai_lot=0.05):
+        self.source = source
+        self.taille_lot = taille_lot
+        self.delai_lot = delai_lot
+        # Résolution vol_id -> position: un identifiant répété rendrait ses événements ambigus
+        self.positions_vols = pd.Series(np.arange(len(vol_ids)), index=vol_ids)
+        if not self.positions_vols.index.is_unique:
+            repetes = self.positions_vols.index[self.positions_vols.index.duplicated()].unique()
+            raise ValueError(f"{len(repetes)} identifiants de vol en double (par exemple {repetes[0]}): "
+                             "régénérer les données ou les instantanés")
+        self.codes_statut = {statut: code for code, statut in enumerate(statuts)}
+        # Dernier statut (-1: aucun événement en attente) et retard reçus pour chaque vol
+        self._statuts = np.full(len(vol_ids), -1, dtype=np.int64)
+        self._retards = np.zeros(len(vol_ids), dtype=np.int64)
+        self._verrou = threading.Lock()
+        self.nb_evenements = 0
+        self.nb_ignores = 0
+        self.debut = self.fin = None
+        self.termine = False
+        self._arret = threading.Event()
+        self._thread = threading.Thread(target=self._boucle, daemon=True)
+
+    def demarrer(self):
+        self._thread.start()
+        return self
+
+    def arreter(self):
+        self._arret.set()
+        self.source.fermer()
+
+    def _boucle(self):
+        lot = []
+        self.debut = debut_lot = time.monotonic()
+        try:
+            for evenement in self.source.evenements():
+                if self._arret.is_set():
+                    break
+                lot.append(evenement)
+                if len(lot) >= self.taille_lot or time.monotonic() - debut_lot >= self.delai_lot:
+                    self._publier(lot)
+                    lot = []
+                    debut_lot = time.monotonic()
+            if lot:
+                self._publier(lot)
+        finally:
+            self.fin = time.monotonic()
+            self.termine = True
+
+    def _publier(self, lot):
+        """Convertit un micro-lot en tableaux et le fusionne dans l'état en attente"""
+        positions = self.positions_vols.reindex([e['vol_id'] for e in lot]).to_numpy()
+        statuts = np.array([self.codes_statut.get(e['statut'], -1) for e in lot], dtype=np.int64)
+        retards = np.array([int(e.get('retard_minutes') or 0) for e in lot], dtype=np.int64)
+        valides = ~np.isnan(positions) & (statuts >= 0)
+        self.nb_evenements += len(lot)
+        self.nb_ignores += int((~valides).sum())
+        positions, statuts, retards = positions[valides].astype(np.int64), statuts[valides], retards[valides]
+
+        # Dernier événement de chaque vol du lot: il remplace celui qui était en attente
+        _, derniers = np.unique(positions[::-1], return_index=True)
+        garder = len(positions) - 1 - derniers
+        with self._verrou:
+            self._statuts[positions[garder]] = statuts[garder]
+            self._retards[positions[garder]] = retards[garder]
+
+    def en_attente(self):
+        """Nombre de vols dont un nouveau statut attend le prochain drainer()"""
+        return int(np.count_nonzero(self._statuts >= 0))
+
+    def drainer(self, dashboard):
+        """Applique sans attendre le dernier statut reçu de chaque vol et renvoie le delta de statut"""
+        with self._verrou:
+            positions = np.flatnonzero(self._statuts >= 0)
+            statuts = self._statuts[positions]
+            retards = self._retards[positions]
+            self._statuts[positions] = -1
+        return dashboard.appliquer_changements_statut(positions, statuts, retards)
+
+def source_depuis_specification(specification):
+    """Construit une source depuis 'rejeu:CHEMIN[@DEBIT]' ou 'socket:HOTE:PORT'"""
+    type_source, _, parametres = specification.partition(':')
+    if type_source == 'rejeu':
+        chemin, _, debit = parametres.partition('@')
+        return SourceRejeu(chemin, float(debit) if debit else None)
+    if type_source == 'socket':
+        hote, _, port = parametres.rpartition(':')
+        return SourceSocket(hote or '127.0.0.1', int(port))
+    raise ValueError(f"Source de flux inconnue: {specification}")
+
+def ecrire_fichier_rejeu(vol_ids, statuts, chemin, nb_evenements, seed=None):
+    """Écrit un fichier JSON lines d'événements tirés parmi les identifiants de vol donnés"""
+    rng = np.random.default_rng(seed)
+    vol_ids = np.asarray(vol_ids)[rng.integers(0, len(vol_ids), nb_evenements)]
+    codes = rng.choice(len(statuts), size=nb_evenements, p=[0.6, 0.35, 0.05])
+    retards = np.where(np.array(statuts)[codes] == 'Retardé', rng.integers(5, 121, nb_evenements), 0)
+    with open(chemin, 'w', encoding='utf-8') as f:
+        for vol_id, code, retard in zip(vol_ids, codes, retards):
+            f.write(json.dumps({'vol_id': vol_id, 'statut': statuts[code], 'retard_minutes': int(retard)},
+                               ensure_ascii=False) + '\n')
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from Aeroport import AeroportsFranceDashboard
+
+    parser = argparse.ArgumentParser(description="Banc d'essai de l'ingestion en flux des statuts de vol")
+    parser.add_argument('--nb-vols', type=int, default=500_000)
+    parser.add_argument('--debit', type=float, default=10_000, help="Événements par seconde")
+    parser.add_argument('--duree', type=float, default=90, help="Durée du rejeu (s)")
+    parser.add_argument('--intervalle-rerun', type=float, default=30,
+                        help="Période des exécutions simulées (s), par défaut l'intervalle de rafraîchissement du dashboard")
+    parser.add_argument('--socket', action='store_true', help="Passe par un flux TCP local au lieu du fichier")
+    args = parser.parse_args()
+
+    dashboard = AeroportsFranceDashboard(nb_vols=args.nb_vols, seed=0)
+    chemin = os.path.join(tempfile.mkdtemp(), 'evenements.jsonl')
+    ecrire_fichier_rejeu(dashboard.libelles_vol_id(dashboard.vols_data).to_numpy(), dashboard.STATUTS,
+                         chemin, int(args.debit * args.duree), seed=0)
+
+    serveur = None
+    if args.socket:
+        serveur = ServeurFluxLocal(lambda: SourceRejeu(chemin, args.debit)).demarrer()
+        source = SourceSocket(serveur.hote, serveur.port)
+    else:
+        source = SourceRejeu(chemin, args.debit)
+    dashboard.brancher_source(source)
+
+    # Boucle d'exécutions simulées: chaque exécution ne fait qu'appliquer les statuts en attente
+    ingestion = dashboard.ingestion
+    durees, en_attente, vols_modifies = [], [], 0
+    while True:
+        time.sleep(args.intervalle_rerun)
+        fini = ingestion.termine
+        en_attente.append(ingestion.en_attente())
+        t = time.perf_counter()
+        vols_modifies += len(dashboard.update_live_data()['positions'])
+        durees.append(time.perf_counter() - t)
+        if fini:
+            break
+    if serveur is not None:
+        serveur.arreter()
+
+    ecoule = ingestion.fin - ingestion.debut
+    durees = np.array(durees) * 1000
+    print(f"{ingestion.nb_evenements:,} événements en {ecoule:.2f} s "
+          f"({ingestion.nb_evenements / ecoule:,.0f} évén./s, {ingestion.nb_ignores} ignorés)")
+    print(f"{len(durees)} exécutions toutes les {args.intervalle_rerun:g} s: jusqu'à {max(en_attente):,} vols "
+          f"en attente par exécution, {vols_modifies:,} statuts modifiés")
+    print(f"Application des statuts en attente par exécution: p50 {np.percentile(durees, 50):.1f} ms, "
+          f"p99 {np.percentile(durees, 99):.1f} ms, max {durees.max():.1f} ms")
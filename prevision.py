@@ -0,0 +1,153 @@
+# prevision.py
+"""Prévision du trafic mensuel par aéroport (Holt-Winters vectorisé)
+
+Le modèle est un Holt-Winters additif à tendance amortie ajusté sur le logarithme
+des passagers mensuels, ce qui revient à une saisonnalité multiplicative. Toutes
+les séries et toutes les combinaisons de paramètres de la grille sont filtrées
+ensemble: la récurrence ne boucle que sur le temps, chaque pas étant une opération
+sur un tableau (combinaisons × séries).
+"""
+import argparse
+import time
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+class ModeleHoltWinters:
+    """Holt-Winters additif à tendance amortie, ajusté par recherche sur grille
+
+    Pour chaque série, la combinaison (alpha, beta, gamma) retenue est celle qui
+    minimise la somme des carrés des erreurs de prévision à un pas.
+    """
+    GRILLE_ALPHA = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+    GRILLE_BETA = (0.0, 0.01, 0.05, 0.1, 0.2)
+    GRILLE_GAMMA = (0.05, 0.1, 0.2, 0.4)
+    AMORTISSEMENT = 0.98  # phi: la tendance s'atténue au fil de l'horizon
+
+    def __init__(self, periode=12):
+        self.periode = periode
+        self.parametres = None
+
+    def ajuster(self, series):
+        """Ajuste le modèle sur des séries (n_series, n_periodes) et renvoie self"""
+        series = np.asarray(series, dtype=np.float64)
+        m = self.periode
+        if series.shape[1] < 2 * m:
+            raise ValueError(f"Au moins {2 * m} périodes sont nécessaires, {series.shape[1]} fournies")
+        alpha, beta, gamma = (g.ravel() for g in np.meshgrid(self.GRILLE_ALPHA, self.GRILLE_BETA,
+                                                               self.GRILLE_GAMMA, indexing='ij'))
+        nb_combinaisons, nb_series = len(alpha), len(series)
+        phi = self.AMORTISSEMENT
+
+        # États initiaux à partir des deux premières saisons, dupliqués pour chaque combinaison
+        saison1, saison2 = series[:, :m].mean(axis=1), series[:, m:2 * m].mean(axis=1)
+        niveau = np.broadcast_to(saison1, (nb_combinaisons, nb_series)).copy()
+        tendance = np.broadcast_to((saison2 - saison1) / m, (nb_combinaisons, nb_series)).copy()
+        saisons = np.broadcast_to(series[:, :m] - saison1[:, None], (nb_combinaisons, nb_series, m)).copy()
+        alpha, beta, gamma = alpha[:, None], beta[:, None], gamma[:, None]
+
+        sse = np.zeros((nb_combinaisons, nb_series))
+        for t in range(series.shape[1]):
+            s = t % m
+            y = series[:, t]
+            saison = saisons[:, :, s]
+            erreur = y - (niveau + phi * tendance + saison)
+            if t >= m:  # la première saison sert à l'initialisation
+                sse += erreur ** 2
+            nouveau_niveau = alpha * (y - saison) + (1 - alpha) * (niveau + phi * tendance)
+            tendance = beta * (nouveau_niveau - niveau) + (1 - beta) * phi * tendance
+            saisons[:, :, s] = gamma * (y - nouveau_niveau) + (1 - gamma) * saison
+            niveau = nouveau_niveau
+
+        # Meilleure combinaison par série
+        meilleure = np.argmin(sse, axis=0)
+        series_idx = np.arange(nb_series)
+        self.parametres = {
+            'alpha': alpha[meilleure, 0],
+            'beta': beta[meilleure, 0],
+            'gamma': gamma[meilleure, 0]
+        }
+        self.niveau = niveau[meilleure, series_idx]
+        self.tendance = tendance[meilleure, series_idx]
+        self.saisons = saisons[meilleure, series_idx]
+        self.nb_periodes = series.shape[1]
+        self.sigma = np.sqrt(sse[meilleure, series_idx] / (series.shape[1] - m))
+        return self
+
+    def prevoir(self, horizon, niveau_confiance=0.95):
+        """Prévisions (n_series, horizon) et bornes de l'intervalle de prévision
+
+        La variance à h pas suit la formule de l'ETS(A,Ad,A):
+        sigma² (1 + somme des c_j², j < h), c_j = alpha (1 + beta (phi + ... + phi^j)) + gamma [j multiple de m].
+        """
+        if self.parametres is None:
+            raise RuntimeError("Le modèle doit être ajusté avant de prévoir")
+        m, phi = self.periode, self.AMORTISSEMENT
+        h = np.arange(1, horizon + 1)
+        cumul_phi = np.cumsum(phi ** h)  # phi + phi² + ... + phi^h
+        indices_saison = (self.nb_periodes + h - 1) % m
+        prevision = (self.niveau[:, None] + cumul_phi[None, :] * self.tendance[:, None]
+                     + self.saisons[:, indices_saison])
+
+        alpha, beta, gamma = (self.parametres[p][:, None] for p in ('alpha', 'beta', 'gamma'))
+        j = h[:-1]
+        c = alpha * (1 + beta * cumul_phi[None, :-1]) + gamma * (j % m == 0)[None, :]
+        variance = self.sigma[:, None] ** 2 * (1 + np.concatenate([np.zeros((len(c), 1)),
+                                                                   np.cumsum(c ** 2, axis=1)], axis=1))
+        z = NormalDist().inv_cdf(0.5 + niveau_confiance / 2)
+        ecart = z * np.sqrt(variance)
+        return prevision, prevision - ecart, prevision + ecart
+
+class PrevisionTrafic:
+    """Prévisions mensuelles des passagers par aéroport, à partir du cube de trafic
+
+    Le modèle est ajusté une fois par jeu de données de trafic; un mois en cours
+    incomplet (données quotidiennes) est écarté de l'ajustement.
+    """
+
+    def __init__(self, cube):
+        self.cube = cube
+        self.traffic_data = cube.traffic_data
+        mensuel = cube.requete('mois', 'aeroport')
+        matrice = mensuel.pivot(index='aeroport', columns='date', values='passagers')
+        if matrice.columns[-1] > self.traffic_data['date'].max():
+            matrice = matrice.iloc[:, :-1]
+        matrice = matrice.ffill(axis=1).bfill(axis=1)
+        self.aeroports = list(matrice.index)
+        self.dates = matrice.columns
+        self.modele = ModeleHoltWinters(periode=12).ajuster(np.log(np.maximum(matrice.to_numpy(), 1)))
+
+    def projection(self, aeroports=None, horizon=12, niveau_confiance=0.95):
+        """Projection des `aeroports` sur `horizon` mois: date, aeroport, passagers et bornes"""
+        prevision, bas, haut = (np.exp(v) for v in self.modele.prevoir(horizon, niveau_confiance))
+        dates = pd.date_range(self.dates[-1] + pd.offsets.MonthEnd(1), periods=horizon, freq='ME')
+        resultat = pd.DataFrame({
+            'date': np.tile(dates, len(self.aeroports)),
+            'aeroport': np.repeat(self.aeroports, horizon),
+            'passagers': prevision.ravel(),
+            'borne_basse': bas.ravel(),
+            'borne_haute': haut.ravel()
+        })
+        if aeroports is not None:
+            resultat = resultat[resultat['aeroport'].isin(aeroports)].reset_index(drop=True)
+        return resultat
+
+if __name__ == "__main__":
+    from Aeroport import AeroportsFranceDashboard, CubeTrafic
+
+    parser = argparse.ArgumentParser(description="Temps d'ajustement des prévisions de trafic")
+    parser.add_argument('--nb-aeroports', type=int, default=150)
+    parser.add_argument('--debut', default='1994-01-01', help="Début de l'historique de trafic")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    dashboard = AeroportsFranceDashboard(seed=args.seed)
+    aeroports = dashboard.generer_aeroports_synthetiques(args.nb_aeroports)
+    traffic_data = dashboard.initialize_traffic_data(args.debut, aeroports=aeroports)
+    cube = CubeTrafic(traffic_data)
+    debut = time.perf_counter()
+    prevision = PrevisionTrafic(cube)
+    duree = time.perf_counter() - debut
+    print(f"{len(prevision.aeroports)} aéroports × {len(prevision.dates)} mois ajustés en {duree * 1000:.0f} ms")
+    print(prevision.projection(horizon=3).head(6).to_string(index=False))
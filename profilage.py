@@ -0,0 +1,132 @@
+# profilage.py
+"""Mesure des temps d'exécution du dashboard
+
+Les étapes (initialisation, mise à jour live, sections, figures) sont chronométrées
+dans un tampon circulaire: durée, lignes traitées et taille des figures envoyées.
+Désactivé, un point de mesure ne coûte qu'un test d'attribut.
+"""
+import contextlib
+import functools
+import json
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+class Profileur:
+    """Tampon circulaire des mesures d'exécution, exportable en JSON lines"""
+
+    def __init__(self, capacite=5000, actif=False):
+        self.actif = actif
+        self.mesures = deque(maxlen=capacite)
+        self.execution = 0
+        self.sequence = 0
+        self.derniere_exportee = 0
+
+    def nouvelle_execution(self):
+        """Marque le début d'une exécution du script"""
+        self.execution += 1
+
+    def enregistrer(self, etape, duree, lignes=None, octets=None):
+        """Ajoute une mesure (duree en secondes)"""
+        self.sequence += 1
+        self.mesures.append({
+            'sequence': self.sequence,
+            'horodatage': time.time(),
+            'execution': self.execution,
+            'etape': etape,
+            'duree_ms': duree * 1000,
+            'lignes': lignes,
+            'octets': octets
+        })
+
+    @contextlib.contextmanager
+    def chronometrer(self, etape, lignes=None):
+        """Chronomètre le bloc `with` quand le profileur est actif"""
+        if not self.actif:
+            yield
+            return
+        debut = time.perf_counter()
+        yield
+        self.enregistrer(etape, time.perf_counter() - debut, lignes)
+
+    def reprendre(self, mesures):
+        """Ajoute des mesures prises par un autre profileur (construction partagée des données),
+        numérotées à la suite et rattachées à l'exécution 0"""
+        for mesure in mesures:
+            self.sequence += 1
+            self.mesures.append(dict(mesure, sequence=self.sequence, execution=0))
+
+    def resume(self):
+        """Statistiques par étape sur le tampon: nombre d'appels, dernière durée, p50/p95, lignes et octets"""
+        if not self.mesures:
+            return pd.DataFrame(columns=['etape', 'appels', 'derniere_ms', 'p50_ms', 'p95_ms', 'lignes', 'octets'])
+        mesures = pd.DataFrame(self.mesures)
+        groupes = mesures.groupby('etape', sort=False)
+        resume = pd.DataFrame({
+            'appels': groupes.size(),
+            'derniere_ms': groupes['duree_ms'].last(),
+            'p50_ms': groupes['duree_ms'].median(),
+            'p95_ms': groupes['duree_ms'].quantile(0.95),
+            'lignes': groupes['lignes'].last(),
+            'octets': groupes['octets'].last()
+        })
+        return resume.sort_values('p50_ms', ascending=False).reset_index()
+
+    def exporter(self, chemin):
+        """Ajoute au fichier JSON lines les mesures non encore exportées; renvoie leur nombre"""
+        nouvelles = [m for m in self.mesures if m['sequence'] > self.derniere_exportee]
+        with open(chemin, 'a', encoding='utf-8') as f:
+            for mesure in nouvelles:
+                f.write(json.dumps(mesure, ensure_ascii=False, default=int) + '\n')
+        if nouvelles:
+            self.derniere_exportee = nouvelles[-1]['sequence']
+        return len(nouvelles)
+
+def chronometre(etape, lignes=None):
+    """Décorateur de méthode: chronomètre l'appel quand `self.profileur` est actif
+
+    lignes: fonction optionnelle (self, resultat, *args) -> nombre de lignes traitées.
+    """
+    def decorateur(methode):
+        @functools.wraps(methode)
+        def enveloppe(self, *args, **kwargs):
+            profileur = self.profileur
+            if not profileur.actif:
+                return methode(self, *args, **kwargs)
+            debut = time.perf_counter()
+            resultat = methode(self, *args, **kwargs)
+            duree = time.perf_counter() - debut
+            profileur.enregistrer(etape, duree, None if lignes is None else int(lignes(self, resultat, *args)))
+            return resultat
+        return enveloppe
+    return decorateur
+
+def lignes_resultat(self, resultat, *args):
+    """Nombre de lignes d'un résultat tabulaire"""
+    return len(resultat)
+
+def lignes_delta(self, delta, *args):
+    """Nombre de vols modifiés par un delta de statut"""
+    return len(delta['positions'])
+
+def lignes_vue(self, resultat, vue, *args):
+    """Nombre de vols de la vue passée en premier argument"""
+    return len(vue['positions_vols'])
+
+def lignes_tableau(self, resultat, positions, *args):
+    """Nombre de positions passées en premier argument"""
+    return len(positions)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Résumé d'un fichier de mesures JSON lines")
+    parser.add_argument('fichier')
+    args = parser.parse_args()
+
+    mesures = pd.read_json(args.fichier, lines=True)
+    resume = mesures.groupby('etape')['duree_ms'].agg(['count', 'median', lambda d: np.percentile(d, 95)])
+    resume.columns = ['appels', 'p50_ms', 'p95_ms']
+    print(resume.sort_values('p50_ms', ascending=False).to_string(float_format='{:.1f}'.format))
@@ -0,0 +1,286 @@
+# scenarios.py
+"""Scénarios Monte-Carlo de ponctualité: répliques du modèle de statut des vols
+
+Une réplique tire les aléas de la journée (retards et annulations primaires, temps
+de vol et d'escale) puis calcule les départs de tous les vols sans boucle sur les
+vols: attente au décollage par aéroport, selon la capacité de ses pistes, et
+propagation des retards le long des rotations, niveau par niveau. Le modèle reprend
+les paramètres de la simulation live (simulation.py), sans les portes.
+
+Un scénario modifie le modèle (taux de retard d'une compagnie ou d'un aéroport,
+pistes en moins); ses répliques sont réparties sur un pool de processus, chacune avec
+sa propre graine dérivée de la graine du scénario, si bien que les résultats ne
+dépendent ni du nombre de processus ni du découpage en lots. Les distributions par
+aéroport et par compagnie sont écrites en JSON et relues par le dashboard.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import stockage
+from simulation import PlanRotations, SimulationRotations
+
+# Scénarios prédéfinis: facteurs du taux de retard primaire et pistes indisponibles
+SCENARIOS = {
+    'reference': {
+        'description': "Situation de référence"
+    },
+    'ryanair_retards_x2': {
+        'description': "Taux de retard de Ryanair doublé",
+        'facteurs_compagnie': {'Ryanair': 2.0}
+    },
+    'ory_piste_fermee': {
+        'description': "Orly perd une piste",
+        'pistes_fermees': {'ORY': 1}
+    }
+}
+AXES = {'aeroport_depart': 'aeroports', 'compagnie': 'compagnies'}
+MESURES = ('taux_ponctualite', 'retard_moyen', 'taux_annulation')
+CENTILES = (5, 50, 95)
+
+class ModeleStatutsVols:
+    """Modèle vectorisé du statut des vols d'une journée, construit depuis le plan des rotations"""
+    DUREE_CRENEAU = 15       # minutes par créneau de décollage
+    MARGE_CAPACITE = 1.1     # capacité des pistes par rapport à la demande programmée maximale
+
+    def __init__(self, plan, aeroports):
+        self.programme = plan.programme
+        self.depart = plan.depart
+        self.codes = {'aeroport_depart': plan.depart,
+                      'compagnie': plan.vols_data['compagnie'].cat.codes.to_numpy().astype(np.int64)}
+        self.categories = {'aeroport_depart': plan.aeroports_depart,
+                           'compagnie': list(plan.vols_data['compagnie'].cat.categories)}
+        self.disponibilite = plan.duree_vol + plan.delai_disponibilite
+        self.temps_rotation = plan.TEMPS_ROTATION
+
+        # Rotations par niveaux: premier vol de chaque avion, puis vols suivants
+        n = len(plan)
+        self.predecesseur = np.full(n, -1, dtype=np.int64)
+        avec_suivant = np.flatnonzero(plan.successeur >= 0)
+        self.predecesseur[plan.successeur[avec_suivant]] = avec_suivant
+        self.niveaux = []
+        niveau = np.flatnonzero(self.predecesseur < 0)
+        while len(niveau):
+            self.niveaux.append(niveau)
+            niveau = plan.successeur[niveau]
+            niveau = niveau[niveau >= 0]
+
+        # Capacité par piste: demande programmée maximale par créneau, répartie sur les pistes
+        self.creneau = (self.programme // self.DUREE_CRENEAU).astype(np.int64) if n else np.empty(0, np.int64)
+        self.nb_creneaux = int(self.creneau.max()) + 1 if n else 0
+        demande = np.bincount(self.depart * self.nb_creneaux + self.creneau,
+                              minlength=len(plan.aeroports_depart) * self.nb_creneaux)
+        demande_max = demande.reshape(len(plan.aeroports_depart), -1).max(axis=1, initial=0)
+        self.pistes = np.array([aeroports[code]['pistes'] for code in plan.aeroports_depart], dtype=np.float64)
+        self.capacite_piste = np.maximum(demande_max, 1) * self.MARGE_CAPACITE / self.pistes
+
+    def __len__(self):
+        return len(self.programme)
+
+    def facteurs(self, scenario, axe, cle):
+        """Facteurs par vol de l'axe, à partir du dict `cle` du scénario (valeur -> facteur)"""
+        valeurs = scenario.get(cle, {})
+        par_categorie = np.array([valeurs.get(v, 1.0) for v in self.categories[axe]])
+        return par_categorie[self.codes[axe]]
+
+    def repliquer(self, scenario, rng):
+        """Une réplique: nombre de vols, vols ponctuels, annulés et minutes de retard par aéroport
+        et par compagnie (dict axe -> tableau (4, nb_categories))"""
+        n = len(self)
+        probabilites = np.minimum(SimulationRotations.PROBA_RETARD_PRIMAIRE
+                                  * self.facteurs(scenario, 'compagnie', 'facteurs_compagnie')
+                                  * self.facteurs(scenario, 'aeroport_depart', 'facteurs_aeroport'), 1)
+        primaire = np.where(rng.random(n) < probabilites,
+                            rng.exponential(SimulationRotations.RETARD_PRIMAIRE_MOYEN, n), 0.0)
+        annule = rng.random(n) < SimulationRotations.PROBA_ANNULATION
+        disponibilite = np.maximum(self.disponibilite + rng.normal(0, SimulationRotations.ECART_TYPE_DUREE, n),
+                                   self.temps_rotation)
+
+        # Attente au décollage: file par aéroport alimentée par la demande de chaque créneau
+        fermees = scenario.get('pistes_fermees', {})
+        pistes = np.maximum(self.pistes - [fermees.get(code, 0) for code in self.categories['aeroport_depart']], 0)
+        capacite = np.maximum(self.capacite_piste * pistes, 1e-9)
+        demande = np.bincount(self.depart * self.nb_creneaux + self.creneau, weights=~annule,
+                              minlength=len(pistes) * self.nb_creneaux).reshape(len(pistes), -1)
+        file = np.zeros(len(pistes))
+        attente = np.empty_like(demande)
+        for creneau in range(self.nb_creneaux):
+            file = np.maximum(file + demande[:, creneau] - capacite, 0)
+            attente[:, creneau] = file / capacite * self.DUREE_CRENEAU
+        retard_propre = primaire + attente[self.depart, self.creneau]
+
+        # Propagation le long des rotations; un vol annulé est remplacé par un avion de réserve
+        depart_reel = np.empty(n)
+        for niveau in self.niveaux:
+            precedent = self.predecesseur[niveau]
+            pret = np.full(len(niveau), -np.inf)
+            avec_avion = (precedent >= 0)
+            avec_avion[avec_avion] = ~annule[precedent[avec_avion]]
+            pret[avec_avion] = depart_reel[precedent[avec_avion]] + disponibilite[precedent[avec_avion]]
+            depart_reel[niveau] = np.maximum(self.programme[niveau], pret) + retard_propre[niveau]
+            annule[niveau] |= depart_reel[niveau] - self.programme[niveau] > SimulationRotations.SEUIL_ANNULATION
+
+        retard = np.where(annule, 0, depart_reel - self.programme)
+        ponctuel = ~annule & (retard < SimulationRotations.SEUIL_RETARD)
+        resultats = {}
+        for axe, codes in self.codes.items():
+            nb = len(self.categories[axe])
+            resultats[axe] = np.stack([np.bincount(codes, minlength=nb),
+                                       np.bincount(codes, weights=ponctuel, minlength=nb),
+                                       np.bincount(codes, weights=annule, minlength=nb),
+                                       np.bincount(codes, weights=retard, minlength=nb)])
+        return resultats
+
+# Modèle du processus de calcul, reçu une fois par processus
+_modele = None
+
+def initialiser_processus(modele):
+    """Initialiseur des processus de calcul"""
+    global _modele
+    _modele = modele
+
+def repliquer_lot(scenario, graines):
+    """Répliques d'un lot de graines: mesures par axe, tableaux (répliques, mesures, catégories)"""
+    repliques = [_modele.repliquer(scenario, np.random.default_rng(graine)) for graine in graines]
+    return {axe: np.stack([r[axe] for r in repliques]) for axe in _modele.codes}
+
+def mesures_repliques(comptes):
+    """Taux de ponctualité et d'annulation (%) et retard moyen (min) par réplique et catégorie"""
+    nb, ponctuels, annules, retards = (comptes[:, i] for i in range(4))
+    diviseur = np.maximum(nb, 1)
+    return {
+        'taux_ponctualite': ponctuels / diviseur * 100,
+        'retard_moyen': retards / np.maximum(nb - annules, 1),
+        'taux_annulation': annules / diviseur * 100
+    }
+
+def resumer(modele, comptes):
+    """Distribution de chaque mesure sur les répliques: moyenne, écart type et centiles"""
+    lignes = []
+    for axe, comptes_axe in comptes.items():
+        for mesure, valeurs in mesures_repliques(comptes_axe).items():
+            centiles = np.percentile(valeurs, CENTILES, axis=0)
+            for j, valeur in enumerate(modele.categories[axe]):
+                if comptes_axe[0, 0, j] == 0:  # catégorie sans vol programmé
+                    continue
+                ligne = {'axe': axe, 'valeur': valeur, 'mesure': mesure,
+                         'moyenne': float(valeurs[:, j].mean()), 'ecart_type': float(valeurs[:, j].std())}
+                ligne.update({f'p{c:02d}': float(centiles[k, j]) for k, c in enumerate(CENTILES)})
+                lignes.append(ligne)
+    return lignes
+
+def executer_scenario(modele, nom, scenario, nb_repliques=1000, seed=0, nb_processus=None, taille_lot=50,
+                      seed_programme=None, instantanes=None):
+    """Exécute les répliques d'un scénario sur un pool de processus et résume leurs distributions
+
+    seed_programme, instantanes: origine du programme des vols simulé (graine de génération
+    ou répertoire d'instantanés), notée dans le résultat pour que des résultats en cache ne
+    soient comparés que sur un même programme.
+    """
+    debut = time.perf_counter()
+    graines = np.random.SeedSequence(seed).spawn(nb_repliques)
+    lots = [graines[i:i + taille_lot] for i in range(0, nb_repliques, taille_lot)]
+    with ProcessPoolExecutor(nb_processus, initializer=initialiser_processus, initargs=(modele,)) as executeur:
+        resultats = list(executeur.map(repliquer_lot, [scenario] * len(lots), lots))
+    comptes = {axe: np.concatenate([r[axe] for r in resultats]) for axe in modele.codes}
+    return {
+        'scenario': nom,
+        'description': scenario.get('description', nom),
+        'parametres': {cle: valeur for cle, valeur in scenario.items() if cle != 'description'},
+        'nb_repliques': nb_repliques,
+        'seed': seed,
+        'seed_programme': seed_programme,
+        'instantanes': instantanes,
+        'nb_vols': len(modele),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'duree_s': time.perf_counter() - debut,
+        'resume': resumer(modele, comptes)
+    }
+
+def sauvegarder_resultat(resultat, repertoire):
+    """Écrit le résultat d'un scénario dans `repertoire` (un fichier JSON par scénario)"""
+    os.makedirs(repertoire, exist_ok=True)
+    chemin = os.path.join(repertoire, resultat['scenario'] + '.json')
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(resultat, f, ensure_ascii=False, indent=2)
+    return chemin
+
+def signature_repertoire(repertoire):
+    """Fichiers de résultats et dates de modification, pour invalider un cache de lecture"""
+    if not repertoire or not os.path.isdir(repertoire):
+        return ()
+    return tuple((chemin, os.path.getmtime(chemin))
+                 for chemin in sorted(glob.glob(os.path.join(repertoire, '*.json'))))
+
+def charger_resultats(repertoire):
+    """Résultats des scénarios d'un répertoire: dict nom -> résultat, résumé en DataFrame"""
+    resultats = {}
+    for chemin, _ in signature_repertoire(repertoire):
+        with open(chemin, encoding='utf-8') as f:
+            resultat = json.load(f)
+        resultat['resume'] = pd.DataFrame(resultat['resume'])
+        resultats[resultat['scenario']] = resultat
+    return resultats
+
+def lire_facteurs(paires, type_valeur=float):
+    """Convertit des arguments 'CLE=VALEUR' en dict"""
+    facteurs = {}
+    for paire in paires or ():
+        cle, _, valeur = paire.partition('=')
+        facteurs[cle] = type_valeur(valeur)
+    return facteurs
+
+if __name__ == "__main__":
+    from Aeroport import AeroportsFranceDashboard
+
+    parser = argparse.ArgumentParser(description="Scénarios Monte-Carlo de ponctualité")
+    parser.add_argument('--scenario', choices=list(SCENARIOS), action='append',
+                        help="Scénario prédéfini (répétable, tous par défaut sans scénario personnalisé)")
+    parser.add_argument('--nom', help="Nom d'un scénario personnalisé")
+    parser.add_argument('--facteur-compagnie', action='append', metavar='COMPAGNIE=FACTEUR')
+    parser.add_argument('--facteur-aeroport', action='append', metavar='CODE=FACTEUR')
+    parser.add_argument('--pistes-fermees', action='append', metavar='CODE=NOMBRE')
+    parser.add_argument('--repliques', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0, help="Graine des répliques et du programme des vols")
+    parser.add_argument('--processus', type=int, default=None, help="Nombre de processus (nombre de CPU par défaut)")
+    parser.add_argument('--nb-vols', type=int, default=200)
+    parser.add_argument('--instantanes', default=os.environ.get('AEROPORTS_INSTANTANES'),
+                        help="Instantanés du programme des vols (stockage.py); sinon généré depuis --seed")
+    parser.add_argument('--sortie', default=os.environ.get('AEROPORTS_SCENARIOS', 'scenarios'),
+                        help="Répertoire des résultats, lu par le dashboard")
+    args = parser.parse_args()
+
+    scenarios = {nom: SCENARIOS[nom] for nom in args.scenario or ()}
+    if args.nom:
+        scenarios[args.nom] = {
+            'description': args.nom,
+            'facteurs_compagnie': lire_facteurs(args.facteur_compagnie),
+            'facteurs_aeroport': lire_facteurs(args.facteur_aeroport),
+            'pistes_fermees': lire_facteurs(args.pistes_fermees, int)
+        }
+    elif not scenarios:
+        scenarios = SCENARIOS
+
+    if stockage.instantanes_disponibles(args.instantanes):
+        # Projection: seules les colonnes du plan des rotations sont lues
+        donnees = stockage.charger_instantanes(args.instantanes, {'vols_data': list(PlanRotations.COLONNES)},
+                                               tables=['vols_data'])
+        vols_data, aeroports, seed_programme = donnees['vols_data'], donnees['aeroports'], None
+    else:
+        # Programme des vols généré avec la même graine: des arguments identiques donnent des résultats identiques
+        dashboard = AeroportsFranceDashboard(nb_vols=args.nb_vols, seed=args.seed)
+        vols_data, aeroports, seed_programme = dashboard.vols_data, dashboard.aeroports, args.seed
+        args.instantanes = None
+    modele = ModeleStatutsVols(PlanRotations(vols_data, aeroports), aeroports)
+    for nom, scenario in scenarios.items():
+        resultat = executer_scenario(modele, nom, scenario, args.repliques, args.seed, args.processus,
+                                     seed_programme=seed_programme, instantanes=args.instantanes)
+        chemin = sauvegarder_resultat(resultat, args.sortie)
+        print(f"{nom}: {args.repliques} répliques de {len(modele):,} vols en {resultat['duree_s']:.1f} s -> {chemin}")
@@ -0,0 +1,420 @@
+# simulation.py
+"""Simulation à événements discrets des rotations d'avions et de la propagation des retards
+
+Le plan de la journée enchaîne les vols de chaque compagnie en rotations: un avion
+arrivé à un aéroport du réseau repart sur le vol suivant de sa compagnie depuis cet
+aéroport; parti vers un aéroport hors réseau, il revient à son aéroport de départ
+après une escale (vol retour non affiché). Chaque départ occupe une porte pendant
+l'embarquement, en nombre limité par aéroport.
+
+La simulation tire des retards et annulations primaires, puis fait avancer une file
+d'événements (tas) ordonnée par date: l'embarquement d'un vol requiert une porte
+libre et l'avion de la rotation; son départ libère la porte et programme
+l'embarquement du vol suivant de l'avion, après le vol et la rotation au sol. Un
+avion en retard retarde ainsi son vol suivant, et une porte tenue trop longtemps
+retarde les départs en attente derrière elle.
+"""
+import argparse
+import heapq
+import math
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Types d'événements, dans l'ordre de traitement à date égale (les portes se libèrent d'abord)
+DEPART, EMBARQUEMENT = 0, 1
+
+class PlanRotations:
+    """Plan de la journée: durées de vol, rotations des avions et nombre de portes par aéroport
+
+    Construit une fois par table des vols (programme et aéroports seulement); les dates
+    sont exprimées en minutes depuis le premier départ programmé.
+    """
+    TEMPS_ROTATION = 40        # minutes au sol minimum entre l'arrivée et le départ suivant
+    DUREE_EMBARQUEMENT = 20    # dernières minutes de la rotation, passées à la porte
+    ESCALE_HORS_RESEAU = 45    # minutes au sol avant le vol retour depuis un aéroport hors réseau
+    # Portes d'un aéroport: une pour PASSAGERS_PAR_PORTE passagers annuels de capacité, au
+    # moins PORTES_PAR_TERMINALE par terminal, et au moins l'occupation programmée maximale
+    # multipliée par MARGE_PORTES quand le programme est plus chargé que l'aéroport réel
+    PASSAGERS_PAR_PORTE = 250_000
+    PORTES_PAR_TERMINALE = 4
+    MARGE_PORTES = 1.1
+    # Durée de vol: temps fixe + distance / vitesse, ou durée tabulée hors réseau (minutes)
+    TEMPS_FIXE_VOL = 30
+    VITESSE_KM_MIN = 12
+    DUREES_HORS_RESEAU = {
+        'NTE': 70, 'LIL': 65, 'BSL': 70,
+        'LHR': 75, 'AMS': 80, 'FRA': 80, 'BCN': 95, 'MAD': 120, 'FCO': 120,
+        'IST': 200, 'DXB': 400, 'JFK': 480
+    }
+    DUREE_PAR_DEFAUT = 90
+    # Colonnes de la table des vols lues par le plan (projection des instantanés)
+    COLONNES = ('compagnie', 'aeroport_depart', 'aeroport_arrivee', 'heure_depart_programmee')
+
+    def __init__(self, vols_data, aeroports):
+        self.vols_data = vols_data
+        self.aeroports_depart = list(vols_data['aeroport_depart'].cat.categories)
+        depart = vols_data['aeroport_depart'].cat.codes.to_numpy().astype(np.int64)
+        arrivee = vols_data['aeroport_arrivee'].cat.codes.to_numpy().astype(np.int64)
+        compagnie = vols_data['compagnie'].cat.codes.to_numpy().astype(np.int64)
+        programme = vols_data['heure_depart_programmee'].to_numpy()
+        self.origine = programme.min() if len(programme) else np.datetime64('now', 'ns')
+        self.programme = (programme - self.origine) / np.timedelta64(1, 'm')
+
+        # Durées de vol par couple (départ, arrivée) et aéroport où l'avion est ensuite disponible
+        durees = self.matrice_durees(aeroports, self.aeroports_depart,
+                                     list(vols_data['aeroport_arrivee'].cat.categories))
+        self.duree_vol = durees[depart, arrivee]
+        rang_depart = {code: i for i, code in enumerate(self.aeroports_depart)}
+        escale = np.array([rang_depart.get(code, -1) for code in vols_data['aeroport_arrivee'].cat.categories],
+                          dtype=np.int64)[arrivee] if len(arrivee) else np.empty(0, dtype=np.int64)
+        dans_reseau = escale >= 0
+        self.aeroport_suivant = np.where(dans_reseau, escale, depart)
+        # Minutes entre l'arrivée et le plus tôt possible du départ suivant de l'avion
+        self.delai_disponibilite = np.where(dans_reseau, self.TEMPS_ROTATION,
+                                            self.ESCALE_HORS_RESEAU + self.duree_vol + self.TEMPS_ROTATION)
+        self.depart = depart
+        self.successeur, self.nb_avions = self.chainer(compagnie, len(vols_data['compagnie'].cat.categories))
+        self.predecesseur = np.full(len(self.successeur), -1, dtype=np.int64)
+        self.predecesseur[self.successeur[self.successeur >= 0]] = np.flatnonzero(self.successeur >= 0)
+        self.nb_portes = self.compter_portes(aeroports)
+
+    def __len__(self):
+        return len(self.programme)
+
+    def matrice_durees(self, aeroports, codes_depart, codes_arrivee):
+        """Durées de vol (minutes) départ × arrivée: distance entre aéroports connus, sinon table"""
+        durees = np.full((len(codes_depart), len(codes_arrivee)), float(self.DUREE_PAR_DEFAUT))
+        for j, code in enumerate(codes_arrivee):
+            durees[:, j] = self.DUREES_HORS_RESEAU.get(code, self.DUREE_PAR_DEFAUT)
+            if code not in aeroports:
+                continue
+            for i, origine in enumerate(codes_depart):
+                if origine in aeroports:
+                    durees[i, j] = self.TEMPS_FIXE_VOL + distance_km(aeroports[origine], aeroports[code]) / self.VITESSE_KM_MIN
+        return durees
+
+    def chainer(self, compagnie, nb_compagnies):
+        """Rotations: affecte chaque départ, par ordre programmé, à l'avion de la compagnie
+        disponible depuis le plus longtemps à l'aéroport, ou à un nouvel avion
+
+        Renvoie le vol suivant de chaque vol (-1 en fin de rotation) et le nombre d'avions.
+        """
+        nb_aeroports = len(self.aeroports_depart)
+        programme = self.programme.tolist()
+        pret = (self.programme + self.duree_vol + self.delai_disponibilite).tolist()
+        cle_depart = (compagnie * nb_aeroports + self.depart).tolist()
+        cle_suivante = (compagnie * nb_aeroports + self.aeroport_suivant).tolist()
+        disponibles = [[] for _ in range(nb_compagnies * nb_aeroports)]  # tas (prêt, avion)
+        dernier_vol = []
+        successeur = [-1] * len(programme)
+        heappush, heappop = heapq.heappush, heapq.heappop
+        for vol in np.argsort(self.programme, kind='stable').tolist():
+            file = disponibles[cle_depart[vol]]
+            if file and file[0][0] <= programme[vol]:
+                avion = heappop(file)[1]
+                successeur[dernier_vol[avion]] = vol
+                dernier_vol[avion] = vol
+            else:
+                avion = len(dernier_vol)
+                dernier_vol.append(vol)
+            heappush(disponibles[cle_suivante[vol]], (pret[vol], avion))
+        return np.array(successeur, dtype=np.int64), len(dernier_vol)
+
+    def compter_portes(self, aeroports):
+        """Portes par aéroport, d'après sa capacité, ses terminaux et la charge du programme
+
+        Sans marge au-dessus de la pointe programmée, les départs retardés qui se
+        chevauchent attendent une porte et prennent du retard.
+        """
+        nb_portes = []
+        for i, code in enumerate(self.aeroports_depart):
+            info = aeroports.get(code, {})
+            fins = np.sort(self.programme[self.depart == i])
+            occupation = np.arange(1, len(fins) + 1) - np.searchsorted(fins, fins - self.DUREE_EMBARQUEMENT, 'right')
+            nb_portes.append(max(info.get('terminales', 1) * self.PORTES_PAR_TERMINALE,
+                                 round(info.get('capacite_passagers', 0) / self.PASSAGERS_PAR_PORTE),
+                                 math.ceil(occupation.max(initial=0) * self.MARGE_PORTES)))
+        return nb_portes
+
+class SimulationRotations:
+    """Déroulement d'une journée du plan: retards primaires, portes et propagation le long des rotations
+
+    statuts: libellés des statuts ('À l'heure', 'Retardé', 'Annulé'); rng: générateur numpy.
+    debut: date de départ de l'horloge (début du programme par défaut); la journée reprend
+    alors à cet instant sans rejouer les événements antérieurs (voir demarrer).
+    """
+    PROBA_RETARD_PRIMAIRE = 0.15   # part des vols retardés par une cause propre (météo, passagers...)
+    RETARD_PRIMAIRE_MOYEN = 20     # minutes, loi exponentielle
+    PROBA_ANNULATION = 0.01
+    ECART_TYPE_DUREE = 6           # minutes d'aléa sur le temps de vol et d'escale
+    SEUIL_RETARD = 15              # minutes à partir desquelles un vol est compté retardé
+    SEUIL_ANNULATION = 240         # un vol qui partirait plus en retard est annulé
+    MINUTES_JOURNEE = 24 * 60      # écart entre deux journées successives du plan
+
+    def __init__(self, plan, statuts, rng=None, debut=None, facteurs_retard=None):
+        self.plan = plan
+        self.rng = np.random.default_rng(rng)
+        # Listes Python: la boucle d'événements y lit un élément à la fois
+        self.programme = plan.programme.tolist()
+        self.successeur = plan.successeur.tolist()
+        self.aeroport = plan.depart.tolist()
+        self.code_a_l_heure, self.code_retarde, self.code_annule = (
+            statuts.index(s) for s in ('À l\'heure', 'Retardé', 'Annulé'))
+        # Multiplicateur de la probabilité de retard primaire, par vol (scénarios)
+        self.facteurs_retard = np.ones(len(plan)) if facteurs_retard is None else facteurs_retard
+        self.journee = 0
+        self.demarrer(None if debut is None else self.minute(debut))
+
+    def minute(self, date):
+        """Minute de l'horloge correspondant à `date`, dans la journée en cours du plan"""
+        return ((np.datetime64(pd.Timestamp(date)) - self.plan.origine) / np.timedelta64(1, 'm')
+                - self.MINUTES_JOURNEE * max(self.journee - 1, 0))
+
+    def demarrer(self, instant=None):
+        """Nouvelle journée: tirage des aléas, portes libres et embarquement des premiers vols des rotations
+
+        instant: minute du plan où placer l'horloge. Les vols dont l'embarquement a commencé
+        avant sont placés sans boucle d'événements (départ programmé + retard primaire, sans
+        attente de porte), et la file ne contient que la suite de la journée.
+        """
+        plan, rng, n = self.plan, self.rng, len(self.plan)
+        self.journee += 1
+        probabilites = np.minimum(self.PROBA_RETARD_PRIMAIRE * self.facteurs_retard, 1)
+        retard_primaire = np.where(rng.random(n) < probabilites, rng.exponential(self.RETARD_PRIMAIRE_MOYEN, n), 0.0)
+        annulation_primaire = rng.random(n) < self.PROBA_ANNULATION
+        # Minutes entre le départ et le plus tôt possible du départ suivant de l'avion
+        duree_disponibilite = np.maximum(plan.duree_vol + plan.delai_disponibilite
+                                         + rng.normal(0, self.ECART_TYPE_DUREE, n), plan.TEMPS_ROTATION)
+        self.retard_primaire = retard_primaire.tolist()
+        self.annulation_primaire = annulation_primaire.tolist()
+        self.duree_disponibilite = duree_disponibilite.tolist()
+        self.depart_reel = [math.nan] * n
+        self.porte = [-1] * n
+        self.portes_libres = [list(range(nb - 1, -1, -1)) for nb in plan.nb_portes]
+        self.attente_porte = [deque() for _ in plan.nb_portes]
+
+        programme, embarquement = plan.programme, plan.DUREE_EMBARQUEMENT
+        self.horloge = float(programme.min()) - embarquement if n else 0.0
+        # Au démarrage, les vols à venir repartent à l'heure en attendant les événements
+        codes, retards = np.full(n, self.code_a_l_heure), np.zeros(n, dtype=np.int64)
+        if instant is None or instant <= self.horloge:
+            debuts_rotation = np.flatnonzero(plan.predecesseur < 0)
+            self.evenements = list(zip((programme[debuts_rotation] - embarquement).tolist(),
+                                       [EMBARQUEMENT] * len(debuts_rotation), debuts_rotation.tolist()))
+        else:
+            self.evenements = self.reprendre(instant, retard_primaire, annulation_primaire, duree_disponibilite,
+                                             codes, retards)
+            self.horloge = float(instant)
+        heapq.heapify(self.evenements)
+        self.changements = ([np.arange(n)], [codes], [retards])
+
+    def reprendre(self, instant, retard, annule, duree_disponibilite, codes, retards):
+        """État de la journée à `instant` (minutes), calculé par tableaux; renvoie les événements à venir
+
+        retard, annule, duree_disponibilite: aléas de la journée tirés par demarrer.
+
+        Un vol est commencé si son embarquement programmé a commencé et si le vol précédent
+        de son avion est parti ou annulé. Commencé, il est annulé (annulation primaire),
+        parti ou à la porte jusqu'à son départ (programmé + retard primaire); les vols à la
+        porte au-delà des portes de l'aéroport attendent une porte. `codes` et `retards`
+        reçoivent les statuts des vols commencés et les retards estimés de leurs successeurs.
+        """
+        plan = self.plan
+        programme, successeur, predecesseur = plan.programme, plan.successeur, plan.predecesseur
+        embarquement = plan.DUREE_EMBARQUEMENT
+        annule = annule | (retard > self.SEUIL_ANNULATION)
+        depart = programme + retard
+        a_predecesseur = predecesseur >= 0
+
+        commence = programme - embarquement < instant
+        while True:
+            termine = commence & (annule | (depart <= instant))
+            bloque = commence & a_predecesseur & ~termine[np.maximum(predecesseur, 0)]
+            if not bloque.any():
+                break
+            commence &= ~bloque
+        a_la_porte = commence & ~termine
+
+        codes[termine & annule] = self.code_annule
+        maintenus = commence & ~annule
+        codes[maintenus] = np.where(retard[maintenus] >= self.SEUIL_RETARD, self.code_retarde, self.code_a_l_heure)
+        retards[maintenus] = np.round(retard[maintenus])
+        depart_reel = np.where(maintenus, depart, math.nan)
+
+        evenements = []
+        # Premiers vols des rotations à venir
+        debuts_rotation = np.flatnonzero(~commence & ~a_predecesseur)
+        evenements += zip((programme[debuts_rotation] - embarquement).tolist(),
+                          [EMBARQUEMENT] * len(debuts_rotation), debuts_rotation.tolist())
+        # Vols suivants d'un vol terminé: l'avion est prêt après le vol et la rotation au sol
+        # (un avion de réserve remplace celui d'un vol annulé)
+        vols = np.flatnonzero(termine & (successeur >= 0))
+        suivants = successeur[vols]
+        vols, suivants = vols[~commence[suivants]], suivants[~commence[suivants]]
+        pret = np.where(annule[vols], instant + embarquement,
+                        depart[vols] + duree_disponibilite[vols])
+        retard_suivant = pret - programme[suivants]
+        evenements += zip((np.maximum(pret, programme[suivants]) - embarquement).tolist(),
+                          [EMBARQUEMENT] * len(suivants), suivants.tolist())
+        estime = ~annule[vols] & (retard_suivant > 0)
+        codes[suivants[estime]] = np.where(retard_suivant[estime] >= self.SEUIL_RETARD,
+                                           self.code_retarde, self.code_a_l_heure)
+        retards[suivants[estime]] = np.round(retard_suivant[estime])
+
+        # Vols à la porte, par ordre de départ: les premiers occupent les portes, les autres attendent
+        for aeroport, libres in enumerate(self.portes_libres):
+            vols = np.flatnonzero(a_la_porte & (plan.depart == aeroport))
+            vols = vols[np.argsort(depart[vols], kind='stable')].tolist()
+            places = len(libres)
+            for vol in vols[:places]:
+                self.porte[vol] = libres.pop()
+                evenements.append((float(depart[vol]), DEPART, vol))
+            self.attente_porte[aeroport].extend(vols[places:])
+            depart_reel[vols[places:]] = math.nan
+        self.depart_reel = depart_reel.tolist()
+        return evenements
+
+    def avancer(self, minutes):
+        """Traite les événements des `minutes` suivantes de l'horloge
+
+        Renvoie le dernier (position, code de statut, retard) de chaque vol modifié. Une
+        journée terminée est suivie d'une nouvelle journée du même plan.
+        """
+        self.horloge += minutes
+        self.traiter(self.horloge)
+        if not self.evenements:
+            self.demarrer()
+        return self.vider_changements()
+
+    def avancer_jusqua(self, date):
+        """Avance l'horloge jusqu'à `date` (heure réelle); entre deux journées du plan,
+        l'horloge attend le début de la journée suivante"""
+        return self.avancer(max(self.minute(date) - self.horloge, 0.0))
+
+    def traiter(self, jusqua):
+        """Boucle d'événements jusqu'à la date `jusqua` (minutes)"""
+        programme, successeur, aeroport = self.programme, self.successeur, self.aeroport
+        embarquement = self.plan.DUREE_EMBARQUEMENT
+        evenements, portes_libres, attente_porte = self.evenements, self.portes_libres, self.attente_porte
+        retard_primaire, annulation_primaire = self.retard_primaire, self.annulation_primaire
+        duree_disponibilite, depart_reel, porte = self.duree_disponibilite, self.depart_reel, self.porte
+        seuil_retard, seuil_annulation = self.SEUIL_RETARD, self.SEUIL_ANNULATION
+        a_l_heure, retarde, annule = self.code_a_l_heure, self.code_retarde, self.code_annule
+        positions, statuts, retards = [], [], []
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        def annuler(vol, date):
+            """Annule un vol; un avion de réserve assure la suite de sa rotation"""
+            positions.append(vol)
+            statuts.append(annule)
+            retards.append(0)
+            suivant = successeur[vol]
+            if suivant >= 0:
+                heappush(evenements, (max(date, programme[suivant] - embarquement), EMBARQUEMENT, suivant))
+
+        def embarquer(vol, date, libres):
+            """Attribue une porte libre au vol et programme son départ, ou l'annule s'il partirait trop tard"""
+            retard = date + embarquement + retard_primaire[vol] - programme[vol]
+            if retard > seuil_annulation:
+                annuler(vol, date)
+                return
+            porte[vol] = libres.pop()
+            depart_reel[vol] = programme[vol] + max(retard, 0)
+            heappush(evenements, (depart_reel[vol], DEPART, vol))
+            positions.append(vol)
+            statuts.append(retarde if retard >= seuil_retard else a_l_heure)
+            retards.append(max(round(retard), 0))
+
+        while evenements and evenements[0][0] <= jusqua:
+            date, type_evenement, vol = heappop(evenements)
+            if type_evenement == EMBARQUEMENT:
+                if annulation_primaire[vol]:
+                    annuler(vol, date)
+                elif portes_libres[aeroport[vol]]:
+                    embarquer(vol, date, portes_libres[aeroport[vol]])
+                else:
+                    attente_porte[aeroport[vol]].append(vol)
+                continue
+
+            # Départ: l'avion sera prêt pour son vol suivant après le vol et la rotation au sol,
+            # ce qui donne dès maintenant le retard estimé de ce vol
+            suivant = successeur[vol]
+            if suivant >= 0:
+                pret = date + duree_disponibilite[vol]
+                heappush(evenements, (max(pret, programme[suivant]) - embarquement, EMBARQUEMENT, suivant))
+                if pret > programme[suivant]:
+                    positions.append(suivant)
+                    statuts.append(retarde if pret - programme[suivant] >= seuil_retard else a_l_heure)
+                    retards.append(round(pret - programme[suivant]))
+            # La porte libérée va au premier embarquement en attente à cet aéroport
+            libres = portes_libres[aeroport[vol]]
+            libres.append(porte[vol])
+            attente = attente_porte[aeroport[vol]]
+            while libres and attente:
+                embarquer(attente.popleft(), date, libres)
+
+        if positions:
+            self.changements[0].append(np.array(positions, dtype=np.int64))
+            self.changements[1].append(np.array(statuts, dtype=np.int64))
+            self.changements[2].append(np.array(retards, dtype=np.int64))
+
+    def vider_changements(self):
+        """Dernier changement de chaque vol depuis l'appel précédent, en tableaux"""
+        positions, statuts, retards = (np.concatenate(colonne) if colonne else np.empty(0, dtype=np.int64)
+                                       for colonne in self.changements)
+        self.changements = ([], [], [])
+        _, derniers = np.unique(positions[::-1], return_index=True)
+        garder = len(positions) - 1 - derniers
+        return positions[garder], statuts[garder], retards[garder]
+
+def distance_km(aeroport_a, aeroport_b):
+    """Distance orthodromique entre deux aéroports (attributs latitude/longitude)"""
+    lat_a, lat_b = math.radians(aeroport_a['latitude']), math.radians(aeroport_b['latitude'])
+    dlat = lat_b - lat_a
+    dlon = math.radians(aeroport_b['longitude'] - aeroport_a['longitude'])
+    h = math.sin(dlat / 2) ** 2 + math.cos(lat_a) * math.cos(lat_b) * math.sin(dlon / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(h))
+
+if __name__ == "__main__":
+    import sys
+
+    from Aeroport import AeroportsFranceDashboard
+
+    # Parts maximales plausibles sur une journée simulée; au-delà, le plan est saturé
+    PARTS_MAX = {'retardés': 0.30, 'annulés': 0.05}
+
+    parser = argparse.ArgumentParser(description="Temps CPU et plausibilité de la simulation d'une journée de rotations")
+    parser.add_argument('--nb-vols', type=int, nargs='+', default=[50_000])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    implausibles = 0
+    for nb_vols in args.nb_vols:
+        dashboard = AeroportsFranceDashboard(nb_vols=nb_vols, seed=args.seed)
+        debut = time.process_time()
+        plan = PlanRotations(dashboard.vols_data, dashboard.aeroports)
+        duree_plan = time.process_time() - debut
+        simulation = SimulationRotations(plan, dashboard.STATUTS, args.seed)
+        debut = time.process_time()
+        simulation.traiter(math.inf)
+        duree_journee = time.process_time() - debut
+
+        depart_reel = np.array(simulation.depart_reel)
+        partis = ~np.isnan(depart_reel)
+        retard = depart_reel[partis] - plan.programme[partis]
+        primaire = np.array(simulation.retard_primaire)[partis]
+        parts = {'retardés': (retard >= SimulationRotations.SEUIL_RETARD).sum() / len(plan),
+                 'annulés': 1 - partis.mean()}
+        print(f"{len(plan):,} vols, {plan.nb_avions:,} avions, portes {dict(zip(plan.aeroports_depart, plan.nb_portes))}")
+        print(f"  Plan des rotations: {duree_plan * 1000:.0f} ms CPU, journée simulée: {duree_journee * 1000:.0f} ms CPU")
+        print(f"  Vols retardés (>= {SimulationRotations.SEUIL_RETARD} min): {parts['retardés']:.1%}, "
+              f"annulés: {parts['annulés']:.1%}, retard moyen {retard.mean():.1f} min "
+              f"dont {1 - primaire.sum() / max(retard.sum(), 1e-9):.0%} propagé ou dû aux portes")
+        for nom, part in parts.items():
+            if part > PARTS_MAX[nom]:
+                implausibles += 1
+                print(f"  IMPLAUSIBLE: {part:.1%} de vols {nom} (maximum {PARTS_MAX[nom]:.0%})")
+    sys.exit(1 if implausibles else 0)
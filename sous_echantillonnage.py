@@ -0,0 +1,69 @@
+# sous_echantillonnage.py
+"""Réduction des séries temporelles avant construction des graphiques
+
+Chaque série est découpée en paquets de points consécutifs dont on ne garde que
+le minimum et le maximum, ainsi que les deux extrémités de la série, comptées dans
+son budget: les pics
+et les creux, comme celui de 2020, restent visibles alors que le nombre de points
+envoyés au navigateur est borné quelle que soit la longueur de l'historique.
+Toutes les séries sont traitées ensemble, sans boucle Python.
+"""
+import numpy as np
+
+def budget_par_serie(nb_series, points_max_graphique, points_max_serie, points_min_serie=20):
+    """Nombre de points alloué à chaque série pour rester sous le budget du graphique
+
+    Au-delà de points_max_graphique / points_min_serie séries, le plancher par série
+    l'emporte sur le budget du graphique.
+    """
+    return max(points_min_serie, min(points_max_serie, points_max_graphique // max(nb_series, 1)))
+
+def positions_min_max(groupes, valeurs, nb_points):
+    """Positions des points conservés, dans l'ordre d'origine
+
+    groupes: codes entiers de série, les points de chaque série étant contigus et
+    ordonnés sur l'axe x; valeurs: ordonnées; nb_points: budget par série, extrémités
+    comprises (au moins 4 points par série réduite).
+    """
+    groupes = np.asarray(groupes)
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    n = len(valeurs)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Bornes de chaque série (points contigus)
+    debuts = np.flatnonzero(np.r_[True, groupes[1:] != groupes[:-1]])
+    longueurs = np.diff(np.r_[debuts, n])
+    numero_serie = np.repeat(np.arange(len(debuts)), longueurs)
+    rang = np.arange(n) - debuts[numero_serie]
+
+    # Les séries déjà sous le budget gardent tous leurs points (un paquet par point); les
+    # autres gardent un minimum et un maximum par paquet, après leurs deux extrémités
+    nb_paquets = np.where(longueurs > nb_points, max((nb_points - 2) // 2, 1), longueurs)
+    decalages = np.cumsum(nb_paquets) - nb_paquets
+    paquet = decalages[numero_serie] + rang * nb_paquets[numero_serie] // longueurs[numero_serie]
+
+    # Minimum et maximum de chaque paquet par réduction sur les paquets contigus,
+    # puis première position atteignant chacun d'eux
+    bords = np.flatnonzero(np.r_[True, paquet[1:] != paquet[:-1]])
+    conserves = [debuts, debuts + longueurs - 1]
+    for reduction in (np.minimum, np.maximum):
+        extremes = reduction.reduceat(valeurs, bords)
+        atteints = np.flatnonzero(valeurs == extremes[paquet])
+        conserves.append(atteints[np.r_[True, paquet[atteints][1:] != paquet[atteints][:-1]]])
+    return np.unique(np.concatenate(conserves))
+
+def sous_echantillonner(df, x, y, groupe=None, points_max_graphique=10_000, points_max_serie=500):
+    """Réduit un DataFrame long (une ligne par point) à un nombre de points borné
+
+    Les séries sont définies par la colonne `groupe` (une seule série sans groupe) et
+    triées sur `x`. Les séries plus courtes que leur budget sont renvoyées intactes.
+    """
+    # Ordre (série, x) calculé sur les codes des séries plutôt que par tri des libellés
+    groupes = np.zeros(len(df), dtype=np.int64) if groupe is None else df[groupe].factorize()[0]
+    nb_series = int(groupes.max()) + 1 if len(df) else 0
+    nb_points = budget_par_serie(nb_series, points_max_graphique, points_max_serie)
+    if len(df) <= nb_points * nb_series:
+        return df
+    ordre = np.lexsort((df[x].to_numpy(), groupes))
+    return df.iloc[ordre[positions_min_max(groupes[ordre], df[y].to_numpy()[ordre], nb_points)]]
@@ -0,0 +1,160 @@
+# stockage.py
+"""Instantanés colonnaires des jeux de données du dashboard (format Arrow IPC)
+
+Les tables sont écrites sans compression pour pouvoir être relues par memory-map:
+les colonnes numériques et les codes des colonnes catégorielles sont alors des vues
+sur le fichier, et seules les pages effectivement lues occupent la mémoire.
+Les heures de départ sont écrites en décalage par rapport à l'heure de l'instantané et
+recalées sur l'heure du chargement, pour qu'un instantané relu un autre jour présente
+toujours des départs autour de l'heure courante.
+"""
+import argparse
+import json
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # pyarrow est optionnel: sans lui, le dashboard régénère ses données
+    pa = None
+    ipc = None
+
+# Tables persistées et colonnes texte encodées en dictionnaire (catégories) à l'écriture
+JEUX_DE_DONNEES = {
+    'vols_data': (),
+    'traffic_data': ('aeroport', 'region'),
+    'airlines_data': ()
+}
+FICHIER_AEROPORTS = 'aeroports.json'
+# Colonnes d'heures stockées en décalage (durée) par rapport à l'heure de l'instantané
+COLONNES_HORAIRES = {'vols_data': ('heure_depart_programmee', 'heure_depart_estimee')}
+
+class StockageInstantanes:
+    """Lecture et écriture d'instantanés Arrow IPC dans un répertoire"""
+    EXTENSION = '.arrow'
+
+    def __init__(self, repertoire):
+        if pa is None:
+            raise ImportError("pyarrow est requis pour les instantanés colonnaires (pip install pyarrow)")
+        self.repertoire = repertoire
+
+    def chemin(self, nom):
+        """Chemin du fichier d'un instantané"""
+        return os.path.join(self.repertoire, nom + self.EXTENSION)
+
+    def existe(self, nom):
+        """Indique si l'instantané `nom` a été écrit"""
+        return os.path.exists(self.chemin(nom))
+
+    def ecrire(self, nom, df, dictionnaires=()):
+        """Écrit un DataFrame; les colonnes de `dictionnaires` sont encodées en dictionnaire"""
+        os.makedirs(self.repertoire, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for colonne in dictionnaires:
+            i = table.schema.get_field_index(colonne)
+            if not pa.types.is_dictionary(table.schema.field(i).type):
+                table = table.set_column(i, colonne, table.column(colonne).dictionary_encode())
+
+        # Écriture dans un fichier temporaire puis renommage, pour ne jamais exposer un fichier partiel
+        temporaire = self.chemin(nom) + '.tmp'
+        with pa.OSFile(temporaire, 'wb') as sortie:
+            with ipc.new_file(sortie, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temporaire, self.chemin(nom))
+
+    def schema(self, nom):
+        """Schéma d'un instantané, lu sans charger les données"""
+        return ipc.open_file(pa.memory_map(self.chemin(nom), 'r')).schema
+
+    def table(self, nom, colonnes=None):
+        """Ouvre un instantané par memory-map, sans copie; `colonnes` limite les colonnes exposées"""
+        table = ipc.open_file(pa.memory_map(self.chemin(nom), 'r')).read_all()
+        return table.select(colonnes) if colonnes is not None else table
+
+    def charger(self, nom, colonnes=None):
+        """Charge un instantané en DataFrame, en ne matérialisant que les colonnes demandées"""
+        # split_blocks évite la consolidation des colonnes et donc la copie des données numériques
+        return self.table(nom, colonnes).to_pandas(split_blocks=True)
+
+def sauvegarder_instantanes(donnees, repertoire, horodatage=None):
+    """Écrit les jeux de données renvoyés par AeroportsFranceDashboard.donnees_statiques
+
+    horodatage: heure de l'instantané, dont les heures de départ sont écrites en
+    décalage (heure courante par défaut).
+    """
+    horodatage = pd.Timestamp.now() if horodatage is None else horodatage
+    stockage = StockageInstantanes(repertoire)
+    for nom, dictionnaires in JEUX_DE_DONNEES.items():
+        df = donnees[nom]
+        horaires = [colonne for colonne in COLONNES_HORAIRES.get(nom, ()) if colonne in df]
+        if horaires:
+            df = df.assign(**{colonne: df[colonne] - horodatage for colonne in horaires})
+        stockage.ecrire(nom, df, dictionnaires)
+    with open(os.path.join(repertoire, FICHIER_AEROPORTS), 'w', encoding='utf-8') as f:
+        json.dump(donnees['aeroports'], f, ensure_ascii=False, indent=2)
+
+def instantanes_disponibles(repertoire):
+    """Indique si un jeu complet d'instantanés est présent dans `repertoire`
+
+    Des instantanés d'un format antérieur, aux heures de départ absolues, sont ignorés:
+    relus un autre jour, ils présenteraient des départs tous passés.
+    """
+    if pa is None or not repertoire:
+        return False
+    stockage = StockageInstantanes(repertoire)
+    if not (all(stockage.existe(nom) for nom in JEUX_DE_DONNEES)
+            and os.path.exists(os.path.join(repertoire, FICHIER_AEROPORTS))):
+        return False
+    for nom, horaires in COLONNES_HORAIRES.items():
+        schema = stockage.schema(nom)
+        if any(colonne in schema.names and not pa.types.is_duration(schema.field(colonne).type)
+               for colonne in horaires):
+            return False
+    return True
+
+def charger_instantanes(repertoire, colonnes=None, tables=None, maintenant=None):
+    """Recharge les jeux de données par memory-map, au format de donnees_statiques
+
+    colonnes: dict optionnel {nom de table: colonnes à charger} pour la projection.
+    tables: noms des tables à charger (toutes par défaut), pour un consommateur qui
+    n'en lit qu'une partie.
+    maintenant: heure sur laquelle sont recalées les heures de départ (heure courante
+    par défaut).
+    """
+    maintenant = pd.Timestamp.now() if maintenant is None else maintenant
+    stockage = StockageInstantanes(repertoire)
+    colonnes = colonnes or {}
+    donnees = {nom: stockage.charger(nom, colonnes.get(nom)) for nom in tables or JEUX_DE_DONNEES}
+    for nom, horaires in COLONNES_HORAIRES.items():
+        for colonne in horaires:
+            if nom in donnees and colonne in donnees[nom]:
+                donnees[nom][colonne] = maintenant + donnees[nom][colonne]
+    with open(os.path.join(repertoire, FICHIER_AEROPORTS), encoding='utf-8') as f:
+        donnees['aeroports'] = json.load(f)
+    return donnees
+
+if __name__ == "__main__":
+    from Aeroport import AeroportsFranceDashboard
+
+    parser = argparse.ArgumentParser(description="Génère des instantanés colonnaires des données du dashboard")
+    parser.add_argument('repertoire', help="Répertoire de destination des instantanés")
+    parser.add_argument('--nb-vols', type=int, default=200)
+    parser.add_argument('--nb-aeroports', type=int, default=None,
+                        help="Complète les aéroports réels par des aéroports synthétiques")
+    parser.add_argument('--debut', default='2020-01-01', help="Début de l'historique de trafic")
+    parser.add_argument('--fin', default=None, help="Fin de l'historique de trafic (aujourd'hui par défaut)")
+    parser.add_argument('--frequence', choices=['mensuelle', 'quotidienne'], default='mensuelle')
+    parser.add_argument('--compact', action='store_true', help="Schéma compact de la table des vols")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    dashboard = AeroportsFranceDashboard(nb_vols=args.nb_vols, seed=args.seed, schema_compact=args.compact)
+    if args.nb_aeroports:
+        dashboard.aeroports = dashboard.generer_aeroports_synthetiques(args.nb_aeroports)
+        dashboard.vols_data = dashboard.initialize_vols_data()
+    dashboard.traffic_data = dashboard.initialize_traffic_data(args.debut, args.fin, args.frequence)
+    sauvegarder_instantanes(dashboard.donnees_statiques(), args.repertoire)
+    print(f"Instantanés écrits dans {args.repertoire}: {len(dashboard.vols_data):,} vols, "
+          f"{len(dashboard.traffic_data):,} lignes de trafic")